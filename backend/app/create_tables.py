@@ -1,9 +1,11 @@
-from app.db import engine, Base
+from app.db import engine
 from app import models  # noqa: F401  (ensures models are imported/registered)
+from app.startup import create_schema, schema_fingerprint
 
 def main():
-    Base.metadata.create_all(bind=engine)
-    print("Tables created successfully.")
+    with engine.begin() as conn:
+        create_schema(conn)
+    print(f"Tables created successfully (schema fingerprint {schema_fingerprint()[:12]}).")
 
 if __name__ == "__main__":
     main()
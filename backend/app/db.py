@@ -22,9 +22,27 @@ odbc_str = (
     "TrustServerCertificate=yes;"
 )
 
-DATABASE_URL = "mssql+pyodbc:///?odbc_connect=" + quote_plus(odbc_str)
+# DATABASE_URL overrides the SQL Server connection, e.g. sqlite:///bench.db for local benchmarks
+DATABASE_URL = os.getenv("DATABASE_URL") or "mssql+pyodbc:///?odbc_connect=" + quote_plus(odbc_str)
 
-engine = create_engine(DATABASE_URL, echo=False, future=True, pool_pre_ping=True)
+# --- connection pool (per process; shared by the sync and async engines) ---
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+
+
+def pool_options(url: str) -> dict[str, int]:
+    # SQLite (tests, benchmarks) keeps SQLAlchemy's default pool
+    if url.startswith("sqlite"):
+        return {}
+    return {"pool_size": DB_POOL_SIZE, "max_overflow": DB_MAX_OVERFLOW, "pool_timeout": DB_POOL_TIMEOUT}
+
+
+# fast_executemany: send executemany parameters as one array (used by the score staging path)
+engine_options = {"fast_executemany": True} if DATABASE_URL.startswith("mssql+pyodbc") else {}
+engine = create_engine(
+    DATABASE_URL, echo=False, future=True, pool_pre_ping=True, **engine_options, **pool_options(DATABASE_URL)
+)
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
 
 
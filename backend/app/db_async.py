@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+import os
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from .db import DATABASE_URL, pool_options
+
+
+def async_url(url: str) -> str:
+    """
+    Async driver for the sync URL: mssql+pyodbc -> mssql+aioodbc, sqlite -> sqlite+aiosqlite.
+    """
+    if url.startswith("mssql+pyodbc:"):
+        return "mssql+aioodbc:" + url[len("mssql+pyodbc:"):]
+    if url.startswith("sqlite:"):
+        return "sqlite+aiosqlite:" + url[len("sqlite:"):]
+    return url
+
+
+# ASYNC_DATABASE_URL overrides the URL derived from DATABASE_URL / the SQL Server settings
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or async_url(DATABASE_URL)
+
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL, echo=False, pool_pre_ping=True, **pool_options(ASYNC_DATABASE_URL)
+)
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
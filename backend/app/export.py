@@ -0,0 +1,256 @@
+"""
+Bulk exports of dbo.score and dbo.financial_statement (GET /export/scores, /export/financials).
+
+Rows are read through a streaming cursor in EXPORT_BATCH_ROWS batches; each batch is encoded
+and handed to the client before the next one is fetched, so the API process holds one batch
+at a time no matter how many rows match.
+
+Formats: csv, ndjson (one JSON object per line) and parquet (one row group per batch, needs pyarrow).
+"""
+# No `from __future__ import annotations`: FastAPI reads ExportParams' annotations at runtime.
+import csv
+import io
+import os
+from dataclasses import dataclass
+from typing import AsyncIterator, Callable, Iterator, Literal, Sequence
+
+import orjson
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy import DateTime, Float, Integer, Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from . import models
+
+EXPORT_BATCH_ROWS = int(os.getenv("EXPORT_BATCH_ROWS", "5000"))
+
+ExportFormat = Literal["csv", "ndjson", "parquet"]
+
+MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+@dataclass
+class ExportParams:
+    """
+    Query parameters of the /export endpoints (used as a FastAPI class dependency).
+    Score bounds apply to score.total_score; financials are matched to the score of the same year.
+    """
+    format: ExportFormat = "csv"
+    year: int | None = None
+    min_year: int | None = None
+    max_year: int | None = None
+    min_score: float | None = None
+    max_score: float | None = None
+
+
+# ------------------------------------------------------------
+# Statements
+# ------------------------------------------------------------
+def _filtered(stmt: Select, table, params: ExportParams) -> Select:
+    for column, low, high in (
+        (table.year, params.min_year, params.max_year),
+        (models.Score.total_score, params.min_score, params.max_score),
+    ):
+        if low is not None:
+            stmt = stmt.where(column >= low)
+        if high is not None:
+            stmt = stmt.where(column <= high)
+    if params.year is not None:
+        stmt = stmt.where(table.year == params.year)
+    # (orgnr, year) follows the unique index, so the server streams rows without a sort
+    return stmt.order_by(table.orgnr, table.year)
+
+
+def scores_stmt(params: ExportParams) -> Select:
+    return _filtered(select(*models.Score.__table__.columns), models.Score, params)
+
+
+def financials_stmt(params: ExportParams) -> Select:
+    fs = models.FinancialStatement
+    stmt = select(*fs.__table__.columns)
+    if params.min_score is not None or params.max_score is not None:
+        stmt = stmt.join(
+            models.Score,
+            (models.Score.orgnr == fs.orgnr) & (models.Score.year == fs.year),
+        )
+    return _filtered(stmt, fs, params)
+
+
+# ------------------------------------------------------------
+# Encoders: header bytes, then one chunk per batch, then a trailer
+# ------------------------------------------------------------
+class CsvEncoder:
+    def __init__(self, columns: Sequence[str]):
+        self.columns = list(columns)
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer, lineterminator="\n")
+
+    def _drain(self) -> bytes:
+        data = self._buffer.getvalue().encode("utf-8")
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return data
+
+    def begin(self) -> bytes:
+        self._writer.writerow(self.columns)
+        return self._drain()
+
+    def encode(self, rows: Sequence[Sequence]) -> bytes:
+        self._writer.writerows(rows)
+        return self._drain()
+
+    def finish(self) -> bytes:
+        return b""
+
+
+class NdjsonEncoder:
+    def __init__(self, columns: Sequence[str]):
+        self.columns = list(columns)
+
+    def begin(self) -> bytes:
+        return b""
+
+    def encode(self, rows: Sequence[Sequence]) -> bytes:
+        columns = self.columns
+        return b"".join(
+            orjson.dumps(dict(zip(columns, row)), option=orjson.OPT_APPEND_NEWLINE)
+            for row in rows
+        )
+
+    def finish(self) -> bytes:
+        return b""
+
+
+class _ChunkSink:
+    """
+    Write-only file object for ParquetWriter; chunks are taken out as soon as a row group is written.
+    """
+    closed = False
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+        self._position = 0
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def writable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return False
+
+    def take(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class ParquetEncoder:
+    def __init__(self, columns: Sequence):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise HTTPException(status_code=501, detail="Parquet export needs pyarrow on the API server")
+
+        def arrow_type(column):
+            if isinstance(column.type, Integer):
+                return pa.int64()
+            if isinstance(column.type, Float):
+                return pa.float64()
+            if isinstance(column.type, DateTime):
+                return pa.timestamp("us")
+            return pa.string()
+
+        self._pa = pa
+        self.columns = [c.name for c in columns]
+        self._schema = pa.schema([(c.name, arrow_type(c)) for c in columns])
+        self._sink = _ChunkSink()
+        self._writer = pq.ParquetWriter(self._sink, self._schema)
+
+    def begin(self) -> bytes:
+        return self._sink.take()
+
+    def encode(self, rows: Sequence[Sequence]) -> bytes:
+        arrays = [
+            self._pa.array([row[i] for row in rows], type=field.type)
+            for i, field in enumerate(self._schema)
+        ]
+        self._writer.write_table(self._pa.Table.from_arrays(arrays, schema=self._schema))
+        return self._sink.take()
+
+    def finish(self) -> bytes:
+        self._writer.close()
+        return self._sink.take()
+
+
+ENCODERS: dict[str, Callable] = {
+    "csv": lambda columns: CsvEncoder([c.name for c in columns]),
+    "ndjson": lambda columns: NdjsonEncoder([c.name for c in columns]),
+    "parquet": ParquetEncoder,
+}
+
+
+# ------------------------------------------------------------
+# Responses
+# ------------------------------------------------------------
+def _streaming_response(body, name: str, params: ExportParams) -> StreamingResponse:
+    return StreamingResponse(
+        body,
+        media_type=MEDIA_TYPES[params.format],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{params.format}"'},
+    )
+
+
+def _batch_stmt(stmt: Select) -> Select:
+    return stmt.execution_options(yield_per=EXPORT_BATCH_ROWS)
+
+
+def export_response(
+    session_factory: Callable[[], Session], stmt: Select, name: str, params: ExportParams
+) -> StreamingResponse:
+    # The encoder is built up front so a missing pyarrow is a 501, not a truncated body
+    encoder = ENCODERS[params.format](stmt.selected_columns)
+
+    # The request's get_db session is closed before the body is sent, so the stream owns its own
+    def body() -> Iterator[bytes]:
+        with session_factory() as db:
+            yield encoder.begin()
+            for batch in db.execute(_batch_stmt(stmt)).partitions():
+                yield encoder.encode(batch)
+            yield encoder.finish()
+
+    return _streaming_response(body(), name, params)
+
+
+def export_response_async(
+    session_factory: Callable[[], AsyncSession], stmt: Select, name: str, params: ExportParams
+) -> StreamingResponse:
+    encoder = ENCODERS[params.format](stmt.selected_columns)
+
+    async def body() -> AsyncIterator[bytes]:
+        async with session_factory() as db:
+            yield encoder.begin()
+            result = await db.stream(_batch_stmt(stmt))
+            async for batch in result.partitions():
+                yield encoder.encode(batch)
+            yield encoder.finish()
+
+    return _streaming_response(body(), name, params)
@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import Connection, Select, insert, select, update
+from sqlalchemy.orm import Session
+
+from . import models
+
+# Counter behind the API response cache (/top-picks/today, /companies)
+API_GENERATION = "api"
+
+
+def generation_stmt(name: str = API_GENERATION) -> Select:
+    return select(models.DataGeneration.generation).where(models.DataGeneration.name == name)
+
+
+def bump_generation(session: Session | Connection, name: str = API_GENERATION) -> None:
+    """
+    Increments the counter inside the caller's transaction, so API processes see the new
+    generation exactly when the job's writes become visible. dbo.data_generation comes
+    from create_schema (python -m app.create_tables).
+    """
+    table = models.DataGeneration
+    now = datetime.utcnow()
+    result = session.execute(
+        update(table)
+        .where(table.name == name)
+        .values(generation=table.generation + 1, updated_at=now)
+    )
+    if result.rowcount == 0:
+        session.execute(insert(table).values(name=name, generation=1, updated_at=now))
@@ -1,15 +1,25 @@
 from __future__ import annotations
 
 import argparse
+import hashlib
+import json
 import sys
+import time
+import zlib
+from bisect import bisect_left, bisect_right
 from collections import defaultdict
-from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from itertools import groupby
+from operator import itemgetter
+from dataclasses import dataclass, fields
 from datetime import datetime, timezone
 from pathlib import Path
 from statistics import mean
-from typing import Iterable, Mapping, Any
+from typing import Iterable, Iterator, Mapping, Any, Sequence
 
-from sqlalchemy import text
+import numpy as np
+from sqlalchemy import DateTime, delete, func, insert, literal, select, text, update
 from sqlalchemy.orm import Session
 
 PROJECT_ROOT = Path(__file__).resolve().parents[2]
@@ -18,9 +28,15 @@ if str(PROJECT_ROOT) not in sys.path:
 
 from app.db import SessionLocal, engine
 from app import models
+from app.generation import bump_generation
 
 
-@dataclass
+DEFAULT_YEAR = 2024
+
+
+# FeatureRow, ScoreRow and HistoryMetrics are slotted (no per-instance __dict__):
+# a full-register run creates one of each per company.
+@dataclass(slots=True)
 class FeatureRow:
     orgnr: str
     year: int
@@ -37,7 +53,7 @@ class FeatureRow:
     goodwill_ratio: float | None
 
 
-@dataclass
+@dataclass(slots=True)
 class ScoreRow:
     orgnr: str
     year: int
@@ -112,83 +128,143 @@ def clamped_linear_score(
     return neutral_score
 
 
-def compute_compounder_score_details(features: FeatureRow) -> dict[str, float]:
-    """
-    Calculates AWC Compounder Score and returns a dictionary with 
-    the total and all component scores.
-    """
-    
-    # 1. ROIC (30 pts)
-    score_roic = clamped_linear_score(
-        features.avg_roic,
-        neutral_val=0.10, neutral_score=0,
-        max_val=0.25, max_score=30,
-        min_val=0.00, min_score=-20,
-    )
-
-    # 2. Growth (20 pts)
-    score_growth = clamped_linear_score(
-        features.revenue_cagr,
-        neutral_val=0.05, neutral_score=0,
-        max_val=0.20, max_score=20,
-        min_val=-0.05, min_score=-20,
-    )
+# ------------------------------------------------------------
+# Scoring models (data, not code)
+# ------------------------------------------------------------
+@dataclass(frozen=True)
+class ScoreComponent:
+    feature: str   # FeatureRow attribute
+    key: str       # result key / score column
+    neutral_val: float
+    neutral_score: float
+    max_val: float
+    max_score: float
+    min_val: float
+    min_score: float
+    weight: float = 1.0
+
+    @property
+    def curve(self) -> dict[str, float]:
+        return {
+            "neutral_val": self.neutral_val,
+            "neutral_score": self.neutral_score,
+            "max_val": self.max_val,
+            "max_score": self.max_score,
+            "min_val": self.min_val,
+            "min_score": self.min_score,
+        }
+
+
+@dataclass(frozen=True)
+class ScoringModel:
+    model_id: str  # also the leading tag, e.g. "QS_v2;..."
+    components: tuple[ScoreComponent, ...]
+    min_total: float = -100.0
+    max_total: float = 100.0
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "ScoringModel":
+        return cls(
+            model_id=str(data["model_id"]),
+            components=tuple(ScoreComponent(**c) for c in data["components"]),
+            min_total=float(data.get("min_total", -100.0)),
+            max_total=float(data.get("max_total", 100.0)),
+        )
 
-    # 3. Moat / Margin Trend (20 pts)
-    score_moat = clamped_linear_score(
-        features.margin_change_pp,
-        neutral_val=0.00, neutral_score=5,
-        max_val=0.10, max_score=20,
-        min_val=-0.10, min_score=-20,
-    )
 
-    # 4. Cash Conversion (10 pts)
-    score_cash = clamped_linear_score(
-        features.avg_cash_conversion,
-        neutral_val=0.70, neutral_score=0,
-        max_val=1.00, max_score=10,
-        min_val=0.40, min_score=-10,
-    )
+# Production model. Shared by the scalar and vectorized engines.
+QS_V2 = ScoringModel(
+    model_id="QS_v2",
+    components=(
+        # 1. ROIC (30 pts)
+        ScoreComponent(
+            "avg_roic", "roic_score",
+            neutral_val=0.10, neutral_score=0,
+            max_val=0.25, max_score=30,
+            min_val=0.00, min_score=-20,
+        ),
+        # 2. Growth (20 pts)
+        ScoreComponent(
+            "revenue_cagr", "revenue_cagr_score",
+            neutral_val=0.05, neutral_score=0,
+            max_val=0.20, max_score=20,
+            min_val=-0.05, min_score=-20,
+        ),
+        # 3. Moat / Margin Trend (20 pts)
+        ScoreComponent(
+            "margin_change_pp", "margin_change_score",
+            neutral_val=0.00, neutral_score=5,
+            max_val=0.10, max_score=20,
+            min_val=-0.10, min_score=-20,
+        ),
+        # 4. Cash Conversion (10 pts)
+        ScoreComponent(
+            "avg_cash_conversion", "cash_score",
+            neutral_val=0.70, neutral_score=0,
+            max_val=1.00, max_score=10,
+            min_val=0.40, min_score=-10,
+        ),
+        # 5. Efficiency / NWC (10 pts)
+        # Note: Lower NWC is better, so max_val is 0.00
+        ScoreComponent(
+            "avg_nwc_sales", "nwc_sales_score",
+            neutral_val=0.15, neutral_score=0,
+            max_val=0.00, max_score=10,
+            min_val=0.30, min_score=-10,
+        ),
+        # 6. Risk / Goodwill (10 pts)
+        # Note: Lower Goodwill is better, so max_val is 0.00
+        ScoreComponent(
+            "goodwill_ratio", "goodwill_ratio_score",
+            neutral_val=0.40, neutral_score=0,
+            max_val=0.00, max_score=10,
+            min_val=0.80, min_score=-10,
+        ),
+    ),
+)
+
+PRODUCTION_MODEL = QS_V2
+
+# model_id -> ScoringModel. Candidates are added with register_model / load_model_file.
+SCORING_MODELS: dict[str, ScoringModel] = {QS_V2.model_id: QS_V2}
+
+
+def register_model(model: ScoringModel) -> ScoringModel:
+    SCORING_MODELS[model.model_id] = model
+    return model
+
+
+def load_model_file(path: Path) -> list[ScoringModel]:
+    """
+    Registers the models in a JSON file: a list of
+    {"model_id": ..., "components": [{"feature", "key", "neutral_val", ..., "weight"}]}.
+    """
+    data = json.loads(Path(path).read_text(encoding="utf-8"))
+    if isinstance(data, Mapping):
+        data = [data]
+    return [register_model(ScoringModel.from_dict(item)) for item in data]
 
-    # 5. Efficiency / NWC (10 pts)
-    # Note: Lower NWC is better, so max_val is 0.00
-    score_efficiency = clamped_linear_score(
-        features.avg_nwc_sales,
-        neutral_val=0.15, neutral_score=0,
-        max_val=0.00, max_score=10,
-        min_val=0.30, min_score=-10,
-    )
 
-    # 6. Risk / Goodwill (10 pts)
-    # Note: Lower Goodwill is better, so max_val is 0.00
-    score_risk = clamped_linear_score(
-        features.goodwill_ratio,
-        neutral_val=0.40, neutral_score=0,
-        max_val=0.00, max_score=10,
-        min_val=0.80, min_score=-10,
-    )
+def compute_compounder_score_details(
+    features: FeatureRow,
+    model: ScoringModel = PRODUCTION_MODEL,
+) -> dict[str, float]:
+    """
+    Calculates AWC Compounder Score and returns a dictionary with 
+    the total and all component scores.
+    """
+    # Note: "cash_score" is not currently stored in the DB, but good to have
+    results: dict[str, float] = {}
+    total_score = 0.0
+    for component in model.components:
+        results[component.key] = component.weight * clamped_linear_score(
+            getattr(features, component.feature), **component.curve
+        )
+        total_score += results[component.key]
 
-    total_score = (
-        score_roic
-        + score_growth
-        + score_moat
-        + score_cash
-        + score_efficiency
-        + score_risk
-    )
-    
     # Cap between -100 and 100
-    total_score = max(-100.0, min(100.0, total_score))
-
-    return {
-        "total": total_score,
-        "roic_score": score_roic,
-        "revenue_cagr_score": score_growth,
-        "margin_change_score": score_moat,
-        "cash_score": score_cash, # Not currently storing cash score in DB, but good to have
-        "nwc_sales_score": score_efficiency,
-        "goodwill_ratio_score": score_risk
-    }
+    results["total"] = max(model.min_total, min(model.max_total, total_score))
+    return results
 
 
 def revenue_band(revenue: float | None) -> str:
@@ -205,33 +281,73 @@ def revenue_band(revenue: float | None) -> str:
     return "<0.5bn"
 
 
-def build_tags(features: FeatureRow) -> str:
+def format_tags(
+    revenue: float | None,
+    avg_roic: float | None,
+    revenue_cagr: float | None,
+    model_id: str = PRODUCTION_MODEL.model_id,
+) -> str:
     # Helper to format percentages cleanly
     def p(val):
         return f"{val:.1%}" if val is not None else "na"
         
     return (
-        "QS_v2;"
+        f"{model_id};"
         "view=company;"
-        f"rev_band={revenue_band(features.revenue)};"
-        f"roic={p(features.avg_roic)};"
-        f"cagr={p(features.revenue_cagr)}"
+        f"rev_band={revenue_band(revenue)};"
+        f"roic={p(avg_roic)};"
+        f"cagr={p(revenue_cagr)}"
     )
 
 
-def fetch_financial_rows(year: int) -> tuple[list[Mapping[str, object]], list[Mapping[str, object]]]:
+def build_tags(features: FeatureRow, model_id: str = PRODUCTION_MODEL.model_id) -> str:
+    return format_tags(features.revenue, features.avg_roic, features.revenue_cagr, model_id)
+
+
+# Incremental scope: orgnrs with a financial_statement row in the scoring window (year-4..year)
+# that was fetched after their score for :year was computed, or that have no score yet.
+# The high-water mark is the later of score.computed_at and the score_feature_cache row's
+# computed_at (:model_id), which --cache runs move forward for hits without rewriting the score.
+CHANGED_ORGNRS_SQL = """
+        SELECT fs.orgnr
+        FROM dbo.financial_statement AS fs
+        LEFT JOIN dbo.score AS s
+          ON s.orgnr = fs.orgnr
+         AND s.[year] = :year
+        LEFT JOIN dbo.score_feature_cache AS c
+          ON c.model_id = :model_id
+         AND c.orgnr = fs.orgnr
+         AND c.[year] = :year
+         AND c.computed_at >= s.computed_at
+        WHERE fs.[year] BETWEEN :start_year AND :year
+          AND fs.source IN (N'proff', N'proff_forvalt_excel')
+          AND fs.account_view = N'company'
+          AND (
+              s.id IS NULL
+              OR (fs.fetched_at_utc > s.computed_at
+                  AND (c.id IS NULL OR fs.fetched_at_utc > c.computed_at))
+          )
+"""
+
+
+def fetch_financial_rows(
+    year: int,
+    incremental: bool = False,
+) -> tuple[list[Mapping[str, object]], list[Mapping[str, object]]]:
+    scope = f"AND orgnr IN ({CHANGED_ORGNRS_SQL})" if incremental else ""
     fs_current_sql = text(
-        """
+        f"""
         SELECT orgnr, [year], revenue, ebit, equity, 
                goodwill, total_debt, cash_equivalents
         FROM dbo.financial_statement
         WHERE [year] = :year
           AND source IN (N'proff', N'proff_forvalt_excel')
           AND account_view = N'company'
+          {scope}
         """
     )
     ebit_history_sql = text(
-        """
+        f"""
         SELECT orgnr, [year], revenue, ebit, equity,
                total_debt, cash_equivalents,
                cogs, depreciation,
@@ -240,20 +356,137 @@ def fetch_financial_rows(year: int) -> tuple[list[Mapping[str, object]], list[Ma
         WHERE [year] BETWEEN :start_year AND :year
           AND source IN (N'proff', N'proff_forvalt_excel')
           AND account_view = N'company'
+          {scope}
         """
     )
 
+    params = {"start_year": year - 4, "year": year, "model_id": PRODUCTION_MODEL.model_id}
     with engine.connect() as connection:
-        fs_current = connection.execute(fs_current_sql, {"year": year}).mappings().all()
-        ebit_history = connection.execute(
-            ebit_history_sql,
-            {"start_year": year - 4, "year": year},
-        ).mappings().all()
+        fs_current = connection.execute(fs_current_sql, params).mappings().all()
+        ebit_history = connection.execute(ebit_history_sql, params).mappings().all()
 
     return fs_current, ebit_history
 
 
-@dataclass
+HISTORY_WINDOW_YEARS = 5  # year-4..year
+
+# History columns plus goodwill, so the same rows serve as fs_current for their own year
+HISTORY_SELECT_SQL = """
+        SELECT orgnr, [year], revenue, ebit, equity, goodwill,
+               total_debt, cash_equivalents,
+               cogs, depreciation,
+               inventory, trade_receivables, trade_payables
+        FROM dbo.financial_statement
+        WHERE [year] BETWEEN :start_year AND :end_year
+          AND source IN (N'proff', N'proff_forvalt_excel')
+          AND account_view = N'company'
+"""
+
+STREAM_YIELD_PER = 10_000      # rows per fetchmany() from the server
+STREAM_BATCH_COMPANIES = 5_000  # companies per scoring / staging batch
+
+
+def fetch_financial_history(start_year: int, end_year: int) -> list[Mapping[str, object]]:
+    """
+    One load covering every scoring window for start_year..end_year.
+    """
+    history_sql = text(HISTORY_SELECT_SQL)
+    with engine.connect() as connection:
+        return connection.execute(
+            history_sql,
+            {"start_year": start_year - (HISTORY_WINDOW_YEARS - 1), "end_year": end_year},
+        ).mappings().all()
+
+
+def stream_financial_groups(
+    year: int,
+    incremental: bool = False,
+    yield_per: int = STREAM_YIELD_PER,
+) -> Iterator[list[Mapping[str, object]]]:
+    """
+    Streams the year-4..year window ORDER BY orgnr, year and yields one company's rows at a time.
+    With yield_per the rows are pulled off the cursor in fetchmany() batches instead of
+    being materialised, so memory is bounded by the batch size, not the universe.
+    """
+    scope = f"AND orgnr IN ({CHANGED_ORGNRS_SQL})" if incremental else ""
+    stream_sql = text(f"{HISTORY_SELECT_SQL}\n          {scope}\n        ORDER BY orgnr, [year]")
+    params = {
+        "start_year": year - (HISTORY_WINDOW_YEARS - 1),
+        "end_year": year,
+        "year": year,
+        "model_id": PRODUCTION_MODEL.model_id,
+    }
+
+    with engine.connect() as connection:
+        result = connection.execution_options(yield_per=yield_per).execute(stream_sql, params)
+        for _, rows in groupby(result.mappings(), key=itemgetter("orgnr")):
+            yield list(rows)
+
+
+def iter_scoring_batches(
+    groups: Iterable[list[Mapping[str, object]]],
+    year: int,
+    batch_companies: int = STREAM_BATCH_COMPANIES,
+) -> Iterator[tuple[list[Mapping[str, object]], list[Mapping[str, object]]]]:
+    """
+    Packs complete per-company groups into (fs_current, ebit_history) batches for scoring.
+    Companies without a statement for the year itself are dropped, as in fetch_financial_rows.
+    """
+    fs_current: list[Mapping[str, object]] = []
+    ebit_history: list[Mapping[str, object]] = []
+    for rows in groups:
+        current = [r for r in rows if r["year"] == year]
+        if not current:
+            continue
+        fs_current.extend(current)
+        ebit_history.extend(rows)
+        if len(fs_current) >= batch_companies:
+            yield fs_current, ebit_history
+            fs_current, ebit_history = [], []
+    if fs_current:
+        yield fs_current, ebit_history
+
+
+def group_history_by_orgnr(
+    rows: Iterable[Mapping[str, object]],
+) -> dict[str, tuple[list[int], list[Mapping[str, object]]]]:
+    """
+    {orgnr: (sorted years, rows in the same order)}; the year list is for bisecting windows.
+    """
+    grouped: dict[str, list[Mapping[str, object]]] = defaultdict(list)
+    for row in rows:
+        grouped[row["orgnr"]].append(row)
+
+    by_orgnr: dict[str, tuple[list[int], list[Mapping[str, object]]]] = {}
+    for orgnr, org_rows in grouped.items():
+        org_rows.sort(key=lambda item: item["year"])
+        by_orgnr[orgnr] = ([int(r["year"]) for r in org_rows], org_rows)
+    return by_orgnr
+
+
+def iter_year_windows(
+    history_by_orgnr: Mapping[str, tuple[list[int], list[Mapping[str, object]]]],
+    years: Iterable[int],
+) -> Iterator[tuple[int, list[Mapping[str, object]], list[Mapping[str, object]]]]:
+    """
+    Slides the scoring window over the preloaded history.
+    Yields (year, fs_current, ebit_history) shaped like fetch_financial_rows(year).
+    Only companies with a statement for the year itself are included.
+    """
+    for year in years:
+        fs_current: list[Mapping[str, object]] = []
+        window: list[Mapping[str, object]] = []
+        for org_years, org_rows in history_by_orgnr.values():
+            lo = bisect_left(org_years, year - (HISTORY_WINDOW_YEARS - 1))
+            hi = bisect_right(org_years, year)
+            if hi == lo or org_years[hi - 1] != year:
+                continue
+            fs_current.extend(r for r in org_rows[lo:hi] if r["year"] == year)
+            window.extend(org_rows[lo:hi])
+        yield year, fs_current, window
+
+
+@dataclass(slots=True)
 class HistoryMetrics:
     revenue_cagr: float | None
     avg_roic: float | None
@@ -388,11 +621,14 @@ def build_features(
     return features
 
 
-def compute_scores(features: Iterable[FeatureRow]) -> list[ScoreRow]:
+def compute_scores(
+    features: Iterable[FeatureRow],
+    model: ScoringModel = PRODUCTION_MODEL,
+) -> list[ScoreRow]:
     scored: list[ScoreRow] = []
     for feat in features:
         # Calculate scores and get breakdown
-        results = compute_compounder_score_details(feat)
+        results = compute_compounder_score_details(feat, model)
         total_score = results["total"]
 
         scored.append(
@@ -402,7 +638,7 @@ def compute_scores(features: Iterable[FeatureRow]) -> list[ScoreRow]:
                 quality_score=total_score,
                 compounder_score=total_score,
                 catalyst_score=0.0,
-                tags=build_tags(feat),
+                tags=build_tags(feat, model.model_id),
                 
                 # Context
                 revenue=feat.revenue,
@@ -413,36 +649,333 @@ def compute_scores(features: Iterable[FeatureRow]) -> list[ScoreRow]:
                 
                 # 1. ROIC
                 roic=feat.avg_roic,
-                roic_score=results["roic_score"],
+                roic_score=results.get("roic_score"),
                 
                 # 2. Growth
                 revenue_cagr=feat.revenue_cagr,
-                revenue_cagr_score=results["revenue_cagr_score"],
+                revenue_cagr_score=results.get("revenue_cagr_score"),
                 
                 # 3. Moat
                 margin_change=feat.margin_change_pp,
-                margin_change_score=results["margin_change_score"],
+                margin_change_score=results.get("margin_change_score"),
                 
                 # 4. Efficiency
                 nwc_sales=feat.avg_nwc_sales,
-                nwc_sales_score=results["nwc_sales_score"],
+                nwc_sales_score=results.get("nwc_sales_score"),
                 
                 # 5. Risk / Goodwill
                 goodwill_ratio=feat.goodwill_ratio,
-                goodwill_ratio_score=results["goodwill_ratio_score"],
+                goodwill_ratio_score=results.get("goodwill_ratio_score"),
+            )
+        )
+    return scored
+
+
+# ------------------------------------------------------------
+# Vectorized engine (NumPy)
+# ------------------------------------------------------------
+# Same maths as compute_history_metrics -> build_features -> compute_scores,
+# but over whole columns at once. Missing values are carried as NaN and
+# turned back into None when the ScoreRows are built.
+HISTORY_COLUMNS = (
+    "revenue", "ebit", "equity", "total_debt", "cash_equivalents",
+    "cogs", "depreciation", "inventory", "trade_receivables", "trade_payables",
+)
+
+
+def _float_column(rows: Sequence[Mapping[str, object]], key: str) -> np.ndarray:
+    # Mirrors float(row[key] or 0.0) in the scalar path (None -> NaN -> 0.0)
+    values = np.array([r[key] for r in rows], dtype=np.float64)
+    values[np.isnan(values)] = 0.0
+    return values
+
+
+def _exact_mean(values: list[float]) -> float:
+    """
+    statistics.mean for finite floats, without Fractions: the exact sum over a common
+    power-of-two denominator, rounded once by int / int true division.
+    """
+    ratios = [v.as_integer_ratio() for v in values]
+    denominator = max(den for _, den in ratios)
+    total = sum(num * (denominator // den) for num, den in ratios)
+    return total / (denominator * len(values))
+
+
+def _group_mean(codes: np.ndarray, values: np.ndarray, mask: np.ndarray, n_groups: int) -> np.ndarray:
+    """
+    Per-group mean of the masked values (codes must be sorted); NaN for groups without any.
+    Rounded exactly like the scalar path's statistics.mean, which a sum/count would not be.
+    """
+    out = np.full(n_groups, np.nan)
+    selected = np.flatnonzero(mask)
+    if not len(selected):
+        return out
+    selected_codes = codes[selected]
+    starts = np.flatnonzero(np.r_[True, selected_codes[1:] != selected_codes[:-1]])
+    ends = np.r_[starts[1:], len(selected)]
+    selected_values = values[selected].tolist()
+    for group, start, end in zip(selected_codes[starts].tolist(), starts.tolist(), ends.tolist()):
+        out[group] = _exact_mean(selected_values[start:end])
+    return out
+
+
+def _nan_to_none(values: np.ndarray) -> list[float | None]:
+    return [None if v != v else v for v in values.tolist()]
+
+
+def clamped_linear_score_array(
+    vals: np.ndarray,
+    neutral_val: float,
+    neutral_score: float,
+    max_val: float,
+    max_score: float,
+    min_val: float,
+    min_score: float,
+) -> np.ndarray:
+    """
+    Vectorized clamped_linear_score. NaN plays the role of None (scores 0.0).
+    Branch order is identical to the scalar version.
+    """
+    slope_up = (max_score - neutral_score) / (max_val - neutral_val) if max_val != neutral_val else 0.0
+    slope_down = (neutral_score - min_score) / (neutral_val - min_val) if neutral_val != min_val else 0.0
+
+    with np.errstate(invalid="ignore"):
+        return np.select(
+            [
+                np.isnan(vals),
+                vals >= max_val,
+                vals <= min_val,
+                vals > neutral_val,
+                vals < neutral_val,
+            ],
+            [
+                0.0,
+                max_score,
+                min_score,
+                neutral_score + (vals - neutral_val) * slope_up,
+                neutral_score - (neutral_val - vals) * slope_down,
+            ],
+            default=neutral_score,
+        ).astype(np.float64)
+
+
+def compute_history_metrics_vectorized(
+    history_rows: Sequence[Mapping[str, object]],
+) -> tuple[np.ndarray, dict[str, np.ndarray]]:
+    """
+    Columnar compute_history_metrics.
+    Returns (sorted unique orgnrs, {HistoryMetrics field: array aligned to orgnrs}).
+    """
+    metric_names = [f.name for f in fields(HistoryMetrics)]
+    n = len(history_rows)
+    if n == 0:
+        return np.array([], dtype=str), {name: np.empty(0) for name in metric_names}
+
+    orgnr_keys, codes = np.unique(
+        np.array([r["orgnr"] for r in history_rows], dtype=str), return_inverse=True
+    )
+    years = np.fromiter((int(r["year"]) for r in history_rows), dtype=np.int64, count=n)
+
+    # Sort by (orgnr, year) so each company is a contiguous, chronological block
+    order = np.lexsort((years, codes))
+    codes = codes[order]
+    years = years[order]
+    col = {key: _float_column(history_rows, key)[order] for key in HISTORY_COLUMNS}
+    n_groups = len(orgnr_keys)
+
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    ends = np.r_[starts[1:], n] - 1
+
+    revenue = col["revenue"]
+    ebit = col["ebit"]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # A. ROIC: Invested Capital = Equity + Debt - Cash
+        invested_capital = col["equity"] + col["total_debt"] - col["cash_equivalents"]
+        roic_mask = invested_capital > 1000
+        roic = (ebit * 0.78) / invested_capital
+
+        # B. Cash Conversion
+        cash_mask = ebit > 0
+        cash_conv = (ebit + col["depreciation"]) / ebit
+
+        # C. NWC & Gross Margin
+        rev_mask = revenue > 0
+        nwc_sales = (col["trade_receivables"] + col["inventory"] - col["trade_payables"]) / revenue
+        gross_margin = (revenue - col["cogs"]) / revenue
+
+        # 1. CAGR (first vs last available year)
+        start_rev = revenue[starts]
+        end_rev = revenue[ends]
+        span = years[ends] - years[starts]
+        cagr_mask = (span > 0) & (start_rev > 0) & (end_rev > 0)
+        # np.power does not round like Python's ** everywhere; the few qualifying groups go
+        # through compute_cagr itself so both engines agree exactly
+        revenue_cagr = np.full(n_groups, np.nan)
+        for group in np.flatnonzero(cagr_mask).tolist():
+            revenue_cagr[group] = compute_cagr(
+                float(start_rev[group]), float(end_rev[group]), int(span[group])
+            )
+
+        # 2. Margin Trend
+        margin_mask = rev_mask[starts] & rev_mask[ends]
+        margin_change_pp = np.where(margin_mask, gross_margin[ends] - gross_margin[starts], np.nan)
+
+    # 3. Averages
+    return orgnr_keys, {
+        "revenue_cagr": revenue_cagr,
+        "avg_roic": _group_mean(codes, roic, roic_mask, n_groups),
+        "margin_change_pp": margin_change_pp,
+        "avg_cash_conversion": _group_mean(codes, cash_conv, cash_mask, n_groups),
+        "avg_nwc_sales": _group_mean(codes, nwc_sales, rev_mask, n_groups),
+    }
+
+
+def build_feature_matrix(
+    fs_current: Sequence[Mapping[str, object]],
+    history_rows: Sequence[Mapping[str, object]],
+) -> dict[str, np.ndarray]:
+    """
+    Columnar build_features: {FeatureRow metric attribute: array aligned to fs_current}.
+    """
+    n = len(fs_current)
+    orgnr_keys, history = compute_history_metrics_vectorized(history_rows)
+
+    # Align history metrics to fs_current; companies without history get NaN (None)
+    orgnrs = np.array([r["orgnr"] for r in fs_current], dtype=str)
+    feature_cols: dict[str, np.ndarray] = {name: np.full(n, np.nan) for name in history}
+    if len(orgnr_keys) and n:
+        pos = np.minimum(np.searchsorted(orgnr_keys, orgnrs), len(orgnr_keys) - 1)
+        has_history = orgnr_keys[pos] == orgnrs
+        for name, values in history.items():
+            feature_cols[name] = np.where(has_history, values[pos], np.nan)
+
+    # Snapshot Metrics
+    goodwill = _float_column(fs_current, "goodwill")
+    equity_value = _float_column(fs_current, "equity")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        feature_cols["goodwill_ratio"] = np.where(equity_value > 0, goodwill / equity_value, np.nan)
+    return feature_cols
+
+
+def score_feature_matrix(
+    fs_current: Sequence[Mapping[str, object]],
+    feature_cols: Mapping[str, np.ndarray],
+    model: ScoringModel = PRODUCTION_MODEL,
+) -> list[ScoreRow]:
+    """
+    Columnar compute_scores for one model over a matrix from build_feature_matrix.
+    """
+    n = len(fs_current)
+    component_scores: dict[str, np.ndarray] = {}
+    total_score = np.zeros(n)
+    for component in model.components:
+        component_scores[component.key] = component.weight * clamped_linear_score_array(
+            feature_cols[component.feature], **component.curve
+        )
+        total_score = total_score + component_scores[component.key]
+    total_score = np.clip(total_score, model.min_total, model.max_total)
+
+    # Back to Python objects for the write path
+    feats = {name: _nan_to_none(values) for name, values in feature_cols.items()}
+    subs = {key: values.tolist() for key, values in component_scores.items()}
+    missing = [None] * n
+    totals = total_score.tolist()
+
+    scored: list[ScoreRow] = []
+    for i, row in enumerate(fs_current):
+        scored.append(
+            ScoreRow(
+                orgnr=row["orgnr"],
+                year=row["year"],
+                quality_score=totals[i],
+                compounder_score=totals[i],
+                catalyst_score=0.0,
+                tags=format_tags(row["revenue"], feats["avg_roic"][i], feats["revenue_cagr"][i], model.model_id),
+                revenue=row["revenue"],
+                ebit=row["ebit"],
+                equity=row["equity"],
+                roic=feats["avg_roic"][i],
+                roic_score=subs.get("roic_score", missing)[i],
+                revenue_cagr=feats["revenue_cagr"][i],
+                revenue_cagr_score=subs.get("revenue_cagr_score", missing)[i],
+                margin_change=feats["margin_change_pp"][i],
+                margin_change_score=subs.get("margin_change_score", missing)[i],
+                nwc_sales=feats["avg_nwc_sales"][i],
+                nwc_sales_score=subs.get("nwc_sales_score", missing)[i],
+                goodwill_ratio=feats["goodwill_ratio"][i],
+                goodwill_ratio_score=subs.get("goodwill_ratio_score", missing)[i],
             )
         )
     return scored
 
 
-def merge_tags(existing: str | None, new_tags: str) -> str:
-    if existing is None or existing.strip() == "":
-        return new_tags
-    return f"{existing} | {new_tags}"
+def compute_scores_vectorized(
+    fs_current: Sequence[Mapping[str, object]],
+    history_rows: Sequence[Mapping[str, object]],
+    model: ScoringModel = PRODUCTION_MODEL,
+) -> list[ScoreRow]:
+    """
+    Columnar equivalent of compute_history_metrics -> build_features -> compute_scores.
+    """
+    if not fs_current:
+        return []
+    return score_feature_matrix(fs_current, build_feature_matrix(fs_current, history_rows), model)
+
+
+# Earlier runs appended each run's tags to the previous value with this separator
+LEGACY_TAG_SEPARATOR = " | "
 
 
-def upsert_scores(session: Session, scores: Iterable[ScoreRow]) -> None:
-    now = now_utc()
+def normalize_tags(tags: str | None) -> str | None:
+    """
+    Canonical tag set: ";"-separated tokens, each once; key=value tokens keep their last value.
+    A legacy appended value collapses to its latest run.
+    """
+    if tags is None or tags.strip() == "":
+        return None
+    latest = tags.rsplit(LEGACY_TAG_SEPARATOR, 1)[-1]
+    tokens: dict[str, str] = {}
+    for token in latest.split(";"):
+        token = token.strip()
+        if token:
+            tokens[token.partition("=")[0]] = token
+    return ";".join(tokens.values()) or None
+
+
+def merge_tags(existing: str | None, new_tags: str | None) -> str | None:
+    """
+    The scoring run owns score.tags and always writes its full set, so the new set
+    replaces the old one. Writing the same tags twice leaves the row unchanged.
+    """
+    return normalize_tags(new_tags) or normalize_tags(existing)
+
+
+def compact_score_tags(session: Session) -> int:
+    """
+    One-off cleanup of score.tags values grown by the old append behaviour.
+    Returns the number of rows rewritten.
+    """
+    score = models.Score
+    legacy = session.execute(
+        select(score.id, score.tags).where(score.tags.like(f"%{LEGACY_TAG_SEPARATOR}%"))
+    ).all()
+    if legacy:
+        # ORM bulk UPDATE by primary key (one executemany)
+        session.execute(update(score), [{"id": id_, "tags": normalize_tags(tags)} for id_, tags in legacy])
+    return len(legacy)
+
+
+def upsert_scores(
+    session: Session,
+    scores: Iterable[ScoreRow],
+    computed_at: datetime | None = None,
+) -> tuple[int, int]:
+    """
+    Per-row ORM upsert. Returns (inserted, updated).
+    """
+    now = computed_at or now_utc()
+    inserted = updated = 0
     for score in scores:
         existing = (
             session.query(models.Score)
@@ -453,6 +986,7 @@ def upsert_scores(session: Session, scores: Iterable[ScoreRow]) -> None:
             .one_or_none()
         )
         if existing:
+            updated += 1
             # Update basics
             existing.compounder_score = score.compounder_score
             existing.total_score = score.quality_score
@@ -480,7 +1014,7 @@ def upsert_scores(session: Session, scores: Iterable[ScoreRow]) -> None:
                 total_score=score.quality_score,
                 compounder_score=score.compounder_score,
                 catalyst_score=0.0,
-                tags=score.tags,
+                tags=normalize_tags(score.tags),
                 computed_at=now,
                 
                 # New Fields
@@ -496,6 +1030,303 @@ def upsert_scores(session: Session, scores: Iterable[ScoreRow]) -> None:
                 goodwill_ratio_score=score.goodwill_ratio_score
             )
             session.add(new_obj)
+            inserted += 1
+
+    return inserted, updated
+
+
+# ------------------------------------------------------------
+# Bulk write path (SQL Server): stage -> single MERGE
+# ------------------------------------------------------------
+SCORE_STAGE_COLUMNS = (
+    "orgnr", "year", "total_score", "compounder_score", "tags",
+    "roic", "roic_score",
+    "revenue_cagr", "revenue_cagr_score",
+    "margin_change", "margin_change_score",
+    "nwc_sales", "nwc_sales_score",
+    "goodwill_ratio", "goodwill_ratio_score",
+)
+
+# seq keeps add() order: a key staged by more than one batch is merged once, last one wins
+CREATE_SCORE_STAGE = """
+IF OBJECT_ID('tempdb..#score_stage') IS NOT NULL DROP TABLE #score_stage;
+CREATE TABLE #score_stage (
+    seq INT IDENTITY(1,1) NOT NULL PRIMARY KEY,
+    orgnr VARCHAR(9) NOT NULL,
+    [year] INT NOT NULL,
+    total_score FLOAT NOT NULL,
+    compounder_score FLOAT NOT NULL,
+    tags VARCHAR(500) NULL,
+    roic FLOAT NULL,
+    roic_score FLOAT NULL,
+    revenue_cagr FLOAT NULL,
+    revenue_cagr_score FLOAT NULL,
+    margin_change FLOAT NULL,
+    margin_change_score FLOAT NULL,
+    nwc_sales FLOAT NULL,
+    nwc_sales_score FLOAT NULL,
+    goodwill_ratio FLOAT NULL,
+    goodwill_ratio_score FLOAT NULL
+);
+"""
+
+INSERT_SCORE_STAGE = (
+    "INSERT INTO #score_stage ("
+    + ", ".join(f"[{c}]" for c in SCORE_STAGE_COLUMNS)
+    + ") VALUES ("
+    + ", ".join(f":{c}" for c in SCORE_STAGE_COLUMNS)
+    + ")"
+)
+
+# Same semantics as upsert_scores: tags are replaced with the run's set (see merge_tags),
+# catalyst_score / deployability / urgency are only set on insert.
+MERGE_SCORE_STAGE = """
+SET NOCOUNT ON;
+DECLARE @actions TABLE (merge_action NVARCHAR(10));
+
+MERGE dbo.score WITH (HOLDLOCK) AS tgt
+USING (
+    SELECT *
+    FROM (
+        SELECT s.*, ROW_NUMBER() OVER (PARTITION BY s.orgnr, s.[year] ORDER BY s.seq DESC) AS rn
+        FROM #score_stage AS s
+    ) AS d
+    WHERE d.rn = 1
+) AS src
+ON tgt.orgnr = src.orgnr
+AND tgt.[year] = src.[year]
+WHEN MATCHED THEN UPDATE SET
+    compounder_score = src.compounder_score,
+    total_score = src.total_score,
+    tags = COALESCE(src.tags, tgt.tags),
+    computed_at = :computed_at,
+    roic = src.roic,
+    roic_score = src.roic_score,
+    revenue_cagr = src.revenue_cagr,
+    revenue_cagr_score = src.revenue_cagr_score,
+    margin_change = src.margin_change,
+    margin_change_score = src.margin_change_score,
+    nwc_sales = src.nwc_sales,
+    nwc_sales_score = src.nwc_sales_score,
+    goodwill_ratio = src.goodwill_ratio,
+    goodwill_ratio_score = src.goodwill_ratio_score
+WHEN NOT MATCHED THEN
+    INSERT (
+        orgnr, [year], total_score, compounder_score, catalyst_score, tags, computed_at,
+        financial_data_availability, deployability, urgency,
+        roic, roic_score, revenue_cagr, revenue_cagr_score,
+        margin_change, margin_change_score, nwc_sales, nwc_sales_score,
+        goodwill_ratio, goodwill_ratio_score
+    )
+    VALUES (
+        src.orgnr, src.[year], src.total_score, src.compounder_score, 0.0, src.tags, :computed_at,
+        0, 1.0, 0.0,
+        src.roic, src.roic_score, src.revenue_cagr, src.revenue_cagr_score,
+        src.margin_change, src.margin_change_score, src.nwc_sales, src.nwc_sales_score,
+        src.goodwill_ratio, src.goodwill_ratio_score
+    )
+OUTPUT $action INTO @actions;
+
+SELECT
+    SUM(CASE WHEN merge_action = 'INSERT' THEN 1 ELSE 0 END) AS inserted,
+    SUM(CASE WHEN merge_action = 'UPDATE' THEN 1 ELSE 0 END) AS updated
+FROM @actions;
+"""
+
+
+# Point dbo.company_latest_score at the max-year score of every staged company.
+# Runs after MERGE_SCORE_STAGE, in the same transaction.
+REFRESH_LATEST_SCORE_FROM_STAGE = """
+MERGE dbo.company_latest_score WITH (HOLDLOCK) AS tgt
+USING (
+    SELECT ranked.orgnr, ranked.[year], ranked.score_id
+    FROM (
+        SELECT
+            s.orgnr,
+            s.[year],
+            s.id AS score_id,
+            ROW_NUMBER() OVER (PARTITION BY s.orgnr ORDER BY s.[year] DESC) AS rn
+        FROM dbo.score s
+        WHERE s.orgnr IN (SELECT orgnr FROM #score_stage)
+    ) AS ranked
+    WHERE ranked.rn = 1
+) AS src
+ON tgt.orgnr = src.orgnr
+WHEN MATCHED AND (tgt.score_id <> src.score_id OR tgt.[year] <> src.[year]) THEN UPDATE SET
+    [year] = src.[year],
+    score_id = src.score_id,
+    updated_at = :updated_at
+WHEN NOT MATCHED THEN
+    INSERT (orgnr, [year], score_id, updated_at)
+    VALUES (src.orgnr, src.[year], src.score_id, :updated_at);
+"""
+
+
+def refresh_latest_scores(
+    session: Session,
+    orgnrs: Iterable[str] | None = None,
+    updated_at: datetime | None = None,
+) -> None:
+    """
+    Portable refresh of dbo.company_latest_score: delete + INSERT ... SELECT of the
+    max-year score for the given orgnrs, or for every company when orgnrs is None.
+    """
+    updated_at = (updated_at or now_utc()).replace(tzinfo=None)
+    score, latest = models.Score, models.CompanyLatestScore
+
+    def rebuild(where_orgnr=None) -> None:
+        max_year = select(score.orgnr, func.max(score.year).label("year")).group_by(score.orgnr)
+        if where_orgnr is not None:
+            max_year = max_year.where(where_orgnr(score.orgnr))
+        max_year = max_year.subquery()
+        source = select(
+            score.orgnr,
+            score.year,
+            score.id,
+            literal(updated_at, DateTime()),
+        ).join(max_year, (score.orgnr == max_year.c.orgnr) & (score.year == max_year.c.year))
+
+        purge = delete(latest)
+        if where_orgnr is not None:
+            purge = purge.where(where_orgnr(latest.orgnr))
+        session.execute(purge)
+        session.execute(
+            insert(latest).from_select(["orgnr", "year", "score_id", "updated_at"], source)
+        )
+
+    if orgnrs is None:
+        rebuild()
+        return
+    orgnrs = sorted(set(orgnrs))
+    for i in range(0, len(orgnrs), 1000):
+        chunk = orgnrs[i:i + 1000]
+        rebuild(lambda column: column.in_(chunk))
+
+
+@dataclass
+class UpsertReport:
+    inserted: int
+    updated: int
+    timings: dict[str, float]
+
+    def summary(self) -> str:
+        phases = ", ".join(f"{name}={secs:.2f}s" for name, secs in self.timings.items())
+        return f"inserted={self.inserted} updated={self.updated} ({phases})"
+
+
+def score_stage_params(scores: Iterable[ScoreRow]) -> list[dict[str, object]]:
+    return [
+        {
+            "orgnr": score.orgnr,
+            "year": score.year,
+            "total_score": score.quality_score,
+            "compounder_score": score.compounder_score,
+            "tags": normalize_tags(score.tags),
+            "roic": score.roic,
+            "roic_score": score.roic_score,
+            "revenue_cagr": score.revenue_cagr,
+            "revenue_cagr_score": score.revenue_cagr_score,
+            "margin_change": score.margin_change,
+            "margin_change_score": score.margin_change_score,
+            "nwc_sales": score.nwc_sales,
+            "nwc_sales_score": score.nwc_sales_score,
+            "goodwill_ratio": score.goodwill_ratio,
+            "goodwill_ratio_score": score.goodwill_ratio_score,
+        }
+        for score in scores
+    ]
+
+
+class ScoreWriter:
+    """
+    Accumulates ScoreRows into #score_stage batch by batch (fast_executemany, see app.db)
+    and applies one MERGE keyed on (orgnr, year) in finish(), followed by the
+    dbo.company_latest_score refresh. Falls back to the ORM path on non-MSSQL backends.
+
+    computed_at defaults to now; incremental runs pass the time the fetch started so
+    rows fetched while the job was running are picked up by the next run.
+    """
+
+    def __init__(self, session: Session, computed_at: datetime | None = None):
+        self.session = session
+        self.computed_at = computed_at or now_utc()
+        self.use_merge = session.get_bind().dialect.name == "mssql"
+        self.timings: dict[str, float] = defaultdict(float)
+        self.inserted = 0
+        self.updated = 0
+        self._staged = 0
+        self._stage_created = False
+        self._orm_orgnrs: set[str] = set()
+
+    def add(self, scores: Iterable[ScoreRow]) -> None:
+        t0 = time.perf_counter()
+        # One row per (orgnr, year) per batch; keys repeated across batches are
+        # resolved by seq in MERGE_SCORE_STAGE
+        unique_scores = list({(score.orgnr, score.year): score for score in scores}.values())
+        self.timings["prepare"] += time.perf_counter() - t0
+        if not unique_scores:
+            return
+
+        t0 = time.perf_counter()
+        if not self.use_merge:
+            inserted, updated = upsert_scores(self.session, unique_scores, self.computed_at)
+            self.session.flush()
+            self._orm_orgnrs.update(score.orgnr for score in unique_scores)
+            self.inserted += inserted
+            self.updated += updated
+            self.timings["orm_upsert"] += time.perf_counter() - t0
+            return
+
+        if not self._stage_created:
+            self.session.execute(text(CREATE_SCORE_STAGE))
+            self._stage_created = True
+        self.session.execute(text(INSERT_SCORE_STAGE), score_stage_params(unique_scores))
+        self._staged += len(unique_scores)
+        self.timings["stage"] += time.perf_counter() - t0
+
+    def finish(self) -> UpsertReport:
+        if self._staged:
+            t0 = time.perf_counter()
+            counts = self.session.execute(
+                text(MERGE_SCORE_STAGE),
+                {"computed_at": self.computed_at.replace(tzinfo=None)},
+            ).one()
+            self.inserted += int(counts.inserted or 0)
+            self.updated += int(counts.updated or 0)
+            self.timings["merge"] += time.perf_counter() - t0
+
+            t0 = time.perf_counter()
+            self.session.execute(
+                text(REFRESH_LATEST_SCORE_FROM_STAGE),
+                {"updated_at": self.computed_at.replace(tzinfo=None)},
+            )
+            self.timings["latest"] += time.perf_counter() - t0
+        if self._orm_orgnrs:
+            t0 = time.perf_counter()
+            refresh_latest_scores(self.session, self._orm_orgnrs, self.computed_at)
+            self._orm_orgnrs.clear()
+            self.timings["latest"] += time.perf_counter() - t0
+        if self.inserted or self.updated:
+            # Invalidates the API response caches when this transaction commits
+            bump_generation(self.session)
+        if self._stage_created:
+            self.session.execute(text("DROP TABLE #score_stage"))
+            self._stage_created = False
+        self._staged = 0
+        return UpsertReport(inserted=self.inserted, updated=self.updated, timings=dict(self.timings))
+
+
+def bulk_upsert_scores(
+    session: Session,
+    scores: Iterable[ScoreRow],
+    computed_at: datetime | None = None,
+) -> UpsertReport:
+    """
+    Stage all ScoreRows and apply a single MERGE (see ScoreWriter).
+    """
+    writer = ScoreWriter(session, computed_at)
+    writer.add(scores)
+    return writer.finish()
 
 
 def print_quick_check(session: Session, year: int, limit: int = 50) -> None:
@@ -521,37 +1352,626 @@ def print_quick_check(session: Session, year: int, limit: int = 50) -> None:
         )
 
 
-def compute_quality_scores(year: int) -> None:
-    print(f"Fetching data for {year}...")
-    fs_current, ebit_history = fetch_financial_rows(year)
-    
-    print("Computing history metrics...")
+# ------------------------------------------------------------
+# Feature-hash cache (--cache)
+# ------------------------------------------------------------
+# FeatureRow attributes that feed compute_scores (snapshot context first, then metrics)
+FEATURE_HASH_FIELDS = tuple(f.name for f in fields(FeatureRow) if f.name not in ("orgnr", "year"))
+
+
+def model_fingerprint(model: ScoringModel) -> str:
+    """
+    Digest of the whole model definition, so editing a curve under the same model_id
+    still invalidates the cache.
+    """
+    return hashlib.blake2b(repr(model).encode(), digest_size=8).hexdigest()
+
+
+def feature_hash(values: Sequence[object], fingerprint: str) -> str:
+    # repr round-trips floats exactly: equal hashes mean bit-identical features
+    return hashlib.blake2b(f"{fingerprint}|{values!r}".encode(), digest_size=16).hexdigest()
+
+
+class ScoreCache:
+    """
+    {(orgnr, year): feature hash} for one scoring model, persisted in dbo.score_feature_cache.
+    The filter methods drop companies whose hash matches the last run, so they are neither
+    scored nor written; save() records the new hashes in the same transaction as the scores.
+
+    A cache row's computed_at is when its hash was last confirmed. It only counts while the
+    score is not newer, so a score rewritten by anything else (e.g. ComputeQualityScores.sql)
+    is scored again. Hits leave dbo.score alone; save(stamp_hits=True) moves the cache row's
+    computed_at forward instead, which keeps them out of the next --incremental run's
+    changed set (CHANGED_ORGNRS_SQL).
+    """
+
+    def __init__(self, model: ScoringModel = PRODUCTION_MODEL):
+        self.model = model
+        self.fingerprint = model_fingerprint(model)
+        self.stored: dict[tuple[str, int], str] = {}
+        self.pending: dict[tuple[str, int], str] = {}
+        self.hit_keys: list[tuple[str, int]] = []
+        self.hits = 0
+        self.misses = 0
+
+    def load(self, session: Session, years: Iterable[int]) -> "ScoreCache":
+        cache, score = models.ScoreFeatureCache, models.Score
+        for year in years:
+            rows = session.execute(
+                select(cache.orgnr, cache.feature_hash)
+                .join(score, (score.orgnr == cache.orgnr) & (score.year == cache.year))
+                .where(
+                    cache.model_id == self.model.model_id,
+                    cache.year == year,
+                    score.computed_at <= cache.computed_at,
+                )
+            )
+            self.stored.update(((orgnr, year), digest) for orgnr, digest in rows)
+        return self
+
+    def _changed(self, orgnr: str, year: int, values: Sequence[object]) -> bool:
+        key = (orgnr, year)
+        digest = feature_hash(values, self.fingerprint)
+        if self.stored.get(key) == digest:
+            self.hits += 1
+            self.hit_keys.append(key)
+            return False
+        self.misses += 1
+        self.pending[key] = digest
+        return True
+
+    def filter_features(self, features: Iterable[FeatureRow]) -> list[FeatureRow]:
+        return [
+            f for f in features
+            if self._changed(f.orgnr, f.year, tuple(getattr(f, name) for name in FEATURE_HASH_FIELDS))
+        ]
+
+    def changed_mask(
+        self,
+        fs_current: Sequence[Mapping[str, object]],
+        feature_cols: Mapping[str, np.ndarray],
+    ) -> np.ndarray:
+        """
+        Columnar filter_features over a matrix from build_feature_matrix.
+        """
+        columns = [
+            _nan_to_none(feature_cols[name]) if name in feature_cols else [r[name] for r in fs_current]
+            for name in FEATURE_HASH_FIELDS
+        ]
+        return np.array(
+            [
+                self._changed(row["orgnr"], row["year"], values)
+                for row, values in zip(fs_current, zip(*columns))
+            ],
+            dtype=bool,
+        )
+
+    def save(self, session: Session, computed_at: datetime | None = None, stamp_hits: bool = False) -> int:
+        """
+        Replaces the cache rows of every company scored since the last save. Pass the
+        computed_at the scores were written with. stamp_hits (--incremental runs) also
+        stamps it on the cache rows of every hit.
+        """
+        computed_at = (computed_at or now_utc()).replace(tzinfo=None)
+        cache = models.ScoreFeatureCache
+        if stamp_hits:
+            for year, orgnrs in _orgnrs_by_year(self.hit_keys).items():
+                for i in range(0, len(orgnrs), 1000):
+                    session.execute(
+                        update(cache)
+                        .where(
+                            cache.model_id == self.model.model_id,
+                            cache.year == year,
+                            cache.orgnr.in_(orgnrs[i:i + 1000]),
+                        )
+                        .values(computed_at=computed_at)
+                    )
+        self.hit_keys.clear()
+
+        for year, orgnrs in _orgnrs_by_year(self.pending).items():
+            for i in range(0, len(orgnrs), 1000):
+                session.execute(
+                    delete(cache).where(
+                        cache.model_id == self.model.model_id,
+                        cache.year == year,
+                        cache.orgnr.in_(orgnrs[i:i + 1000]),
+                    )
+                )
+        if self.pending:
+            session.execute(
+                insert(cache),
+                [
+                    {
+                        "model_id": self.model.model_id,
+                        "orgnr": orgnr,
+                        "year": year,
+                        "feature_hash": digest,
+                        "computed_at": computed_at,
+                    }
+                    for (orgnr, year), digest in self.pending.items()
+                ],
+            )
+        written = len(self.pending)
+        self.stored.update(self.pending)
+        self.pending.clear()
+        return written
+
+    def summary(self) -> str:
+        return f"cache hits={self.hits} misses={self.misses}"
+
+
+def _orgnrs_by_year(keys: Iterable[tuple[str, int]]) -> dict[int, list[str]]:
+    by_year: dict[int, list[str]] = defaultdict(list)
+    for orgnr, year in keys:
+        by_year[year].append(orgnr)
+    return by_year
+
+
+def open_score_cache(session: Session, years: Iterable[int]) -> ScoreCache:
+    # dbo.score_feature_cache comes from create_schema (python -m app.create_tables)
+    return ScoreCache(PRODUCTION_MODEL).load(session, years)
+
+
+def score_financial_rows(
+    fs_current: Sequence[Mapping[str, object]],
+    ebit_history: Sequence[Mapping[str, object]],
+    engine_name: str = "scalar",
+    cache: ScoreCache | None = None,
+) -> list[ScoreRow]:
+    """
+    Scores fs_current with the production model. With a cache, companies whose
+    features are unchanged since the last run are dropped before scoring.
+    """
+    if engine_name == "vectorized":
+        if cache is None:
+            return compute_scores_vectorized(fs_current, ebit_history)
+        if not fs_current:
+            return []
+        matrix = build_feature_matrix(fs_current, ebit_history)
+        changed = cache.changed_mask(fs_current, matrix)
+        return score_feature_matrix(
+            [row for row, keep in zip(fs_current, changed) if keep],
+            {name: values[changed] for name, values in matrix.items()},
+            cache.model,
+        )
     history_metrics = compute_history_metrics(ebit_history)
-    
-    print("Building features...")
     features = build_features(fs_current, history_metrics)
-    
-    print("Computing scores...")
-    scores = compute_scores(features)
+    if cache is not None:
+        return compute_scores(cache.filter_features(features), cache.model)
+    return compute_scores(features)
+
+
+def score_models(
+    fs_current: Sequence[Mapping[str, object]],
+    ebit_history: Sequence[Mapping[str, object]],
+    scoring_models: Sequence[ScoringModel],
+    engine_name: str = "scalar",
+) -> dict[str, list[ScoreRow]]:
+    """
+    Scores several models over one feature build: {model_id: ScoreRows}.
+    """
+    if engine_name == "vectorized":
+        if not fs_current:
+            return {model.model_id: [] for model in scoring_models}
+        matrix = build_feature_matrix(fs_current, ebit_history)
+        return {model.model_id: score_feature_matrix(fs_current, matrix, model) for model in scoring_models}
+
+    features = build_features(fs_current, compute_history_metrics(ebit_history))
+    return {model.model_id: compute_scores(features, model) for model in scoring_models}
+
+
+def write_model_scores(
+    session: Session,
+    model_id: str,
+    scores: Sequence[ScoreRow],
+    computed_at: datetime | None = None,
+) -> int:
+    """
+    Replaces dbo.score_model_result rows for (model_id, orgnr, year) with the given scores.
+    Delete + executemany insert keeps it idempotent without a per-row lookup.
+    """
+    computed_at = (computed_at or now_utc()).replace(tzinfo=None)
+    result = models.ScoreModelResult
+
+    by_year: dict[int, list[str]] = defaultdict(list)
+    for score in scores:
+        by_year[score.year].append(score.orgnr)
+    for year, orgnrs in by_year.items():
+        # Chunked IN lists stay under SQL Server's 2100-parameter limit
+        for i in range(0, len(orgnrs), 1000):
+            session.execute(
+                delete(result).where(
+                    result.model_id == model_id,
+                    result.year == year,
+                    result.orgnr.in_(orgnrs[i:i + 1000]),
+                )
+            )
+
+    if scores:
+        session.execute(
+            insert(result),
+            [
+                {
+                    "model_id": model_id,
+                    "orgnr": score.orgnr,
+                    "year": score.year,
+                    "total_score": score.compounder_score,
+                    "roic_score": score.roic_score,
+                    "revenue_cagr_score": score.revenue_cagr_score,
+                    "margin_change_score": score.margin_change_score,
+                    "nwc_sales_score": score.nwc_sales_score,
+                    "goodwill_ratio_score": score.goodwill_ratio_score,
+                    "tags": score.tags,
+                    "computed_at": computed_at,
+                }
+                for score in scores
+            ],
+        )
+    return len(scores)
+
+
+# ------------------------------------------------------------
+# Process-pool scoring (--workers N)
+# ------------------------------------------------------------
+@dataclass
+class RowBatch:
+    """
+    Compact, picklable stand-in for a list of SQLAlchemy row mappings:
+    column names once, then plain tuples.
+    """
+    columns: tuple[str, ...]
+    rows: list[tuple]
+
+    @classmethod
+    def from_mappings(cls, rows: Sequence[Mapping[str, object]]) -> "RowBatch":
+        if not rows:
+            return cls(columns=(), rows=[])
+        columns = tuple(rows[0].keys())
+        return cls(columns=columns, rows=[tuple(r[c] for c in columns) for r in rows])
+
+    def to_dicts(self) -> list[dict[str, object]]:
+        return [dict(zip(self.columns, r)) for r in self.rows]
+
+
+def shard_for_orgnr(orgnr: str, n_shards: int) -> int:
+    # crc32 rather than hash(): str hashes are salted per process
+    return zlib.crc32(orgnr.encode("ascii")) % n_shards
+
+
+def shard_financial_rows(
+    fs_current: Sequence[Mapping[str, object]],
+    ebit_history: Sequence[Mapping[str, object]],
+    n_shards: int,
+) -> list[tuple[RowBatch, RowBatch]]:
+    """
+    Splits (fs_current, ebit_history) by orgnr so each company's full history lands in one shard.
+    """
+    fs_parts: list[list[Mapping[str, object]]] = [[] for _ in range(n_shards)]
+    history_parts: list[list[Mapping[str, object]]] = [[] for _ in range(n_shards)]
+    for row in fs_current:
+        fs_parts[shard_for_orgnr(row["orgnr"], n_shards)].append(row)
+    for row in ebit_history:
+        history_parts[shard_for_orgnr(row["orgnr"], n_shards)].append(row)
+    return [
+        (RowBatch.from_mappings(fs_part), RowBatch.from_mappings(history_part))
+        for fs_part, history_part in zip(fs_parts, history_parts)
+        if fs_part
+    ]
+
+
+def _score_shard(fs_batch: RowBatch, history_batch: RowBatch, engine_name: str) -> list[ScoreRow]:
+    # Runs in a worker process
+    return score_financial_rows(fs_batch.to_dicts(), history_batch.to_dicts(), engine_name)
+
+
+def score_financial_rows_parallel(
+    executor: ProcessPoolExecutor,
+    n_shards: int,
+    fs_current: Sequence[Mapping[str, object]],
+    ebit_history: Sequence[Mapping[str, object]],
+    engine_name: str = "scalar",
+) -> list[ScoreRow]:
+    """
+    score_financial_rows, sharded by orgnr across a process pool.
+    Results are merged in (year, orgnr) order so the output does not depend on scheduling.
+    """
+    futures = [
+        executor.submit(_score_shard, fs_batch, history_batch, engine_name)
+        for fs_batch, history_batch in shard_financial_rows(fs_current, ebit_history, n_shards)
+    ]
+    scores = [score for future in futures for score in future.result()]
+    scores.sort(key=lambda score: (score.year, score.orgnr))
+    return scores
+
+
+def make_executor(workers: int) -> ProcessPoolExecutor | nullcontext:
+    return ProcessPoolExecutor(max_workers=workers) if workers > 1 else nullcontext()
+
+
+def compute_quality_scores(
+    year: int,
+    engine_name: str = "scalar",
+    incremental: bool = False,
+    workers: int = 1,
+    stream: bool = False,
+    use_cache: bool = False,
+) -> None:
+    if stream:
+        compute_quality_scores_streaming(year, engine_name, incremental, workers, use_cache=use_cache)
+        return
+
+    run_started_at = now_utc()
+    print(f"Fetching {'changed' if incremental else 'all'} data for {year}...")
+    fs_current, ebit_history = fetch_financial_rows(year, incremental=incremental)
+
+    if incremental:
+        print(f"{len(fs_current)} companies changed since their last score.")
+        if not fs_current:
+            return
+
+    cache = None
+    if use_cache:
+        with SessionLocal() as session:
+            cache = open_score_cache(session, [year])
+
+    print(f"Computing scores ({engine_name}, workers={workers})...")
+    with make_executor(workers) as executor:
+        if executor:
+            scores = score_financial_rows_parallel(executor, workers, fs_current, ebit_history, engine_name)
+        else:
+            scores = score_financial_rows(fs_current, ebit_history, engine_name, cache)
 
     print("Upserting to database...")
     with SessionLocal() as session:
-        upsert_scores(session, scores)
+        report = bulk_upsert_scores(session, scores, computed_at=run_started_at)
+        if cache:
+            cache.save(session, run_started_at, stamp_hits=incremental)
         session.commit()
+        print(f"Upsert done: {report.summary()}")
+        if cache:
+            print(f"Score cache: {cache.summary()}")
         print_quick_check(session, year)
 
 
+def compute_quality_scores_streaming(
+    year: int,
+    engine_name: str = "scalar",
+    incremental: bool = False,
+    workers: int = 1,
+    batch_companies: int = STREAM_BATCH_COMPANIES,
+    use_cache: bool = False,
+) -> None:
+    """
+    Streaming variant of compute_quality_scores: scores and stages one batch of complete
+    company groups at a time, then applies a single MERGE. The read runs on its own
+    connection, so the score writes do not interleave with the open cursor.
+    """
+    run_started_at = now_utc()
+    print(f"Streaming {'changed' if incremental else 'all'} data for {year}...")
+
+    batches = iter_scoring_batches(stream_financial_groups(year, incremental), year, batch_companies)
+    with SessionLocal() as session, make_executor(workers) as executor:
+        cache = open_score_cache(session, [year]) if use_cache else None
+        writer = ScoreWriter(session, computed_at=run_started_at)
+        scored = 0
+        for fs_current, ebit_history in batches:
+            if executor:
+                scores = score_financial_rows_parallel(executor, workers, fs_current, ebit_history, engine_name)
+            else:
+                scores = score_financial_rows(fs_current, ebit_history, engine_name, cache)
+            writer.add(scores)
+            scored += len(scores)
+            print(f"Scored {scored} companies ({engine_name}, workers={workers})...")
+
+        print("Merging into dbo.score...")
+        report = writer.finish()
+        if cache:
+            cache.save(session, run_started_at, stamp_hits=incremental)
+        session.commit()
+        print(f"Upsert done: {report.summary()}")
+        if cache:
+            print(f"Score cache: {cache.summary()}")
+        print_quick_check(session, year)
+
+
+def compute_quality_scores_for_years(
+    years: Sequence[int],
+    engine_name: str = "scalar",
+    workers: int = 1,
+    use_cache: bool = False,
+) -> None:
+    """
+    Backtest mode: one history load for all years, one bulk write for all scores.
+    """
+    run_started_at = now_utc()
+    print(f"Fetching history for {years[0]}-{years[-1]}...")
+    t0 = time.perf_counter()
+    history_by_orgnr = group_history_by_orgnr(fetch_financial_history(years[0], years[-1]))
+    print(f"Loaded {len(history_by_orgnr)} companies in {time.perf_counter() - t0:.2f}s")
+
+    cache = None
+    if use_cache:
+        with SessionLocal() as session:
+            cache = open_score_cache(session, years)
+
+    scores: list[ScoreRow] = []
+    with make_executor(workers) as executor:
+        for year, fs_current, ebit_history in iter_year_windows(history_by_orgnr, years):
+            if executor:
+                year_scores = score_financial_rows_parallel(
+                    executor, workers, fs_current, ebit_history, engine_name
+                )
+            else:
+                year_scores = score_financial_rows(fs_current, ebit_history, engine_name, cache)
+            print(f"{year}: scored {len(year_scores)} companies ({engine_name}, workers={workers})")
+            scores.extend(year_scores)
+
+    print("Upserting to database...")
+    with SessionLocal() as session:
+        report = bulk_upsert_scores(session, scores, computed_at=run_started_at)
+        if cache:
+            cache.save(session, run_started_at)
+        session.commit()
+        print(f"Upsert done: {report.summary()}")
+        if cache:
+            print(f"Score cache: {cache.summary()}")
+        print_quick_check(session, years[-1])
+
+
+def compare_scoring_models(
+    years: Sequence[int],
+    model_ids: Sequence[str],
+    engine_name: str = "scalar",
+) -> None:
+    """
+    Evaluates several registered models over the same loaded history and features,
+    storing each model's scores in dbo.score_model_result. dbo.score is not touched.
+    """
+    scoring_models = [SCORING_MODELS[model_id] for model_id in model_ids]
+    run_started_at = now_utc()
+    print(f"Fetching history for {years[0]}-{years[-1]}...")
+    history_by_orgnr = group_history_by_orgnr(fetch_financial_history(years[0], years[-1]))
+
+    results: dict[str, list[ScoreRow]] = defaultdict(list)
+    for year, fs_current, ebit_history in iter_year_windows(history_by_orgnr, years):
+        for model_id, scores in score_models(fs_current, ebit_history, scoring_models, engine_name).items():
+            results[model_id].extend(scores)
+        print(f"{year}: scored {len(fs_current)} companies x {len(scoring_models)} models ({engine_name})")
+
+    with SessionLocal() as session:
+        for model_id in model_ids:
+            written = write_model_scores(session, model_id, results[model_id], run_started_at)
+            totals = [s.compounder_score for s in results[model_id]]
+            avg = mean(totals) if totals else float("nan")
+            print(f"{model_id:<16} rows={written:<7} avg_score={avg:.2f}")
+        session.commit()
+
+
+def parse_year_range(value: str) -> list[int]:
+    """
+    "2015-2024" -> [2015, ..., 2024]; "2020" -> [2020].
+    """
+    start, _, end = value.partition("-")
+    try:
+        first, last = int(start), int(end or start)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Expected YYYY or YYYY-YYYY, got '{value}'")
+    if last < first:
+        raise argparse.ArgumentTypeError(f"Year range is reversed: '{value}'")
+    return list(range(first, last + 1))
+
+
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Compute quality scores in Python.")
-    parser.add_argument("--year", type=int, default=datetime.now().year)
-    return parser.parse_args()
+    period = parser.add_mutually_exclusive_group()
+    period.add_argument("--year", type=int, default=DEFAULT_YEAR)
+    period.add_argument(
+        "--years",
+        type=parse_year_range,
+        default=None,
+        help="Score a range of years (e.g. 2015-2024) from a single history load.",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=("scalar", "vectorized"),
+        default="scalar",
+        help="Scoring engine: per-company Python loop (scalar) or columnar NumPy (vectorized).",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only rescore companies whose financial_statement history changed since their last score.",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Stream the history ORDER BY orgnr and score/stage it in batches (bounded memory).",
+    )
+    parser.add_argument(
+        "--models",
+        type=lambda value: [m.strip() for m in value.split(",") if m.strip()],
+        default=None,
+        help="Comma-separated model ids to score side by side into dbo.score_model_result "
+             "(e.g. QS_v2,QS_v3). Production dbo.score is left untouched.",
+    )
+    parser.add_argument(
+        "--model-file",
+        type=Path,
+        action="append",
+        default=[],
+        help="JSON file with candidate scoring models to register (repeatable).",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Score in N worker processes, sharded by orgnr (1 = in-process).",
+    )
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Skip companies whose features and model are unchanged since the last run "
+             "(hashes kept in dbo.score_feature_cache).",
+    )
+    parser.add_argument(
+        "--rebuild-latest",
+        action="store_true",
+        help="Only rebuild dbo.company_latest_score from dbo.score (backfill), then exit.",
+    )
+    parser.add_argument(
+        "--compact-tags",
+        action="store_true",
+        help="Only collapse score.tags values grown by the old append behaviour, then exit.",
+    )
+    args = parser.parse_args()
+    if args.years and args.incremental:
+        parser.error("--incremental is only supported for a single --year")
+    if args.years and args.stream:
+        parser.error("--stream is only supported for a single --year")
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.cache and args.workers > 1:
+        parser.error("--cache filters features in-process; drop --workers")
+    for path in args.model_file:
+        load_model_file(path)
+    if args.models:
+        unknown = [m for m in args.models if m not in SCORING_MODELS]
+        if unknown:
+            parser.error(f"Unknown model id(s) {unknown}; registered: {sorted(SCORING_MODELS)}")
+        if args.incremental or args.stream or args.workers > 1 or args.cache:
+            parser.error("--models runs a full in-process comparison; drop --incremental/--stream/--workers/--cache")
+    return args
 
 
 def main() -> None:
     args = parse_args()
-    # Hardcoded to 2024 per your previous logic, or use args.year
-    target_year = 2024 
-    compute_quality_scores(target_year)
+    if args.rebuild_latest:
+        with SessionLocal() as session:
+            refresh_latest_scores(session)
+            bump_generation(session)
+            session.commit()
+        print("Rebuilt dbo.company_latest_score.")
+    elif args.compact_tags:
+        with SessionLocal() as session:
+            compacted = compact_score_tags(session)
+            bump_generation(session)
+            session.commit()
+        print(f"Compacted tags on {compacted} score rows.")
+    elif args.models:
+        compare_scoring_models(args.years or [args.year], args.models, engine_name=args.engine)
+    elif args.years:
+        compute_quality_scores_for_years(
+            args.years, engine_name=args.engine, workers=args.workers, use_cache=args.cache
+        )
+    else:
+        compute_quality_scores(
+            args.year,
+            engine_name=args.engine,
+            incremental=args.incremental,
+            workers=args.workers,
+            stream=args.stream,
+            use_cache=args.cache,
+        )
 
 
 if __name__ == "__main__":
@@ -1,11 +1,19 @@
 from __future__ import annotations
 
+import argparse
+import hashlib
 import os
 import re
 import shutil
+import sys
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from multiprocessing import Manager
+from queue import Empty
 from datetime import datetime, timezone, date
 from pathlib import Path
-from typing import Any, Dict, Iterable, Optional, Tuple
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
 
 from dotenv import load_dotenv
 from openpyxl import load_workbook
@@ -13,6 +21,12 @@ from urllib.parse import quote_plus
 
 from sqlalchemy import create_engine, text
 
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from app.generation import bump_generation
+
 
 # ------------------------------------------------------------
 # Config
@@ -50,7 +64,8 @@ def make_engine():
         "TrustServerCertificate=yes;"
     )
     url = "mssql+pyodbc:///?odbc_connect=" + quote_plus(odbc_str)
-    return create_engine(url, future=True, pool_pre_ping=True)
+    # fast_executemany: the #stage inserts go out as one bulk parameter array per batch
+    return create_engine(url, future=True, pool_pre_ping=True, fast_executemany=True)
 
 
 # ------------------------------------------------------------
@@ -122,26 +137,59 @@ def parse_date(v: Any) -> Optional[date]:
             pass
     return None
 
-def read_sheet_as_rows(ws) -> Tuple[list[str], list[dict[str, Any]]]:
+@dataclass(frozen=True)
+class SheetHeader:
+    """
+    Header row of a sheet: rows stay plain tuples and cells are looked up by header text.
+    metric_columns is the "<prefix>, <year>" plan extract_year_metrics runs per row.
+    """
+    names: Tuple[str, ...]
+    index: Dict[str, int]
+    metric_columns: Tuple[Tuple[int, str, int], ...] = ()
+
+    @classmethod
+    def from_row(cls, header_row: Iterable[Any]) -> "SheetHeader":
+        names = tuple(str(h).strip() if h is not None else "" for h in header_row)
+        # A repeated header resolves to its last column
+        return cls(
+            names=names,
+            index={name: i for i, name in enumerate(names)},
+            metric_columns=year_metric_columns(names),
+        )
+
+    def get(self, row: tuple, name: str) -> Any:
+        i = self.index.get(name)
+        return row[i] if i is not None and i < len(row) else None
+
+
+def iter_sheet_batches(ws, batch_rows: int) -> Tuple[SheetHeader, Iterator[list[tuple]]]:
     """
-    Returns (headers, rows), where each row is dict header->cell_value.
+    Returns (header, batches) for a read-only worksheet. Rows are yielded as value tuples
+    (cut to the header width) in lists of at most batch_rows; fully empty lines are skipped.
     """
     rows_iter = ws.iter_rows(values_only=True)
-    header_row = next(rows_iter, None)
-    if not header_row:
-        return [], []
-
-    headers = [str(h).strip() if h is not None else "" for h in header_row]
-    out_rows: list[dict[str, Any]] = []
-    for r in rows_iter:
-        if r is None:
-            continue
-        row_dict = {headers[i]: r[i] for i in range(min(len(headers), len(r)))}
-        # skip fully empty lines
-        if all(v is None or str(v).strip() == "" for v in row_dict.values()):
-            continue
-        out_rows.append(row_dict)
-    return headers, out_rows
+    header = SheetHeader.from_row(next(rows_iter, None) or ())
+    width = len(header.names)
+
+    def batches() -> Iterator[list[tuple]]:
+        batch: list[tuple] = []
+        if not width:
+            return
+        for r in rows_iter:
+            if r is None:
+                continue
+            r = r[:width]
+            # skip fully empty lines
+            if all(v is None or str(v).strip() == "" for v in r):
+                continue
+            batch.append(r)
+            if len(batch) >= batch_rows:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    return header, batches()
 
 
 # ------------------------------------------------------------
@@ -178,24 +226,149 @@ END;
 
 
 # ------------------------------------------------------------
-# SQL MERGE statements
+# Bulk staging: parsed rows go into #stage temp tables (fast_executemany),
+# then one set-based MERGE per target table.
 # (Assumes dbo.company columns exist: orgnr, name, phone, email, website, municipality, nace, etc.)
 # If any column doesn't exist in your dbo.company, remove it here.
 # ------------------------------------------------------------
-MERGE_COMPANY = """
+# Rows per executemany into the stage tables
+IMPORT_BATCH_ROWS = int(os.getenv("IMPORT_BATCH_ROWS", "5000"))
+# Sheet rows per parse batch; Firmainfo rows are wide (one column per metric and year)
+IMPORT_PARSE_BATCH_ROWS = int(os.getenv("IMPORT_PARSE_BATCH_ROWS", "1000"))
+
+COMPANY_STAGE_COLUMNS = ("orgnr", "name", "phone", "email", "website", "municipality", "nace")
+
+FIN_STAGE_COLUMNS = (
+    "orgnr", "year", "revenue", "ebitda", "ebit", "cfo", "assets", "equity", "net_debt",
+    "cogs", "payroll_expenses", "depreciation", "inventory", "trade_receivables",
+    "trade_payables", "cash_equivalents", "goodwill", "dividend", "total_debt",
+)
+
+FIN_ITEM_STAGE_COLUMNS = ("orgnr", "fiscal_year", "code", "value")
+
+CONTACT_STAGE_COLUMNS = (
+    "orgnr", "company_name", "person_name", "role", "started_date", "phone", "email",
+    "postal_address", "postal_postnr", "postal_city",
+    "business_address", "business_postnr", "business_city",
+    "revenue", "employees",
+)
+
+ROW_LEDGER_STAGE_COLUMNS = ("sheet", "key_hash", "orgnr", "row_hash")
+
+# seq keeps sheet order: when a key repeats within a file, the last row wins (see the MERGEs)
+CREATE_IMPORT_STAGES = """
+IF OBJECT_ID('tempdb..#company_stage') IS NOT NULL DROP TABLE #company_stage;
+CREATE TABLE #company_stage (
+    seq INT IDENTITY(1,1) NOT NULL PRIMARY KEY,
+    orgnr VARCHAR(9) NOT NULL,
+    name NVARCHAR(255) NULL,
+    phone NVARCHAR(50) NULL,
+    email NVARCHAR(255) NULL,
+    website NVARCHAR(255) NULL,
+    municipality NVARCHAR(100) NULL,
+    nace NVARCHAR(20) NULL
+);
+
+IF OBJECT_ID('tempdb..#fin_stage') IS NOT NULL DROP TABLE #fin_stage;
+CREATE TABLE #fin_stage (
+    seq INT IDENTITY(1,1) NOT NULL PRIMARY KEY,
+    orgnr VARCHAR(9) NOT NULL,
+    [year] INT NOT NULL,
+    revenue FLOAT NULL,
+    ebitda FLOAT NULL,
+    ebit FLOAT NULL,
+    cfo FLOAT NULL,
+    assets FLOAT NULL,
+    equity FLOAT NULL,
+    net_debt FLOAT NULL,
+    cogs FLOAT NULL,
+    payroll_expenses FLOAT NULL,
+    depreciation FLOAT NULL,
+    inventory FLOAT NULL,
+    trade_receivables FLOAT NULL,
+    trade_payables FLOAT NULL,
+    cash_equivalents FLOAT NULL,
+    goodwill FLOAT NULL,
+    dividend FLOAT NULL,
+    total_debt FLOAT NULL
+);
+
+IF OBJECT_ID('tempdb..#fin_item_stage') IS NOT NULL DROP TABLE #fin_item_stage;
+CREATE TABLE #fin_item_stage (
+    seq INT IDENTITY(1,1) NOT NULL PRIMARY KEY,
+    orgnr VARCHAR(9) NOT NULL,
+    fiscal_year INT NOT NULL,
+    code VARCHAR(20) NOT NULL,
+    value FLOAT NOT NULL
+);
+
+IF OBJECT_ID('tempdb..#contact_stage') IS NOT NULL DROP TABLE #contact_stage;
+CREATE TABLE #contact_stage (
+    seq INT IDENTITY(1,1) NOT NULL PRIMARY KEY,
+    orgnr VARCHAR(9) NOT NULL,
+    company_name NVARCHAR(255) NULL,
+    person_name NVARCHAR(255) NOT NULL,
+    role NVARCHAR(100) NULL,
+    started_date DATE NULL,
+    phone NVARCHAR(50) NULL,
+    email NVARCHAR(255) NULL,
+    postal_address NVARCHAR(255) NULL,
+    postal_postnr NVARCHAR(20) NULL,
+    postal_city NVARCHAR(100) NULL,
+    business_address NVARCHAR(255) NULL,
+    business_postnr NVARCHAR(20) NULL,
+    business_city NVARCHAR(100) NULL,
+    revenue FLOAT NULL,
+    employees INT NULL
+);
+
+IF OBJECT_ID('tempdb..#row_ledger_stage') IS NOT NULL DROP TABLE #row_ledger_stage;
+CREATE TABLE #row_ledger_stage (
+    seq INT IDENTITY(1,1) NOT NULL PRIMARY KEY,
+    sheet NVARCHAR(100) NOT NULL,
+    key_hash BINARY(16) NOT NULL,
+    orgnr VARCHAR(9) NOT NULL,
+    row_hash BINARY(16) NOT NULL
+);
+"""
+
+DROP_IMPORT_STAGES = """
+DROP TABLE #company_stage;
+DROP TABLE #fin_stage;
+DROP TABLE #fin_item_stage;
+DROP TABLE #contact_stage;
+DROP TABLE #row_ledger_stage;
+"""
+
+
+def stage_insert_sql(table: str, columns: Tuple[str, ...]) -> str:
+    # qmark placeholders: rows go straight to pyodbc's executemany as tuples
+    return (
+        f"INSERT INTO {table} ("
+        + ", ".join(f"[{c}]" for c in columns)
+        + ") VALUES ("
+        + ", ".join("?" for _ in columns)
+        + ")"
+    )
+
+
+STAGE_INSERTS = {
+    "#company_stage": stage_insert_sql("#company_stage", COMPANY_STAGE_COLUMNS),
+    "#fin_stage": stage_insert_sql("#fin_stage", FIN_STAGE_COLUMNS),
+    "#fin_item_stage": stage_insert_sql("#fin_item_stage", FIN_ITEM_STAGE_COLUMNS),
+    "#contact_stage": stage_insert_sql("#contact_stage", CONTACT_STAGE_COLUMNS),
+    "#row_ledger_stage": stage_insert_sql("#row_ledger_stage", ROW_LEDGER_STAGE_COLUMNS),
+}
+
+MERGE_COMPANY_STAGE = """
 MERGE dbo.company WITH (HOLDLOCK) AS tgt
-USING (SELECT
-    :orgnr AS orgnr,
-    :name AS name,
-    :phone AS phone,
-    :email AS email,
-    :website AS website,
-    :municipality AS municipality,
-    :nace AS nace,
-    :nace_desc AS nace_desc,
-    :orgform AS orgform,
-    :status AS status,
-    SYSUTCDATETIME() AS updated_at
+USING (
+    SELECT *
+    FROM (
+        SELECT s.*, ROW_NUMBER() OVER (PARTITION BY s.orgnr ORDER BY s.seq DESC) AS rn
+        FROM #company_stage AS s
+    ) AS d
+    WHERE d.rn = 1
 ) AS src
 ON tgt.orgnr = src.orgnr
 WHEN MATCHED THEN UPDATE SET
@@ -205,39 +378,23 @@ WHEN MATCHED THEN UPDATE SET
     website = COALESCE(src.website, tgt.website),
     municipality = COALESCE(src.municipality, tgt.municipality),
     nace = COALESCE(src.nace, tgt.nace),
-    updated_at = src.updated_at
+    updated_at = SYSUTCDATETIME()
 WHEN NOT MATCHED THEN
     INSERT (orgnr, name, phone, email, website, municipality, nace, created_at, updated_at)
-    VALUES (src.orgnr, src.name, src.phone, src.email, src.website, src.municipality, src.nace, SYSUTCDATETIME(), src.updated_at);
+    VALUES (src.orgnr, src.name, src.phone, src.email, src.website, src.municipality, src.nace, SYSUTCDATETIME(), SYSUTCDATETIME());
 """
 
 # Financial statement: your table schema uses (orgnr, year, account_view) conceptually.
 # We'll MERGE by (orgnr, year, account_view) by matching with ISNULL(account_view,'company').
-MERGE_FIN_STATEMENT = """
+MERGE_FIN_STATEMENT_STAGE = """
 MERGE dbo.financial_statement WITH (HOLDLOCK) AS tgt
-USING (SELECT
-    :orgnr AS orgnr,
-    :year AS [year],
-    :account_view AS account_view,
-    :revenue AS revenue,
-    :ebitda AS ebitda,
-    :ebit AS ebit,
-    :cfo AS cfo,
-    :assets AS assets,
-    :equity AS equity,
-    :net_debt AS net_debt,
-    :source AS source,
-    :fetched_at_utc AS fetched_at_utc,
-    :cogs AS cogs,
-    :payroll_expenses AS payroll_expenses,
-    :depreciation AS depreciation,
-    :inventory AS inventory,
-    :trade_receivables AS trade_receivables,
-    :trade_payables AS trade_payables,
-    :cash_equivalents AS cash_equivalents,
-    :goodwill AS goodwill,
-    :dividend AS dividend,
-    :total_debt AS total_debt
+USING (
+    SELECT *, :account_view AS account_view
+    FROM (
+        SELECT s.*, ROW_NUMBER() OVER (PARTITION BY s.orgnr, s.[year] ORDER BY s.seq DESC) AS rn
+        FROM #fin_stage AS s
+    ) AS d
+    WHERE d.rn = 1
 ) AS src
 ON tgt.orgnr = src.orgnr
 AND tgt.[year] = src.[year]
@@ -260,8 +417,8 @@ WHEN MATCHED THEN UPDATE SET
     goodwill = COALESCE(src.goodwill, tgt.goodwill),
     dividend = COALESCE(src.dividend, tgt.dividend),
     total_debt = COALESCE(src.total_debt, tgt.total_debt),
-    source = src.source,
-    fetched_at_utc = src.fetched_at_utc,
+    source = :source,
+    fetched_at_utc = :fetched_at_utc,
     account_view = COALESCE(tgt.account_view, src.account_view, 'company')
 WHEN NOT MATCHED THEN
     INSERT (
@@ -298,8 +455,8 @@ WHEN NOT MATCHED THEN
         src.assets,
         src.equity,
         src.net_debt,
-        src.source,
-        src.fetched_at_utc,
+        :source,
+        :fetched_at_utc,
         src.account_view,
         src.cogs,
         src.payroll_expenses,
@@ -315,18 +472,15 @@ WHEN NOT MATCHED THEN
 """
 
 # Optional: also upsert selected codes into proff_financial_item (if you want to keep that fact table aligned)
-MERGE_PROFF_FIN_ITEM = """
+MERGE_PROFF_FIN_ITEM_STAGE = """
 MERGE dbo.proff_financial_item WITH (HOLDLOCK) AS tgt
-USING (SELECT
-    :orgnr AS orgnr,
-    :fiscal_year AS fiscal_year,
-    :account_view AS account_view,
-    :code AS code,
-    :value AS value,
-    :currency AS currency,
-    :unit AS unit,
-    :fetched_at_utc AS fetched_at_utc,
-    :source AS source
+USING (
+    SELECT *, :account_view AS account_view
+    FROM (
+        SELECT s.*, ROW_NUMBER() OVER (PARTITION BY s.orgnr, s.fiscal_year, s.code ORDER BY s.seq DESC) AS rn
+        FROM #fin_item_stage AS s
+    ) AS d
+    WHERE d.rn = 1
 ) AS src
 ON tgt.orgnr = src.orgnr
 AND tgt.fiscal_year = src.fiscal_year
@@ -334,35 +488,28 @@ AND tgt.account_view = src.account_view
 AND tgt.code = src.code
 WHEN MATCHED THEN UPDATE SET
     value = src.value,
-    currency = COALESCE(src.currency, tgt.currency),
-    unit = COALESCE(src.unit, tgt.unit),
-    fetched_at_utc = src.fetched_at_utc,
-    source = src.source
+    currency = COALESCE(:currency, tgt.currency),
+    fetched_at_utc = :fetched_at_utc,
+    source = :source
 WHEN NOT MATCHED THEN
     INSERT (orgnr, fiscal_year, account_view, code, value, currency, unit, fetched_at_utc, source)
-    VALUES (src.orgnr, src.fiscal_year, src.account_view, src.code, src.value, src.currency, src.unit, src.fetched_at_utc, src.source);
+    VALUES (src.orgnr, src.fiscal_year, src.account_view, src.code, src.value, :currency, NULL, :fetched_at_utc, :source);
 """
 
-MERGE_CONTACT = """
+MERGE_CONTACT_STAGE = """
 MERGE dbo.company_contact_person WITH (HOLDLOCK) AS tgt
-USING (SELECT
-    :orgnr AS orgnr,
-    :company_name AS company_name,
-    :person_name AS person_name,
-    :role AS role,
-    TRY_CONVERT(date, :started_date) AS started_date,
-    :phone AS phone,
-    :email AS email,
-    :postal_address AS postal_address,
-    :postal_postnr AS postal_postnr,
-    :postal_city AS postal_city,
-    :business_address AS business_address,
-    :business_postnr AS business_postnr,
-    :business_city AS business_city,
-    :revenue AS revenue,
-    :employees AS employees,
-    :source_file AS source_file,
-    SYSUTCDATETIME() AS imported_at_utc
+USING (
+    SELECT *
+    FROM (
+        SELECT
+            s.*,
+            ROW_NUMBER() OVER (
+                PARTITION BY s.orgnr, s.person_name, ISNULL(s.role, ''), ISNULL(s.started_date, '1900-01-01')
+                ORDER BY s.seq DESC
+            ) AS rn
+        FROM #contact_stage AS s
+    ) AS d
+    WHERE d.rn = 1
 ) AS src
 ON tgt.orgnr = src.orgnr
 AND tgt.person_name = src.person_name
@@ -380,8 +527,8 @@ WHEN MATCHED THEN UPDATE SET
     business_city = COALESCE(src.business_city, tgt.business_city),
     revenue = COALESCE(src.revenue, tgt.revenue),
     employees = COALESCE(src.employees, tgt.employees),
-    source_file = COALESCE(src.source_file, tgt.source_file),
-    imported_at_utc = src.imported_at_utc
+    source_file = COALESCE(:source_file, tgt.source_file),
+    imported_at_utc = SYSUTCDATETIME()
 WHEN NOT MATCHED THEN
     INSERT (
         orgnr, company_name, person_name, role, started_date, phone, email,
@@ -393,11 +540,115 @@ WHEN NOT MATCHED THEN
         src.orgnr, src.company_name, src.person_name, src.role, src.started_date, src.phone, src.email,
         src.postal_address, src.postal_postnr, src.postal_city,
         src.business_address, src.business_postnr, src.business_city,
-        src.revenue, src.employees, src.source_file, src.imported_at_utc
+        src.revenue, src.employees, :source_file, SYSUTCDATETIME()
     );
 """
 
 
+# ------------------------------------------------------------
+# Import ledger: what has already been written, so re-dropped exports are cheap
+#   import_file_ledger - sha256 of every imported file; an identical file is skipped
+#   import_row_ledger  - per sheet, the hash of the stage rows last written for each key
+#                        (orgnr in Firmainfo, the contact MERGE key in Kontaktpersoner);
+#                        sheet rows whose hash has not changed are not staged again
+# ------------------------------------------------------------
+ENSURE_IMPORT_LEDGER = """
+IF OBJECT_ID('dbo.import_file_ledger', 'U') IS NULL
+BEGIN
+    CREATE TABLE dbo.import_file_ledger (
+        file_hash CHAR(64) NOT NULL PRIMARY KEY,
+        file_name NVARCHAR(260) NOT NULL,
+        sheet_rows INT NOT NULL,
+        changed_rows INT NOT NULL,
+        imported_at_utc DATETIME2(0) NOT NULL CONSTRAINT DF_file_ledger_imported DEFAULT SYSUTCDATETIME()
+    );
+END;
+
+IF OBJECT_ID('dbo.import_row_ledger', 'U') IS NULL
+BEGIN
+    CREATE TABLE dbo.import_row_ledger (
+        sheet NVARCHAR(100) NOT NULL,
+        key_hash BINARY(16) NOT NULL,
+        orgnr VARCHAR(9) NOT NULL,
+        row_hash BINARY(16) NOT NULL,
+        file_hash CHAR(64) NOT NULL,
+        updated_at_utc DATETIME2(0) NOT NULL CONSTRAINT DF_row_ledger_updated DEFAULT SYSUTCDATETIME(),
+        CONSTRAINT PK_import_row_ledger PRIMARY KEY (sheet, key_hash)
+    );
+END;
+"""
+
+FIND_IMPORTED_FILE = """
+SELECT file_name, imported_at_utc
+FROM dbo.import_file_ledger
+WHERE file_hash = :file_hash
+"""
+
+# Keys per ledger lookup (SQL Server allows 2100 parameters per statement)
+LEDGER_LOOKUP_KEYS = 1000
+
+
+def row_ledger_lookup_sql(keys: int) -> str:
+    return (
+        "SELECT key_hash, row_hash FROM dbo.import_row_ledger "
+        "WHERE sheet = ? AND key_hash IN (" + ", ".join("?" for _ in range(keys)) + ")"
+    )
+
+
+MERGE_ROW_LEDGER_STAGE = """
+MERGE dbo.import_row_ledger WITH (HOLDLOCK) AS tgt
+USING (
+    SELECT *
+    FROM (
+        SELECT s.*, ROW_NUMBER() OVER (PARTITION BY s.sheet, s.key_hash ORDER BY s.seq DESC) AS rn
+        FROM #row_ledger_stage AS s
+    ) AS d
+    WHERE d.rn = 1
+) AS src
+ON tgt.sheet = src.sheet
+AND tgt.key_hash = src.key_hash
+WHEN MATCHED THEN UPDATE SET
+    orgnr = src.orgnr,
+    row_hash = src.row_hash,
+    file_hash = :file_hash,
+    updated_at_utc = SYSUTCDATETIME()
+WHEN NOT MATCHED THEN
+    INSERT (sheet, key_hash, orgnr, row_hash, file_hash, updated_at_utc)
+    VALUES (src.sheet, src.key_hash, src.orgnr, src.row_hash, :file_hash, SYSUTCDATETIME());
+"""
+
+# MATCHED only happens for --force re-imports
+MERGE_FILE_LEDGER = """
+MERGE dbo.import_file_ledger WITH (HOLDLOCK) AS tgt
+USING (SELECT :file_hash AS file_hash) AS src
+ON tgt.file_hash = src.file_hash
+WHEN MATCHED THEN UPDATE SET
+    file_name = :file_name,
+    sheet_rows = :sheet_rows,
+    changed_rows = :changed_rows,
+    imported_at_utc = SYSUTCDATETIME()
+WHEN NOT MATCHED THEN
+    INSERT (file_hash, file_name, sheet_rows, changed_rows, imported_at_utc)
+    VALUES (:file_hash, :file_name, :sheet_rows, :changed_rows, SYSUTCDATETIME());
+"""
+
+
+def file_hash(path: Path) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def ledger_hash(value: Any) -> bytes:
+    """
+    16-byte digest of a key or of a sheet row's stage tuples (their repr is stable for
+    the str/float/int/date/None values the parsers produce).
+    """
+    return hashlib.blake2b(repr(value).encode("utf-8"), digest_size=16).digest()
+
+
 # ------------------------------------------------------------
 # Column mapping: Firmainfo financial fields → normalized
 # ------------------------------------------------------------
@@ -432,181 +683,397 @@ FIELD_TO_PROFF_CODE = {
 }
 
 
-def extract_year_metrics(row: dict[str, Any]) -> Dict[int, Dict[str, float]]:
+YEAR_COLUMN_RE = re.compile(r"^(.*?),\s*(\d{4})$")
+
+
+def year_metric_columns(names: Iterable[str]) -> Tuple[Tuple[int, str, int], ...]:
     """
-    Returns dict: {year: {field: value}}
-    Looks for columns like "Driftsres., 2024" etc.
+    Parses a header once into (column index, field, year) for every column like
+    "Driftsres., 2024" whose prefix is in METRIC_PREFIX_TO_FIELD, in column order.
     """
-    out: Dict[int, Dict[str, float]] = {}
-    for k, v in row.items():
-        if not k or v is None:
-            continue
-        k = str(k).strip()
-        m = re.match(r"^(.*?),\s*(\d{4})$", k)
+    plan = []
+    for i, name in enumerate(names):
+        m = YEAR_COLUMN_RE.match(name)
         if not m:
             continue
-        prefix = m.group(1).strip()
-        year = int(m.group(2))
-        if prefix not in METRIC_PREFIX_TO_FIELD:
+        field_name = METRIC_PREFIX_TO_FIELD.get(m.group(1).strip())
+        if field_name is not None:
+            plan.append((i, field_name, int(m.group(2))))
+    return tuple(plan)
+
+
+def extract_year_metrics(header: SheetHeader, row: tuple) -> Dict[int, Dict[str, float]]:
+    """
+    Returns dict: {year: {field: value}}
+    Only visits the columns in header.metric_columns; when two columns map to the same
+    field and year, the last non-empty one wins.
+    """
+    out: Dict[int, Dict[str, float]] = {}
+    width = len(row)
+    for i, field_name, year in header.metric_columns:
+        if i >= width:
+            break
+        v = row[i]
+        if v is None:
             continue
-        field = METRIC_PREFIX_TO_FIELD[prefix]
-        val = parse_number(v)
+        # Numeric cells are the common case; text goes through parse_number
+        val = float(v) if type(v) is int or type(v) is float else parse_number(v)
         if val is None:
             continue
-        out.setdefault(year, {})[field] = val
+        out.setdefault(year, {})[field_name] = val
     return out
 
 
-def import_one_file(engine, path: Path) -> None:
-    wb = load_workbook(path, data_only=True)
+def clean_str(v: Any) -> Optional[str]:
+    return str(v).strip() if v else None
+
+
+def company_stage_row(header: SheetHeader, r: tuple, orgnr: str) -> tuple:
+    get = header.get
+    name = (get(r, "Juridisk selskapsnavn") or get(r, "Markedsnavn") or "").strip() if get(r, "Juridisk selskapsnavn") else get(r, "Markedsnavn")
+    if isinstance(name, str):
+        name = name.strip()
+    else:
+        name = None
+
+    return (
+        orgnr,
+        name,
+        clean_str(get(r, "Telefon")),
+        clean_str(get(r, "E-post")),
+        clean_str(get(r, "Internett")),
+        clean_str(get(r, "Kommune")),
+        clean_str(get(r, "NACE-bransjekode")),
+    )
+
+
+def fin_stage_row(orgnr: str, year: int, metrics: Dict[str, float]) -> tuple:
+    revenue = metrics.get("revenue") or metrics.get("sales_revenue")
+    ebit = metrics.get("ebit")
+    depreciation = metrics.get("depreciation")
+    cash_equivalents = metrics.get("cash_equivalents")
+    total_debt = metrics.get("total_debt")
+
+    # EBITDA: if explicitly exists in sheet later, you can map it;
+    # otherwise approximate = EBIT + depreciation (if both present)
+    ebitda = None
+    if ebit is not None and depreciation is not None:
+        ebitda = ebit + depreciation
+
+    net_debt = None
+    if total_debt is not None and cash_equivalents is not None:
+        net_debt = total_debt - cash_equivalents
+
+    return (
+        orgnr,
+        year,
+        revenue,
+        ebitda,
+        ebit,
+        metrics.get("cfo"),
+        metrics.get("assets"),
+        metrics.get("equity"),
+        net_debt,
+        metrics.get("cogs"),
+        metrics.get("payroll_expenses"),
+        depreciation,
+        metrics.get("inventory"),
+        metrics.get("trade_receivables"),
+        metrics.get("trade_payables"),
+        cash_equivalents,
+        metrics.get("goodwill"),
+        metrics.get("dividend"),
+        total_debt,
+    )
+
+
+def contact_stage_row(header: SheetHeader, r: tuple, orgnr: str) -> Optional[tuple]:
+    get = header.get
+    person_name = clean_str(get(r, "Navn"))
+    # Minimal validation
+    if not person_name:
+        return None
+
+    return (
+        orgnr,
+        clean_str(get(r, "Juridisk selskapsnavn")),
+        person_name,
+        clean_str(get(r, "Rolle")),
+        parse_date(get(r, "Tiltrådt")),
+        clean_str(get(r, "Telefon")),
+        clean_str(get(r, "E-post")),
+        clean_str(get(r, "Gate-/postboksadresse (postadresse)")),
+        clean_str(get(r, "Postnr (postadresse)")),
+        clean_str(get(r, "Poststed (postadresse)")),
+        clean_str(get(r, "Gateadresse (forretningsadresse)")),
+        clean_str(get(r, "Postnr (forretningsadresse)")),
+        clean_str(get(r, "Poststed (forretningsadresse)")),
+        parse_number(get(r, "Driftsinntekter")),
+        parse_int(get(r, "Antall ansatte")),
+    )
+
+
+@dataclass
+class ParsedBatch:
+    """
+    Stage tuples built from one parse batch of sheet rows, keyed by stage table.
+    Plain tuples and lists, so batches pickle cheaply between processes (--workers).
+
+    hashes holds (key hash, row hash, orgnr) for every sheet row that produced stage rows;
+    owners maps each stage tuple to its sheet row's position in hashes, so the rows the
+    import ledger has already seen can be dropped before staging.
+    """
+    sheet: str
+    sheet_rows: int
+    rows: Dict[str, list[tuple]]
+    owners: Dict[str, list[int]]
+    hashes: list[Tuple[bytes, bytes, str]] = field(default_factory=list)
+
+    @classmethod
+    def empty(cls, sheet: str, stages: Tuple[str, ...]) -> "ParsedBatch":
+        return cls(sheet=sheet, sheet_rows=0, rows={s: [] for s in stages}, owners={s: [] for s in stages})
+
+    def append(self, stage: str, row: tuple) -> None:
+        self.rows[stage].append(row)
+        self.owners[stage].append(len(self.hashes))
+
+
+def parse_firm_rows(header: SheetHeader, rows: Iterable[tuple]) -> ParsedBatch:
+    batch = ParsedBatch.empty(SHEET_FIRMAINFO, ("#company_stage", "#fin_stage", "#fin_item_stage"))
+    for r in rows:
+        batch.sheet_rows += 1
+        orgnr = normalize_orgnr(header.get(r, "Orgnr"))
+        if not orgnr:
+            continue
+        written = [company_stage_row(header, r, orgnr)]
+        batch.append("#company_stage", written[0])
+
+        # Financials by year
+        for year, metrics in extract_year_metrics(header, r).items():
+            fin = fin_stage_row(orgnr, year, metrics)
+            written.append(fin)
+            batch.append("#fin_stage", fin)
+
+            # Optional: also write into proff_financial_item core codes
+            for metric, code in FIELD_TO_PROFF_CODE.items():
+                val = metrics.get(metric)
+                if val is not None:
+                    batch.append("#fin_item_stage", (orgnr, year, code, val))
+
+        # fin_item rows are derived from the fin rows, so they need not be hashed
+        batch.hashes.append((ledger_hash(orgnr), ledger_hash(written), orgnr))
+    return batch
+
+
+def parse_contact_rows(header: SheetHeader, rows: Iterable[tuple]) -> ParsedBatch:
+    batch = ParsedBatch.empty(SHEET_CONTACTS, ("#contact_stage",))
+    for r in rows:
+        batch.sheet_rows += 1
+        orgnr = normalize_orgnr(header.get(r, "Orgnr"))
+        if not orgnr:
+            continue
+        row = contact_stage_row(header, r, orgnr)
+        if row is not None:
+            batch.append("#contact_stage", row)
+            # Same key as MERGE_CONTACT_STAGE: orgnr, person_name, role, started_date
+            batch.hashes.append((ledger_hash(row[0:1] + row[2:5]), ledger_hash(row), orgnr))
+    return batch
+
+
+def iter_parsed_batches(path: Path) -> Iterator[ParsedBatch]:
+    """
+    Streams both sheets of one export as ParsedBatches of IMPORT_PARSE_BATCH_ROWS sheet rows.
+    """
+    # read_only streams the sheet XML instead of building every cell up front
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        if SHEET_FIRMAINFO not in wb.sheetnames:
+            raise RuntimeError(f"Missing sheet '{SHEET_FIRMAINFO}' in {path.name}")
+        if SHEET_CONTACTS not in wb.sheetnames:
+            raise RuntimeError(f"Missing sheet '{SHEET_CONTACTS}' in {path.name}")
+
+        for sheet, parse in ((SHEET_FIRMAINFO, parse_firm_rows), (SHEET_CONTACTS, parse_contact_rows)):
+            ws = wb[sheet]
+            # Exports do not always carry a correct <dimension>; without this rows could be cut short
+            ws.reset_dimensions()
+            header, batches = iter_sheet_batches(ws, IMPORT_PARSE_BATCH_ROWS)
+            for rows in batches:
+                yield parse(header, rows)
+    finally:
+        # read-only workbooks keep the file open until closed
+        wb.close()
+
+
+@dataclass
+class ImportReport:
+    file: str
+    sheet_rows: int = 0
+    staged: Dict[str, int] = field(default_factory=dict)
+    merged: Dict[str, int] = field(default_factory=dict)
+    seconds: float = 0.0
+    # Sheet rows left out because the row ledger already had their hash
+    unchanged: int = 0
+    # Set when the whole file was skipped: name of the identical file imported before
+    duplicate_of: Optional[str] = None
+
+    @property
+    def rows_per_s(self) -> float:
+        return self.sheet_rows / self.seconds if self.seconds else 0.0
+
+    def summary(self) -> str:
+        if self.duplicate_of is not None:
+            return f"{self.file}: identical to {self.duplicate_of}, nothing written"
+        merged = ", ".join(f"{table}={n}" for table, n in self.merged.items())
+        return (
+            f"{self.file}: {self.sheet_rows} sheet rows in {self.seconds:.2f}s "
+            f"({self.rows_per_s:,.0f} rows/s; {self.unchanged} unchanged; merged {merged})"
+        )
+
+
+class StagedImport:
+    """
+    Buffers ParsedBatch tuples per stage table and bulk-loads them into the #stage tables
+    every IMPORT_BATCH_ROWS rows (pyodbc fast_executemany, see make_engine).
+    Sheet rows whose hash matches dbo.import_row_ledger are dropped first (unless force).
+    finish() applies one MERGE per target table, updates the ledger and drops the stages.
+    """
+
+    def __init__(self, conn, report: ImportReport, force: bool = False):
+        self.conn = conn
+        self.report = report
+        self.force = force
+        self._pending: Dict[str, list[tuple]] = {stage: [] for stage in STAGE_INSERTS}
+        # Keys staged so far per sheet: a later row with the same key must be staged too,
+        # or the MERGEs would keep the earlier row instead of the last one
+        self._staged_keys: Dict[str, set[bytes]] = {}
+        conn.exec_driver_sql(CREATE_IMPORT_STAGES)
+
+    def _changed(self, batch: ParsedBatch) -> set[int]:
+        """
+        Positions in batch.hashes whose row hash differs from the ledger.
+        """
+        keys = [key for key, _, _ in batch.hashes]
+        known: Dict[bytes, bytes] = {}
+        for i in range(0, len(keys), LEDGER_LOOKUP_KEYS):
+            chunk = keys[i:i + LEDGER_LOOKUP_KEYS]
+            result = self.conn.exec_driver_sql(row_ledger_lookup_sql(len(chunk)), (batch.sheet, *chunk))
+            known.update((bytes(key), bytes(row_hash)) for key, row_hash in result)
+
+        staged = self._staged_keys.setdefault(batch.sheet, set())
+        changed = set()
+        for i, (key, row_hash, _) in enumerate(batch.hashes):
+            if key in staged or known.get(key) != row_hash:
+                changed.add(i)
+                staged.add(key)
+        return changed
+
+    def _flush(self, stage: str) -> None:
+        pending = self._pending[stage]
+        if pending:
+            self.conn.exec_driver_sql(STAGE_INSERTS[stage], pending)
+            self.report.staged[stage] = self.report.staged.get(stage, 0) + len(pending)
+            pending.clear()
+
+    def _extend(self, stage: str, rows: list[tuple]) -> None:
+        pending = self._pending[stage]
+        pending.extend(rows)
+        if len(pending) >= IMPORT_BATCH_ROWS:
+            self._flush(stage)
+
+    def add(self, batch: ParsedBatch) -> None:
+        self.report.sheet_rows += batch.sheet_rows
+        if self.force:
+            changed = None
+        else:
+            changed = self._changed(batch)
+            self.report.unchanged += len(batch.hashes) - len(changed)
+
+        for stage, rows in batch.rows.items():
+            if changed is not None:
+                rows = [row for row, owner in zip(rows, batch.owners[stage]) if owner in changed]
+            self._extend(stage, rows)
+        self._extend("#row_ledger_stage", [
+            (batch.sheet, key, orgnr, row_hash)
+            for i, (key, row_hash, orgnr) in enumerate(batch.hashes)
+            if changed is None or i in changed
+        ])
 
-    if SHEET_FIRMAINFO not in wb.sheetnames:
-        raise RuntimeError(f"Missing sheet '{SHEET_FIRMAINFO}' in {path.name}")
-    if SHEET_CONTACTS not in wb.sheetnames:
-        raise RuntimeError(f"Missing sheet '{SHEET_CONTACTS}' in {path.name}")
+    def finish(self, source_file: str, fetched_at: datetime, digest: str) -> None:
+        for stage in self._pending:
+            self._flush(stage)
 
-    ws1 = wb[SHEET_FIRMAINFO]
-    ws2 = wb[SHEET_CONTACTS]
+        # company first: the other targets reference it
+        for table, merge_sql, params in (
+            ("company", MERGE_COMPANY_STAGE, {}),
+            ("financial_statement", MERGE_FIN_STATEMENT_STAGE, {
+                "account_view": ACCOUNT_VIEW, "source": SOURCE_NAME, "fetched_at_utc": fetched_at,
+            }),
+            ("proff_financial_item", MERGE_PROFF_FIN_ITEM_STAGE, {
+                # if sheet provides currency, map it; else assume NOK
+                "account_view": ACCOUNT_VIEW, "currency": "NOK", "source": SOURCE_NAME, "fetched_at_utc": fetched_at,
+            }),
+            ("company_contact_person", MERGE_CONTACT_STAGE, {"source_file": source_file}),
+        ):
+            self.report.merged[table] = self.conn.execute(text(merge_sql), params).rowcount
+        if self.report.merged["company"] or self.report.merged["financial_statement"]:
+            # Invalidates the API response caches when the file's transaction commits
+            bump_generation(self.conn)
 
-    _, firm_rows = read_sheet_as_rows(ws1)
-    _, contact_rows = read_sheet_as_rows(ws2)
+        # Same transaction as the data, so the ledger never gets ahead of the tables
+        self.conn.execute(text(MERGE_ROW_LEDGER_STAGE), {"file_hash": digest})
+        self.conn.execute(text(MERGE_FILE_LEDGER), {
+            "file_hash": digest, "file_name": source_file,
+            "sheet_rows": self.report.sheet_rows,
+            "changed_rows": self.report.staged.get("#row_ledger_stage", 0),
+        })
+        self.conn.exec_driver_sql(DROP_IMPORT_STAGES)
 
+
+def imported_as(engine, digest: str) -> Optional[str]:
+    """
+    Name of the file with this content hash in dbo.import_file_ledger, if any.
+    """
+    with engine.begin() as conn:
+        conn.execute(text(ENSURE_IMPORT_LEDGER))
+        row = conn.execute(text(FIND_IMPORTED_FILE), {"file_hash": digest}).first()
+    return row.file_name if row else None
+
+
+def write_file(
+    engine, path: Path, batches: Iterable[ParsedBatch], digest: str, force: bool = False
+) -> ImportReport:
+    """
+    Stages and MERGEs one file's batches in a single transaction: the file lands completely or not at all.
+    """
+    t0 = time.perf_counter()
     fetched_at = now_utc().replace(tzinfo=None)  # store naive UTC in datetime2
-    source_file = path.name
+    report = ImportReport(file=path.name)
 
     with engine.begin() as conn:
-        # Ensure contact table exists
+        # Ensure contact and ledger tables exist
         conn.execute(text(ENSURE_CONTACT_TABLE))
+        conn.execute(text(ENSURE_IMPORT_LEDGER))
 
-        # --- Sheet 1: Firmainfo ---
-        for r in firm_rows:
-            orgnr = normalize_orgnr(r.get("Orgnr"))
-            if not orgnr:
-                continue
+        staged = StagedImport(conn, report, force=force)
+        for batch in batches:
+            staged.add(batch)
+        staged.finish(path.name, fetched_at, digest)
 
-            name = (r.get("Juridisk selskapsnavn") or r.get("Markedsnavn") or "").strip() if r.get("Juridisk selskapsnavn") else r.get("Markedsnavn")
-            if isinstance(name, str):
-                name = name.strip()
-            else:
-                name = None
-
-            company_params = {
-                "orgnr": orgnr,
-                "name": name,
-                "phone": (str(r.get("Telefon")).strip() if r.get("Telefon") else None),
-                "email": (str(r.get("E-post")).strip() if r.get("E-post") else None),
-                "website": (str(r.get("Internett")).strip() if r.get("Internett") else None),
-                "municipality": (str(r.get("Kommune")).strip() if r.get("Kommune") else None),
-                "nace": (str(r.get("NACE-bransjekode")).strip() if r.get("NACE-bransjekode") else None),
-                "nace_desc": (str(r.get("NACE-beskrivelse")).strip() if r.get("NACE-beskrivelse") else None),
-                "orgform": (str(r.get("Org.form")).strip() if r.get("Org.form") else None),
-                "status": (str(r.get("Status")).strip() if r.get("Status") else None),
-            }
-            conn.execute(text(MERGE_COMPANY), company_params)
-
-            # Financials by year
-            ym = extract_year_metrics(r)
-            for year, metrics in ym.items():
-                revenue = metrics.get("revenue") or metrics.get("sales_revenue")
-                ebit = metrics.get("ebit")
-                assets = metrics.get("assets")
-                equity = metrics.get("equity")
-                cash_equivalents = metrics.get("cash_equivalents")
-                depreciation = metrics.get("depreciation")
-                cogs = metrics.get("cogs")
-                payroll_expenses = metrics.get("payroll_expenses")
-                inventory = metrics.get("inventory")
-                trade_receivables = metrics.get("trade_receivables")
-                trade_payables = metrics.get("trade_payables")
-                goodwill = metrics.get("goodwill")
-                dividend = metrics.get("dividend")
-                total_debt = metrics.get("total_debt")
-                cfo = metrics.get("cfo")
-
-                # EBITDA: if explicitly exists in sheet later, you can map it;
-                # otherwise approximate = EBIT + depreciation (if both present)
-                ebitda = None
-                if ebit is not None and depreciation is not None:
-                    ebitda = ebit + depreciation
-
-                net_debt = None
-                if total_debt is not None and cash_equivalents is not None:
-                    net_debt = total_debt - cash_equivalents
-
-                fs_params = {
-                    "orgnr": orgnr,
-                    "year": year,
-                    "account_view": ACCOUNT_VIEW,
-                    "revenue": revenue,
-                    "ebitda": ebitda,
-                    "ebit": ebit,
-                    "cfo": cfo,
-                    "assets": assets,
-                    "equity": equity,
-                    "net_debt": net_debt,
-                    "source": SOURCE_NAME,
-                    "fetched_at_utc": fetched_at,
-                    "cogs": cogs,
-                    "payroll_expenses": payroll_expenses,
-                    "depreciation": depreciation,
-                    "inventory": inventory,
-                    "trade_receivables": trade_receivables,
-                    "trade_payables": trade_payables,
-                    "cash_equivalents": cash_equivalents,
-                    "goodwill": goodwill,
-                    "dividend": dividend,
-                    "total_debt": total_debt,
-                }
-                conn.execute(text(MERGE_FIN_STATEMENT), fs_params)
-
-                # Optional: also write into proff_financial_item core codes
-                for field, code in FIELD_TO_PROFF_CODE.items():
-                    val = metrics.get(field)
-                    if val is None:
-                        continue
-                    fin_item_params = {
-                        "orgnr": orgnr,
-                        "fiscal_year": year,
-                        "account_view": ACCOUNT_VIEW,
-                        "code": code,
-                        "value": val,
-                        "currency": "NOK",   # if sheet provides, map it; else assume NOK
-                        "unit": None,
-                        "fetched_at_utc": fetched_at,
-                        "source": SOURCE_NAME,
-                    }
-                    conn.execute(text(MERGE_PROFF_FIN_ITEM), fin_item_params)
-
-        # --- Sheet 2: Kontaktpersoner ---
-        for r in contact_rows:
-            orgnr = normalize_orgnr(r.get("Orgnr"))
-            if not orgnr:
-                continue
+    report.seconds = time.perf_counter() - t0
+    return report
 
-            params = {
-                "orgnr": orgnr,
-                "company_name": (str(r.get("Juridisk selskapsnavn")).strip() if r.get("Juridisk selskapsnavn") else None),
-                "person_name": (str(r.get("Navn")).strip() if r.get("Navn") else None),
-                "role": (str(r.get("Rolle")).strip() if r.get("Rolle") else None),
-                "started_date": parse_date(r.get("Tiltrådt")),
-                "phone": (str(r.get("Telefon")).strip() if r.get("Telefon") else None),
-                "email": (str(r.get("E-post")).strip() if r.get("E-post") else None),
-                "postal_address": (str(r.get("Gate-/postboksadresse (postadresse)")).strip() if r.get("Gate-/postboksadresse (postadresse)") else None),
-                "postal_postnr": (str(r.get("Postnr (postadresse)")).strip() if r.get("Postnr (postadresse)") else None),
-                "postal_city": (str(r.get("Poststed (postadresse)")).strip() if r.get("Poststed (postadresse)") else None),
-                "business_address": (str(r.get("Gateadresse (forretningsadresse)")).strip() if r.get("Gateadresse (forretningsadresse)") else None),
-                "business_postnr": (str(r.get("Postnr (forretningsadresse)")).strip() if r.get("Postnr (forretningsadresse)") else None),
-                "business_city": (str(r.get("Poststed (forretningsadresse)")).strip() if r.get("Poststed (forretningsadresse)") else None),
-                "revenue": parse_number(r.get("Driftsinntekter")),
-                "employees": parse_int(r.get("Antall ansatte")),
-                "source_file": source_file,
-            }
-
-            # Minimal validation
-            if not params["person_name"]:
-                continue
 
-            conn.execute(text(MERGE_CONTACT), params)
+def import_one_file(engine, path: Path, force: bool = False) -> ImportReport:
+    """
+    Imports one export, or skips it if a file with the same content is in the ledger
+    (report.duplicate_of). The caller moves the file to imported/ either way.
+    """
+    digest = file_hash(path)
+    if not force:
+        duplicate_of = imported_as(engine, digest)
+        if duplicate_of is not None:
+            return ImportReport(file=path.name, duplicate_of=duplicate_of)
+    return write_file(engine, path, iter_parsed_batches(path), digest, force)
 
 
 def move_to_imported(path: Path) -> None:
@@ -616,7 +1083,132 @@ def move_to_imported(path: Path) -> None:
     shutil.move(str(path), str(dest))
 
 
+def finish_file(path: Path, report: ImportReport) -> None:
+    # Skipped duplicates are moved too, so they are not picked up again next run
+    move_to_imported(path)
+    verb = "Skipped" if report.duplicate_of is not None else "Imported"
+    print(f"{verb} and moved: {report.summary()}")
+
+
+# ------------------------------------------------------------
+# Parallel import (--workers N): parse processes -> bounded queues -> one writer thread
+# ------------------------------------------------------------
+# Parsed batches buffered per file between its parse process and its writer
+QUEUE_BATCHES = int(os.getenv("IMPORT_QUEUE_BATCHES", "8"))
+
+
+def parse_into_queue(path: Path, queue) -> None:
+    """
+    Process-pool task: streams one file's ParsedBatches into its queue, then None.
+    A parse error is put on the queue instead, so the writer rolls the file back.
+    """
+    try:
+        for batch in iter_parsed_batches(path):
+            queue.put(batch)
+    except Exception as e:
+        queue.put(e)
+    else:
+        queue.put(None)
+
+
+def iter_queued_batches(queue, parsed: Future) -> Iterator[ParsedBatch]:
+    while True:
+        try:
+            item = queue.get(timeout=1.0)
+        except Empty:
+            # A parse process that died (e.g. out of memory) never sends its end marker
+            if parsed.done() and parsed.exception() is not None:
+                raise parsed.exception()
+            continue
+        if item is None:
+            return
+        if isinstance(item, Exception):
+            raise item
+        yield item
+
+
+def write_queued_file(engine, path: Path, queue, parsed: Future, digest: str, force: bool) -> ImportReport:
+    batches = iter_queued_batches(queue, parsed)
+    try:
+        return write_file(engine, path, batches, digest, force)
+    except BaseException:
+        # Drain so the parse process is not left blocked on a full queue
+        try:
+            for _ in batches:
+                pass
+        except Exception:
+            pass
+        raise
+
+
+def import_files_parallel(engine, files: list[Path], workers: int, force: bool = False) -> list[Path]:
+    """
+    Parses files in `workers` processes, ahead of a single writer thread that stages,
+    MERGEs and commits them one transaction at a time in filename order, as the serial
+    loop does. One writer keeps last-file-wins for orgnrs shared between exports, keeps
+    the HOLDLOCK MERGEs of one run from deadlocking each other, and lets each file's row
+    ledger lookups see the files committed before it.
+    Each file is moved to imported/ only after its own commit. Returns the files whose
+    content repeats an earlier file of this run; import those afterwards, when the ledger
+    knows whether the first copy landed.
+    """
+    deferred = []
+    with Manager() as manager, \
+            ProcessPoolExecutor(max_workers=workers) as parse_pool, \
+            ThreadPoolExecutor(max_workers=1) as write_pool:
+        # Both pools run in submission order, so the file being written is always being parsed
+        pending = []
+        digests = set()
+        for f in files:
+            try:
+                digest = file_hash(f)
+                duplicate_of = None if force else imported_as(engine, digest)
+            except Exception as e:
+                print(f"FAILED: {f.name} -> {e}")
+                continue
+            if duplicate_of is not None:
+                finish_file(f, ImportReport(file=f.name, duplicate_of=duplicate_of))
+                continue
+            if digest in digests:
+                deferred.append(f)
+                continue
+            digests.add(digest)
+
+            queue = manager.Queue(maxsize=QUEUE_BATCHES)
+            parsed = parse_pool.submit(parse_into_queue, f, queue)
+            pending.append((f, write_pool.submit(write_queued_file, engine, f, queue, parsed, digest, force)))
+
+        for f, written in pending:
+            try:
+                finish_file(f, written.result())
+            except Exception as e:
+                print(f"FAILED: {f.name} -> {e}")
+                # Do not move file on failure
+    return deferred
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Import Proff Forvalt Excel exports from import/.")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Parse files in N worker processes; files are still written one at a time, "
+             "in filename order (1 = in-process).",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Import every file and row even if the import ledger has already seen it.",
+    )
+    args = parser.parse_args()
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    return args
+
+
 def main():
+    args = parse_args()
     engine = make_engine()
     IMPORT_DIR.mkdir(parents=True, exist_ok=True)
     IMPORTED_DIR.mkdir(parents=True, exist_ok=True)
@@ -626,12 +1218,16 @@ def main():
         print(f"No .xlsx files found in {IMPORT_DIR}")
         return
 
+    if args.workers > 1 and len(files) > 1:
+        print(f"Importing {len(files)} files with {args.workers} parse workers")
+        t0 = time.perf_counter()
+        files = import_files_parallel(engine, files, args.workers, args.force)
+        print(f"Done in {time.perf_counter() - t0:.1f}s")
+
     for f in files:
         print(f"Importing: {f.name}")
         try:
-            import_one_file(engine, f)
-            move_to_imported(f)
-            print(f"Imported and moved: {f.name}")
+            finish_file(f, import_one_file(engine, f, args.force))
         except Exception as e:
             print(f"FAILED: {f.name} -> {e}")
             # Do not move file on failure
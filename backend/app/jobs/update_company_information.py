@@ -18,6 +18,7 @@ if str(UTILS_ROOT) not in sys.path:
     sys.path.insert(0, str(UTILS_ROOT))
 
 from app.db import SessionLocal
+from app.generation import bump_generation
 import llm
 
 
@@ -155,7 +156,8 @@ def update_company_description(session: Session, orgnr: str, description: str) -
         text(
             """
             UPDATE dbo.company
-            SET description = :description
+            SET description = :description,
+                updated_at = SYSUTCDATETIME()
             WHERE orgnr = :orgnr
             """
         ),
@@ -193,6 +195,19 @@ def update_score_details(
             "score_id": score_id,
         },
     )
+    # The API's company ETag covers company.updated_at, not LLM edits to the score row
+    session.execute(
+        text(
+            """
+            UPDATE c
+            SET updated_at = SYSUTCDATETIME()
+            FROM dbo.company AS c
+            JOIN dbo.score AS s ON s.orgnr = c.orgnr
+            WHERE s.id = :score_id
+            """
+        ),
+        {"score_id": score_id},
+    )
 
 
 def run(limit: int) -> None:
@@ -230,6 +245,7 @@ def run(limit: int) -> None:
                 normalized["urgency"],
                 normalized["urgency_explanation"],
             )
+            bump_generation(session)
             session.commit()
             print(f"Updated company orgnr {orgnr} and score id {score_id}.")
 
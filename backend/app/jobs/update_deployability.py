@@ -18,6 +18,7 @@ if str(UTILS_ROOT) not in sys.path:
     sys.path.insert(0, str(UTILS_ROOT))
 
 from app.db import SessionLocal
+from app.generation import bump_generation
 import llm
 
 
@@ -107,6 +108,19 @@ def update_deployability(session: Session, score_id: int, deployability: float,
             "score_id": score_id,
         },
     )
+    # The API's company ETag covers company.updated_at, not LLM edits to the score row
+    session.execute(
+        text(
+            """
+            UPDATE c
+            SET updated_at = SYSUTCDATETIME()
+            FROM dbo.company AS c
+            JOIN dbo.score AS s ON s.orgnr = c.orgnr
+            WHERE s.id = :score_id
+            """
+        ),
+        {"score_id": score_id},
+    )
 
 
 def run(limit: int) -> None:
@@ -139,6 +153,7 @@ def run(limit: int) -> None:
 
             deployability, explanation = normalized
             update_deployability(session, score_id, deployability, explanation)
+            bump_generation(session)
             session.commit()
             print(
                 f"Updated score id {score_id} (orgnr {orgnr}) with deployability {deployability:.2f}."
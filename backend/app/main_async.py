@@ -0,0 +1,133 @@
+"""
+Async variant of app.main: same endpoints and responses, served by `async def` handlers
+on an async SQLAlchemy engine (aioodbc for SQL Server, aiosqlite for local runs), so
+requests wait on the connection pool instead of FastAPI's threadpool.
+
+    uvicorn app.main_async:app --workers 4
+
+Pool size / overflow: DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT (see app.db).
+"""
+from __future__ import annotations
+
+from contextlib import asynccontextmanager
+from dataclasses import astuple
+from datetime import date
+
+from fastapi import FastAPI, Depends, HTTPException, Request, Response
+from fastapi.middleware.cors import CORSMiddleware
+import orjson
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .db_async import AsyncSessionLocal, async_engine, get_async_db
+from . import export, models, queries
+from .export import ExportParams
+from .generation import generation_stmt
+from .queries import CompanyListParams
+from .response_cache import ResponseCache, etag_headers, not_modified
+from .startup import FirstRequestTimer, prepare_schema
+from .schemas import TopPickItem, CompanyBatchIn, CompanyDetail, CompanyPage, OutreachUpdateIn
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Same schema handling as app.main (DB_SCHEMA_MODE, see app.startup)
+    async with async_engine.begin() as conn:
+        await conn.run_sync(prepare_schema)
+    yield
+    await async_engine.dispose()
+
+
+app = FastAPI(title="AWC Prototype API (async)", lifespan=lifespan)
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+app.add_middleware(FirstRequestTimer)
+
+
+# /top-picks/today and /companies only change when a job runs (see app.generation)
+response_cache = ResponseCache()
+
+
+async def _cache_generation(db: AsyncSession) -> int | None:
+    if response_cache.generation_due():
+        response_cache.set_generation((await db.execute(generation_stmt())).scalar())
+    return response_cache.generation
+
+
+@app.get("/top-picks/today", response_model=list[TopPickItem])
+async def get_top_picks_today(request: Request, db: AsyncSession = Depends(get_async_db)):
+    generation = await _cache_generation(db)
+    key = ("top_picks", date.today())
+    cached = response_cache.get(key)
+    if cached is None:
+        rows = (await db.execute(queries.top_picks_stmt(key[1]))).all()
+        cached = response_cache.put(key, orjson.dumps(queries.top_pick_items(rows)), generation)
+    return cached.to_response(request)
+
+
+@app.get("/companies", response_model=CompanyPage)
+async def list_companies(
+    request: Request,
+    params: CompanyListParams = Depends(),
+    db: AsyncSession = Depends(get_async_db),
+):
+    generation = await _cache_generation(db)
+    key = ("companies", astuple(params))
+    cached = response_cache.get(key)
+    if cached is None:
+        rows = (await db.execute(queries.company_page_stmt(params))).all()
+        cached = response_cache.put(key, orjson.dumps(queries.company_page(rows, params)), generation)
+    return cached.to_response(request)
+
+
+@app.post("/companies/batch", response_model=list[CompanyDetail])
+async def get_companies_batch(payload: CompanyBatchIn, db: AsyncSession = Depends(get_async_db)):
+    orgnrs = list(dict.fromkeys(payload.orgnrs))
+    return queries.company_details((await db.execute(queries.company_details_stmt(orgnrs))).all(), orgnrs)
+
+
+@app.get("/companies/{orgnr}", response_model=CompanyDetail)
+async def get_company(orgnr: str, request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
+    # Revalidation: compare the ETag from a few key columns before building the detail
+    if request.headers.get("if-none-match"):
+        version = (await db.execute(queries.company_version_stmt(orgnr))).first()
+        if version:
+            unchanged = not_modified(request, queries.company_etag(*version))
+            if unchanged:
+                return unchanged
+
+    row = (await db.execute(queries.company_detail_stmt(orgnr))).first()
+    detail = queries.company_detail(row)
+    response.headers.update(etag_headers(queries.company_detail_etag(row)))
+    return detail
+
+
+@app.get("/export/scores")
+async def export_scores(params: ExportParams = Depends()):
+    return export.export_response_async(AsyncSessionLocal, export.scores_stmt(params), "scores", params)
+
+
+@app.get("/export/financials")
+async def export_financials(params: ExportParams = Depends()):
+    return export.export_response_async(AsyncSessionLocal, export.financials_stmt(params), "financials", params)
+
+
+@app.post("/outreach/{orgnr}/update")
+async def update_outreach(orgnr: str, payload: OutreachUpdateIn, db: AsyncSession = Depends(get_async_db)):
+    company = await db.get(models.Company, orgnr)
+    if not company:
+        raise HTTPException(status_code=404, detail="Company not found")
+
+    outreach = await db.get(models.Outreach, orgnr)
+    if not outreach:
+        outreach = models.Outreach(orgnr=orgnr)
+        db.add(outreach)
+
+    queries.apply_outreach_update(outreach, payload)
+
+    await db.commit()
+    return {"ok": True}
@@ -11,6 +11,10 @@ from .db import Base
 
 class Company(Base):
     __tablename__ = "company"
+    __table_args__ = (
+        # Keyset pagination on /companies?sort=name
+        Index("ix_company_name_orgnr", "name", "orgnr"),
+    )
 
     orgnr: Mapped[str] = mapped_column(String(9), primary_key=True)
     name: Mapped[str] = mapped_column(String(255), nullable=False)
@@ -59,6 +63,9 @@ class FinancialStatement(Base):
     dividend: Mapped[float | None] = mapped_column(Float, nullable=True)
     total_debt: Mapped[float | None] = mapped_column(Float, nullable=True)
 
+    # Set by the Proff jobs and the Forvalt import on every write of the row
+    fetched_at_utc: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+
     company: Mapped["Company"] = relationship(back_populates="financials")
 
 
@@ -105,6 +112,78 @@ class Score(Base):
     company: Mapped["Company"] = relationship(back_populates="scores")
 
 
+class CompanyLatestScore(Base):
+    """
+    Projection of each company's latest dbo.score row (max year), so the API reads it with
+    one key seek instead of a GROUP BY. compute_quality_scores refreshes it in the same
+    transaction as the score write.
+    """
+    __tablename__ = "company_latest_score"
+
+    orgnr: Mapped[str] = mapped_column(String(9), ForeignKey("company.orgnr"), primary_key=True)
+    year: Mapped[int] = mapped_column(Integer, nullable=False)
+    score_id: Mapped[int] = mapped_column(Integer, ForeignKey("score.id"), nullable=False, unique=True)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
+
+
+class ScoreModelResult(Base):
+    """
+    Side-by-side scores per scoring model version (compute_quality_scores --models).
+    Kept apart from dbo.score so candidate models never overwrite production scores.
+    """
+    __tablename__ = "score_model_result"
+    __table_args__ = (
+        UniqueConstraint("model_id", "orgnr", "year", name="uq_score_model_result"),
+        Index("ix_score_model_result_model_year", "model_id", "year"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    model_id: Mapped[str] = mapped_column(String(50), nullable=False)
+    orgnr: Mapped[str] = mapped_column(String(9), ForeignKey("company.orgnr"), nullable=False)
+    year: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    total_score: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    roic_score: Mapped[float | None] = mapped_column(Float, nullable=True)
+    revenue_cagr_score: Mapped[float | None] = mapped_column(Float, nullable=True)
+    margin_change_score: Mapped[float | None] = mapped_column(Float, nullable=True)
+    nwc_sales_score: Mapped[float | None] = mapped_column(Float, nullable=True)
+    goodwill_ratio_score: Mapped[float | None] = mapped_column(Float, nullable=True)
+    tags: Mapped[str | None] = mapped_column(String(500), nullable=True)
+    computed_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
+
+
+class ScoreFeatureCache(Base):
+    """
+    Feature hash per (model_id, orgnr, year) from the last scoring run (compute_quality_scores --cache).
+    A matching hash means features and model are unchanged, so scoring and the dbo.score write are skipped.
+    """
+    __tablename__ = "score_feature_cache"
+    __table_args__ = (
+        UniqueConstraint("model_id", "year", "orgnr", name="uq_score_feature_cache"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    model_id: Mapped[str] = mapped_column(String(50), nullable=False)
+    orgnr: Mapped[str] = mapped_column(String(9), ForeignKey("company.orgnr"), nullable=False)
+    year: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    feature_hash: Mapped[str] = mapped_column(String(32), nullable=False)
+    computed_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
+
+
+class DataGeneration(Base):
+    """
+    Named change counters. Jobs bump "api" in the same transaction as writes that change
+    /top-picks/today or /companies; the API response cache drops payloads built under an
+    older generation (see app.generation, app.response_cache).
+    """
+    __tablename__ = "data_generation"
+
+    name: Mapped[str] = mapped_column(String(50), primary_key=True)
+    generation: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
+
+
 class DailyTopPick(Base):
     __tablename__ = "daily_top_pick"
     __table_args__ = (
@@ -135,3 +214,15 @@ class Outreach(Base):
     updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
 
     company: Mapped["Company"] = relationship(back_populates="outreach")
+
+
+class SchemaVersion(Base):
+    """
+    Fingerprint of app.models the database schema was last created from. The API compares
+    it once at startup instead of running create_all (see app.startup).
+    """
+    __tablename__ = "schema_version"
+
+    name: Mapped[str] = mapped_column(String(50), primary_key=True)
+    fingerprint: Mapped[str] = mapped_column(String(64), nullable=False)
+    applied_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
@@ -0,0 +1,388 @@
+"""
+Statements and row mappers shared by the sync (app.main) and async (app.main_async) APIs.
+Handlers only execute the statement on their session and map the rows.
+
+List endpoints select plain columns labelled with the response model's field names and map
+rows to dicts for orjson; TopPickItem / CompanyPage in app.schemas stay the documented contract.
+"""
+# No `from __future__ import annotations`: FastAPI reads CompanyListParams' annotations at runtime.
+import base64
+import hashlib
+import json
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Literal, Sequence
+
+from fastapi import HTTPException, Query
+from sqlalchemy import Select, and_, case, desc, func, or_, select
+
+from . import models
+from .schemas import CompanyDetail, OutreachUpdateIn
+
+
+# ------------------------------------------------------------
+# /top-picks/today
+# ------------------------------------------------------------
+def top_picks_stmt(pick_date: date) -> Select:
+    return (
+        select(
+            models.DailyTopPick.rank,
+            models.Company.orgnr,
+            models.Company.name,
+            models.DailyTopPick.total_score_snapshot.label("total_score"),
+            models.FinancialStatement.ebitda,
+            models.FinancialStatement.revenue,
+            models.Score.tags,
+            models.DailyTopPick.reason_summary,
+        )
+        .join(models.Company, models.Company.orgnr == models.DailyTopPick.orgnr)
+        .join(models.Score, (models.Score.orgnr == models.DailyTopPick.orgnr), isouter=True)
+        .join(
+            models.FinancialStatement,
+            (models.FinancialStatement.orgnr == models.DailyTopPick.orgnr)
+            & (models.FinancialStatement.year == models.Score.year),
+            isouter=True,
+        )
+        .where(models.DailyTopPick.pick_date == pick_date)
+        .order_by(models.DailyTopPick.rank.asc())
+    )
+
+
+def top_pick_items(rows: Sequence) -> list[dict[str, object]]:
+    # TopPickItem fields, in order
+    return [row._asdict() for row in rows]
+
+
+# ------------------------------------------------------------
+# /companies (keyset pagination)
+# ------------------------------------------------------------
+# Server-side sort keys for /companies. Every order is (key, orgnr) so the keyset cursor is unique.
+COMPANY_SORT_COLUMNS = {
+    "name": models.Company.name,
+    "total_score": models.Score.total_score,
+    "compounder_score": models.Score.compounder_score,
+    "deployability": models.Score.deployability,
+    "urgency": models.Score.urgency,
+}
+CompanySortKey = Literal["name", "total_score", "compounder_score", "deployability", "urgency"]
+
+
+@dataclass
+class CompanyListParams:
+    """
+    Query parameters of GET /companies (used as a FastAPI class dependency).
+    """
+    limit: int = Query(100, ge=1, le=500)
+    cursor: str | None = Query(None, description="next_cursor from the previous page")
+    sort: CompanySortKey = "name"
+    order: Literal["asc", "desc"] = "asc"
+    min_score: float | None = None
+    max_score: float | None = None
+    min_deployability: float | None = None
+    max_deployability: float | None = None
+    min_urgency: float | None = None
+    max_urgency: float | None = None
+    nace: str | None = Query(None, description="NACE code or prefix, e.g. 62 or 62.01")
+    municipality: str | None = None
+
+
+def _encode_cursor(sort: str, order: str, value: object, orgnr: str) -> str:
+    raw = json.dumps([f"{sort}:{order}", value, orgnr], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str, sort: str, order: str) -> tuple[object, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        sort_order, value, orgnr = json.loads(raw)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if sort_order != f"{sort}:{order}":
+        raise HTTPException(status_code=400, detail="Cursor was issued for a different sort order")
+    return value, orgnr
+
+
+def _after_cursor(column, descending: bool, value: object, orgnr: str):
+    """
+    Rows strictly after (value, orgnr) in ORDER BY (column IS NULL), column, orgnr.
+    Companies without a value sort last in both directions.
+    """
+    orgnr_col = models.Company.orgnr
+    next_orgnr = orgnr_col < orgnr if descending else orgnr_col > orgnr
+    if value is None:
+        return and_(column.is_(None), next_orgnr)
+    beyond = column < value if descending else column > value
+    return or_(beyond, and_(column == value, next_orgnr), column.is_(None))
+
+
+def company_page_stmt(params: CompanyListParams) -> Select:
+    stmt = (
+        select(
+            models.Company.orgnr,
+            models.Company.name,
+            models.Score.total_score,
+            models.Score.compounder_score,
+            models.Score.deployability,
+            models.Score.urgency,
+        )
+        .join(
+            models.CompanyLatestScore,
+            models.CompanyLatestScore.orgnr == models.Company.orgnr,
+            isouter=True,
+        )
+        .join(models.Score, models.Score.id == models.CompanyLatestScore.score_id, isouter=True)
+    )
+
+    for column, low, high in (
+        (models.Score.total_score, params.min_score, params.max_score),
+        (models.Score.deployability, params.min_deployability, params.max_deployability),
+        (models.Score.urgency, params.min_urgency, params.max_urgency),
+    ):
+        if low is not None:
+            stmt = stmt.where(column >= low)
+        if high is not None:
+            stmt = stmt.where(column <= high)
+    if params.nace:
+        stmt = stmt.where(models.Company.nace.startswith(params.nace, autoescape=True))
+    if params.municipality:
+        stmt = stmt.where(models.Company.municipality == params.municipality)
+
+    sort_column = COMPANY_SORT_COLUMNS[params.sort]
+    descending = params.order == "desc"
+    if params.cursor:
+        value, orgnr = _decode_cursor(params.cursor, params.sort, params.order)
+        stmt = stmt.where(_after_cursor(sort_column, descending, value, orgnr))
+
+    # One extra row tells us whether there is a next page
+    return stmt.order_by(
+        case((sort_column.is_(None), 1), else_=0),
+        sort_column.desc() if descending else sort_column.asc(),
+        models.Company.orgnr.desc() if descending else models.Company.orgnr.asc(),
+    ).limit(params.limit + 1)
+
+
+def company_page(rows: Sequence, params: CompanyListParams) -> dict[str, object]:
+    # CompanyPage: CompanySummary fields, in order, per row
+    items = [row._asdict() for row in rows[:params.limit]]
+
+    next_cursor = None
+    if len(rows) > params.limit:
+        last = items[-1]
+        next_cursor = _encode_cursor(params.sort, params.order, last[params.sort], last["orgnr"])
+    return {"items": items, "next_cursor": next_cursor}
+
+
+# ------------------------------------------------------------
+# /companies/{orgnr}
+# ------------------------------------------------------------
+def _cash_conversion_subquery(orgnr: str):
+    """
+    Mean (ebit + depreciation) / ebit over the company's 4 latest statements,
+    skipping years without ebit or depreciation (NULL when none qualify).
+    """
+    fs = models.FinancialStatement
+    recent = (
+        select(fs.ebit, fs.depreciation)
+        .where(fs.orgnr == orgnr)
+        .order_by(desc(fs.year))
+        .limit(4)
+        .subquery()
+    )
+    return (
+        select(func.avg((recent.c.ebit + recent.c.depreciation) / recent.c.ebit))
+        .where(recent.c.ebit != 0, recent.c.depreciation.is_not(None))
+        .scalar_subquery()
+    )
+
+
+def _statements_fetched_at(orgnr: str):
+    """
+    Latest financial_statement.fetched_at_utc of the company: moves whenever any of its
+    statements is rewritten, which covers both the detail's statement and cash conversion.
+    """
+    fs = models.FinancialStatement
+    return select(func.max(fs.fetched_at_utc)).where(fs.orgnr == orgnr).scalar_subquery()
+
+
+def company_detail_stmt(orgnr: str) -> Select:
+    # One round trip: company + latest score (projection) + that year's statement
+    # + outreach + the cash-conversion aggregate (+ the statements' version for the ETag)
+    return (
+        select(
+            models.Company,
+            models.Score,
+            models.FinancialStatement,
+            models.Outreach,
+            _cash_conversion_subquery(orgnr).label("cash_conversion"),
+            _statements_fetched_at(orgnr).label("statements_fetched_at"),
+        )
+        .outerjoin(models.CompanyLatestScore, models.CompanyLatestScore.orgnr == models.Company.orgnr)
+        .outerjoin(models.Score, models.Score.id == models.CompanyLatestScore.score_id)
+        .outerjoin(
+            models.FinancialStatement,
+            (models.FinancialStatement.orgnr == models.Company.orgnr)
+            & (models.FinancialStatement.year == models.Score.year),
+        )
+        .outerjoin(models.Outreach, models.Outreach.orgnr == models.Company.orgnr)
+        .where(models.Company.orgnr == orgnr)
+    )
+
+
+def _cash_conversion_by_orgnr(orgnrs: Sequence[str]):
+    """
+    Set-based _cash_conversion_subquery: one (orgnr, cash_conversion) row per company with
+    at least one qualifying year among its 4 latest statements.
+    """
+    fs = models.FinancialStatement
+    ranked = (
+        select(
+            fs.orgnr,
+            fs.ebit,
+            fs.depreciation,
+            func.row_number().over(partition_by=fs.orgnr, order_by=desc(fs.year)).label("recency"),
+        )
+        .where(fs.orgnr.in_(orgnrs))
+        .subquery()
+    )
+    return (
+        select(
+            ranked.c.orgnr,
+            func.avg((ranked.c.ebit + ranked.c.depreciation) / ranked.c.ebit).label("cash_conversion"),
+        )
+        .where(ranked.c.recency <= 4, ranked.c.ebit != 0, ranked.c.depreciation.is_not(None))
+        .group_by(ranked.c.orgnr)
+        .subquery()
+    )
+
+
+def company_details_stmt(orgnrs: Sequence[str]) -> Select:
+    # company_detail_stmt for many companies: same columns, one IN list
+    cash = _cash_conversion_by_orgnr(orgnrs)
+    return (
+        select(
+            models.Company,
+            models.Score,
+            models.FinancialStatement,
+            models.Outreach,
+            cash.c.cash_conversion,
+        )
+        .outerjoin(models.CompanyLatestScore, models.CompanyLatestScore.orgnr == models.Company.orgnr)
+        .outerjoin(models.Score, models.Score.id == models.CompanyLatestScore.score_id)
+        .outerjoin(
+            models.FinancialStatement,
+            (models.FinancialStatement.orgnr == models.Company.orgnr)
+            & (models.FinancialStatement.year == models.Score.year),
+        )
+        .outerjoin(models.Outreach, models.Outreach.orgnr == models.Company.orgnr)
+        .outerjoin(cash, cash.c.orgnr == models.Company.orgnr)
+        .where(models.Company.orgnr.in_(orgnrs))
+    )
+
+
+def company_details(rows: Sequence, orgnrs: Sequence[str]) -> list[CompanyDetail]:
+    # Request order; unknown orgnrs are left out
+    by_orgnr = {row[0].orgnr: row for row in rows}
+    return [company_detail(by_orgnr[orgnr]) for orgnr in orgnrs if orgnr in by_orgnr]
+
+
+def company_version_stmt(orgnr: str) -> Select:
+    """
+    Just the columns the detail ETag is derived from: primary-key seeks on company,
+    company_latest_score, score and outreach, plus one (orgnr, year) index range for
+    the latest statement fetch.
+    """
+    return (
+        select(
+            models.Company.updated_at,
+            models.Score.id,
+            models.Score.computed_at,
+            models.Outreach.updated_at,
+            _statements_fetched_at(orgnr),
+        )
+        .outerjoin(models.CompanyLatestScore, models.CompanyLatestScore.orgnr == models.Company.orgnr)
+        .outerjoin(models.Score, models.Score.id == models.CompanyLatestScore.score_id)
+        .outerjoin(models.Outreach, models.Outreach.orgnr == models.Company.orgnr)
+        .where(models.Company.orgnr == orgnr)
+    )
+
+
+def company_etag(
+    company_updated_at: datetime | None,
+    score_id: int | None,
+    score_computed_at: datetime | None,
+    outreach_updated_at: datetime | None,
+    statements_fetched_at: datetime | None,
+) -> str:
+    version = (
+        f"{company_updated_at}|{score_id}|{score_computed_at}|{outreach_updated_at}"
+        f"|{statements_fetched_at}"
+    )
+    return '"' + hashlib.blake2b(version.encode(), digest_size=12).hexdigest() + '"'
+
+
+def company_detail_etag(row) -> str:
+    company, score, _, outreach, _, statements_fetched_at = row
+    return company_etag(
+        company.updated_at,
+        getattr(score, "id", None),
+        getattr(score, "computed_at", None),
+        getattr(outreach, "updated_at", None),
+        statements_fetched_at,
+    )
+
+
+def company_detail(row) -> CompanyDetail:
+    if not row:
+        raise HTTPException(status_code=404, detail="Company not found")
+    # company_details_stmt rows stop after cash_conversion; company_detail_stmt adds the ETag column
+    company, score, fin, outreach, cash_conversion = row[:5]
+
+    return CompanyDetail(
+        orgnr=company.orgnr,
+        name=company.name,
+        nace=company.nace,
+        municipality=company.municipality,
+        website=company.website,
+        description=company.description,
+        latest_year=getattr(score, "year", None),
+        revenue=getattr(fin, "revenue", None),
+        ebitda=getattr(fin, "ebitda", None),
+        ebit=getattr(fin, "ebit", None),
+        cfo=getattr(fin, "cfo", None),
+        total_score=getattr(score, "total_score", None),
+        tags=getattr(score, "tags", None),
+        deployability=getattr(score, "deployability", None),
+        deployability_explanation=getattr(score, "deployability_explanation", None),
+        urgency=getattr(score, "urgency", None),
+        urgency_explanation=getattr(score, "urgency_explanation", None),
+        roic=getattr(score, "roic", None),
+        roic_score=getattr(score, "roic_score", None),
+        revenue_cagr=getattr(score, "revenue_cagr", None),
+        revenue_cagr_score=getattr(score, "revenue_cagr_score", None),
+        margin_change=getattr(score, "margin_change", None),
+        margin_change_score=getattr(score, "margin_change_score", None),
+        cash_conversion=cash_conversion,
+        nwc_sales=getattr(score, "nwc_sales", None),
+        nwc_sales_score=getattr(score, "nwc_sales_score", None),
+        goodwill_ratio=getattr(score, "goodwill_ratio", None),
+        goodwill_ratio_score=getattr(score, "goodwill_ratio_score", None),
+        outreach_owner=getattr(outreach, "owner", None),
+        outreach_status=getattr(outreach, "status", None),
+        outreach_note=getattr(outreach, "note", None),
+    )
+
+
+# ------------------------------------------------------------
+# /outreach/{orgnr}/update
+# ------------------------------------------------------------
+def apply_outreach_update(outreach: models.Outreach, payload: OutreachUpdateIn) -> None:
+    # updated_at feeds the /companies/{orgnr} ETag
+    outreach.updated_at = datetime.utcnow()
+    if payload.owner is not None:
+        outreach.owner = payload.owner
+    if payload.status is not None:
+        outreach.status = payload.status
+    if payload.note is not None:
+        outreach.note = payload.note
+    if payload.next_step_at is not None:
+        outreach.next_step_at = payload.next_step_at
@@ -0,0 +1,111 @@
+"""
+In-process response cache for the list endpoints.
+
+Entries expire after API_CACHE_TTL_SECONDS and are dropped as soon as the DB generation
+counter (app.generation) moves. The counter is re-read at most every
+API_GENERATION_POLL_SECONDS, so a cache hit usually needs no database round trip.
+Each payload carries a strong ETag (hash of the body) for If-None-Match / 304.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Hashable
+
+from fastapi import Request, Response
+
+API_CACHE_TTL_SECONDS = float(os.getenv("API_CACHE_TTL_SECONDS", "300"))
+API_GENERATION_POLL_SECONDS = float(os.getenv("API_GENERATION_POLL_SECONDS", "5"))
+API_CACHE_MAX_ENTRIES = int(os.getenv("API_CACHE_MAX_ENTRIES", "512"))
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+
+
+def etag_headers(etag: str) -> dict[str, str]:
+    # no-cache: browsers keep the payload but revalidate with If-None-Match every time
+    return {"ETag": etag, "Cache-Control": "no-cache"}
+
+
+def not_modified(request: Request, etag: str) -> Response | None:
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=etag_headers(etag))
+    return None
+
+
+def json_response(request: Request, body: bytes, etag: str) -> Response:
+    return not_modified(request, etag) or Response(
+        content=body, media_type="application/json", headers=etag_headers(etag)
+    )
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    body: bytes
+    etag: str
+    generation: int | None
+    expires_at: float
+
+    def to_response(self, request: Request) -> Response:
+        return json_response(request, self.body, self.etag)
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        ttl_seconds: float = API_CACHE_TTL_SECONDS,
+        generation_poll_seconds: float = API_GENERATION_POLL_SECONDS,
+        max_entries: int = API_CACHE_MAX_ENTRIES,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.generation_poll_seconds = generation_poll_seconds
+        self.max_entries = max_entries
+        self.generation: int | None = None
+        self._generation_checked_at = float("-inf")
+        self._entries: dict[Hashable, CachedResponse] = {}
+        self._lock = threading.Lock()
+
+    def generation_due(self) -> bool:
+        return time.monotonic() - self._generation_checked_at >= self.generation_poll_seconds
+
+    def set_generation(self, generation: int | None) -> None:
+        with self._lock:
+            if generation != self.generation:
+                self._entries.clear()
+                self.generation = generation
+            self._generation_checked_at = time.monotonic()
+
+    def get(self, key: Hashable) -> CachedResponse | None:
+        entry = self._entries.get(key)
+        if entry is None or entry.generation != self.generation or entry.expires_at <= time.monotonic():
+            return None
+        return entry
+
+    def put(self, key: Hashable, body: bytes, generation: int | None) -> CachedResponse:
+        """
+        generation is the value read before the payload was queried: a payload built while
+        a job bumped the counter is returned once but never served from the cache.
+        """
+        entry = CachedResponse(
+            body=body,
+            etag='"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"',
+            generation=generation,
+            expires_at=time.monotonic() + self.ttl_seconds,
+        )
+        with self._lock:
+            if key not in self._entries and len(self._entries) >= self.max_entries:
+                self._entries.pop(next(iter(self._entries)))
+            self._entries[key] = entry
+        return entry
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
@@ -1,6 +1,9 @@
 from __future__ import annotations
 from datetime import date, datetime
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+# Upper bound on orgnrs per POST /companies/batch (one IN list on the server)
+COMPANY_BATCH_MAX = 200
 
 
 class TopPickItem(BaseModel):
@@ -23,6 +26,16 @@ class CompanySummary(BaseModel):
     urgency: float | None = None
 
 
+class CompanyPage(BaseModel):
+    items: list[CompanySummary]
+    # Opaque keyset cursor for the next page; None on the last page
+    next_cursor: str | None = None
+
+
+class CompanyBatchIn(BaseModel):
+    orgnrs: list[str] = Field(min_length=1, max_length=COMPANY_BATCH_MAX)
+
+
 class OutreachUpdateIn(BaseModel):
     owner: str | None = None
     status: str | None = None
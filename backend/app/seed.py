@@ -4,16 +4,20 @@ from datetime import date
 import random
 from sqlalchemy.orm import Session
 
-from .db import SessionLocal, engine, Base
+from .db import SessionLocal, engine
 from . import models
+from .generation import bump_generation
+from .startup import create_schema
 
 def run():
-    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        create_schema(conn)
     db: Session = SessionLocal()
 
     # Clear existing for repeatable demo
     db.query(models.DailyTopPick).delete()
     db.query(models.Outreach).delete()
+    db.query(models.CompanyLatestScore).delete()
     db.query(models.Score).delete()
     db.query(models.FinancialStatement).delete()
     db.query(models.Company).delete()
@@ -68,6 +72,11 @@ def run():
 
     db.commit()
 
+    # Latest-score projection read by the API (2024 is the latest demo year)
+    for s in db.query(models.Score).filter(models.Score.year == years[-1]):
+        db.add(models.CompanyLatestScore(orgnr=s.orgnr, year=s.year, score_id=s.id))
+    db.commit()
+
     # Create today's top 10 based on latest year total_score
     today = date.today()
     latest_year = 2024
@@ -88,6 +97,7 @@ def run():
             total_score_snapshot=s.total_score
         ))
 
+    bump_generation(db)
     db.commit()
     db.close()
     print("Seed complete. Top 10 created for today.")
@@ -0,0 +1,114 @@
+"""
+API startup: schema handling and time-to-first-request.
+
+Workers no longer run Base.metadata.create_all on import. What they do instead is set by
+DB_SCHEMA_MODE:
+  check  (default) read the fingerprint stored in dbo.schema_version and refuse to start if
+         it differs from app.models; run `python -m app.create_tables` after model changes
+  create create missing tables and store the fingerprint (the old prototype behaviour)
+  skip   no schema work at all
+
+FirstRequestTimer logs how long after the API modules were imported the first request finished.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import time
+from datetime import datetime
+
+from sqlalchemy import Connection, MetaData, inspect, insert, select, update
+
+from .db import Base
+from . import models
+
+# Logged through uvicorn's logger so it shows up next to "Application startup complete."
+logger = logging.getLogger("uvicorn.error")
+
+IMPORTED_AT = time.perf_counter()
+
+SCHEMA_MODE = os.getenv("DB_SCHEMA_MODE", "check").lower()
+SCHEMA_NAME = "app.models"
+
+
+def schema_fingerprint(metadata: MetaData = Base.metadata) -> str:
+    """
+    Hash of every table's columns (name, type, nullability, primary key), foreign keys,
+    indexes and unique constraints. Declaration order does not matter.
+    """
+    lines = []
+    for table in sorted(metadata.tables.values(), key=lambda t: t.name):
+        lines.append(f"table {table.name}")
+        lines.extend(sorted(
+            f"  column {c.name} {c.type} nullable={c.nullable} pk={c.primary_key}"
+            for c in table.columns
+        ))
+        lines.extend(sorted(
+            f"  fk {fk.parent.name} -> {fk.target_fullname}" for fk in table.foreign_keys
+        ))
+        lines.extend(sorted(
+            f"  index {ix.name} unique={ix.unique} ({', '.join(c.name for c in ix.columns)})"
+            for ix in table.indexes
+        ))
+        lines.extend(sorted(
+            f"  unique {uc.name} ({', '.join(c.name for c in uc.columns)})"
+            for uc in table.constraints
+            if uc.__visit_name__ == "unique_constraint"
+        ))
+    return hashlib.sha256("\n".join(lines).encode()).hexdigest()
+
+
+def stored_fingerprint(conn: Connection) -> str | None:
+    if not inspect(conn).has_table(models.SchemaVersion.__tablename__):
+        return None
+    return conn.execute(
+        select(models.SchemaVersion.fingerprint).where(models.SchemaVersion.name == SCHEMA_NAME)
+    ).scalar()
+
+
+def create_schema(conn: Connection) -> None:
+    """
+    create_all plus the fingerprint the API checks at startup.
+    """
+    Base.metadata.create_all(bind=conn)
+    table = models.SchemaVersion
+    values = {"fingerprint": schema_fingerprint(), "applied_at": datetime.utcnow()}
+    result = conn.execute(update(table).where(table.name == SCHEMA_NAME).values(**values))
+    if result.rowcount == 0:
+        conn.execute(insert(table).values(name=SCHEMA_NAME, **values))
+
+
+def prepare_schema(conn: Connection, mode: str = SCHEMA_MODE) -> None:
+    t0 = time.perf_counter()
+    if mode == "create":
+        create_schema(conn)
+    elif mode == "check":
+        expected, stored = schema_fingerprint(), stored_fingerprint(conn)
+        if stored != expected:
+            raise RuntimeError(
+                f"Database schema fingerprint {stored or '(none)'} does not match app.models "
+                f"({expected}). Run `python -m app.create_tables`, or start with DB_SCHEMA_MODE=create."
+            )
+    elif mode != "skip":
+        raise ValueError(f"Unknown DB_SCHEMA_MODE {mode!r} (expected check, create or skip)")
+    logger.info("Schema %s took %.3fs", mode, time.perf_counter() - t0)
+
+
+class FirstRequestTimer:
+    """
+    ASGI middleware that logs the time from import to the end of the worker's first request.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.pending = True
+
+    async def __call__(self, scope, receive, send):
+        if not (self.pending and scope["type"] == "http"):
+            return await self.app(scope, receive, send)
+        self.pending = False
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            logger.info("Time to first request: %.3fs", time.perf_counter() - IMPORTED_AT)
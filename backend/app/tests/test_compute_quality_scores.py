@@ -0,0 +1,313 @@
+from __future__ import annotations
+
+import random
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import fields, replace
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from app import models
+from app.db import Base
+from app.jobs.compute_quality_scores import (
+    QS_V2,
+    ScoreCache,
+    ScoreWriter,
+    ScoringModel,
+    build_features,
+    bulk_upsert_scores,
+    compact_score_tags,
+    compute_history_metrics,
+    compute_scores,
+    compute_scores_vectorized,
+    group_history_by_orgnr,
+    iter_scoring_batches,
+    iter_year_windows,
+    merge_tags,
+    score_financial_rows,
+    score_financial_rows_parallel,
+    score_models,
+)
+
+
+HISTORY_KEYS = (
+    "revenue", "ebit", "equity", "total_debt", "cash_equivalents",
+    "cogs", "depreciation", "inventory", "trade_receivables", "trade_payables",
+)
+
+
+def make_universe(n_companies: int, year: int = 2024, seed: int = 7):
+    """
+    Synthetic financial_statement rows covering the awkward cases:
+    missing values, zero/negative revenue, single-year histories and companies without history.
+    """
+    rng = random.Random(seed)
+
+    def value(scale: float):
+        roll = rng.random()
+        if roll < 0.08:
+            return None
+        if roll < 0.12:
+            return 0.0
+        return rng.uniform(-0.2, 1.0) * scale
+
+    fs_current: list[dict[str, object]] = []
+    history: list[dict[str, object]] = []
+    for i in range(n_companies):
+        orgnr = f"{900000000 + i}"
+        n_years = rng.choice([0, 1, 2, 3, 5, 5, 5])
+        years = sorted(rng.sample(range(year - 4, year + 1), n_years))
+        rows = []
+        for y in years:
+            row = {"orgnr": orgnr, "year": y}
+            row.update({key: value(rng.choice([1_000, 50_000, 2_000_000])) for key in HISTORY_KEYS})
+            row["goodwill"] = value(200_000)
+            rows.append(row)
+        rng.shuffle(rows)
+        history.extend(rows)
+
+        fs_current.append({
+            "orgnr": orgnr,
+            "year": year,
+            "revenue": value(2_000_000),
+            "ebit": value(200_000),
+            "equity": value(500_000),
+            "goodwill": value(200_000),
+            "total_debt": value(500_000),
+            "cash_equivalents": value(100_000),
+        })
+    rng.shuffle(history)
+    return fs_current, history
+
+
+class TestVectorizedScoring(unittest.TestCase):
+    def test_matches_scalar_path(self):
+        fs_current, history = make_universe(20_000)
+
+        scalar = compute_scores(build_features(fs_current, compute_history_metrics(history)))
+        vectorized = compute_scores_vectorized(fs_current, history)
+
+        self.assertEqual(len(scalar), len(vectorized))
+        for s, v in zip(scalar, vectorized):
+            self.assertEqual((s.orgnr, s.year), (v.orgnr, v.year))
+            self.assertEqual(s.tags, v.tags)
+            for name in (f.name for f in fields(s)):
+                if name in ("orgnr", "year", "tags"):
+                    continue
+                self.assertEqual(getattr(s, name), getattr(v, name), f"{s.orgnr}.{name}")
+
+    def test_empty_inputs(self):
+        self.assertEqual(compute_scores_vectorized([], []), [])
+        fs_current, _ = make_universe(3)
+        scalar = compute_scores(build_features(fs_current, compute_history_metrics([])))
+        vectorized = compute_scores_vectorized(fs_current, [])
+        self.assertEqual([s.compounder_score for s in scalar], [v.compounder_score for v in vectorized])
+
+
+class TestYearWindows(unittest.TestCase):
+    def test_sliding_window_matches_per_year_fetch(self):
+        _, history = make_universe(500)
+        by_orgnr = group_history_by_orgnr(history)
+
+        for year, fs_current, window in iter_year_windows(by_orgnr, range(2020, 2025)):
+            expected_current = [r for r in history if r["year"] == year]
+            current_orgnrs = {r["orgnr"] for r in expected_current}
+            expected_window = [
+                r for r in history
+                if year - 4 <= r["year"] <= year and r["orgnr"] in current_orgnrs
+            ]
+            self.assertEqual(
+                sorted(r["orgnr"] for r in fs_current),
+                sorted(current_orgnrs),
+            )
+            expected = {
+                s.orgnr: s for s in score_financial_rows(expected_current, expected_window)
+            }
+            for score in score_financial_rows(fs_current, window):
+                self.assertEqual(score, expected[score.orgnr])
+
+
+class TestStreamingBatches(unittest.TestCase):
+    def test_batches_cover_every_company_once(self):
+        fs_current, history = make_universe(1_000)
+        history.sort(key=lambda r: (r["orgnr"], r["year"]))
+        groups = [
+            [r for r in history if r["orgnr"] == orgnr]
+            for orgnr in sorted({r["orgnr"] for r in history})
+        ]
+
+        batches = list(iter_scoring_batches(groups, 2024, batch_companies=100))
+        self.assertTrue(all(len(fs) <= 100 for fs, _ in batches))
+
+        streamed = [s for fs, hist in batches for s in score_financial_rows(fs, hist)]
+        current = [r for r in history if r["year"] == 2024]
+        expected = score_financial_rows(current, history)
+        self.assertEqual(streamed, expected)
+
+
+class TestScoringModels(unittest.TestCase):
+    def test_models_share_one_feature_build(self):
+        fs_current, history = make_universe(200)
+        doubled_roic = ScoringModel.from_dict({
+            "model_id": "QS_test",
+            "components": [
+                {**c.curve, "feature": c.feature, "key": c.key, "weight": 2.0 if c.key == "roic_score" else 1.0}
+                for c in QS_V2.components
+            ],
+        })
+
+        for engine_name in ("scalar", "vectorized"):
+            results = score_models(fs_current, history, [QS_V2, doubled_roic], engine_name)
+            self.assertEqual(results["QS_v2"], score_financial_rows(fs_current, history, engine_name))
+            for prod, candidate in zip(results["QS_v2"], results["QS_test"]):
+                self.assertEqual(candidate.roic_score, 2.0 * prod.roic_score)
+                self.assertTrue(candidate.tags.startswith("QS_test;"))
+
+
+class TestScoreCache(unittest.TestCase):
+    def setUp(self):
+        self.run_started_at = datetime(2025, 1, 1)
+
+    def run_cached(self, db, fs_current, history, engine_name, model=QS_V2, incremental=False):
+        # Same order as the job: write the scores, then save the cache with their computed_at
+        self.run_started_at += timedelta(hours=1)
+        with Session(db) as session:
+            cache = ScoreCache(model).load(session, [2024])
+            scores = score_financial_rows(fs_current, history, engine_name, cache)
+            bulk_upsert_scores(session, scores, computed_at=self.run_started_at)
+            cache.save(session, self.run_started_at, stamp_hits=incremental)
+            session.commit()
+        return cache, scores
+
+    def make_db(self):
+        db = create_engine("sqlite://")
+        Base.metadata.create_all(db)
+        return db
+
+    def test_unchanged_companies_are_skipped(self):
+        for engine_name in ("scalar", "vectorized"):
+            db = self.make_db()
+            fs_current, history = make_universe(300)
+
+            cache, first = self.run_cached(db, fs_current, history, engine_name)
+            self.assertEqual(first, score_financial_rows(fs_current, history, engine_name))
+            self.assertEqual((cache.hits, cache.misses), (0, 300))
+
+            fs_current[0] = {**fs_current[0], "revenue": 123_456.0}
+            cache, second = self.run_cached(db, fs_current, history, engine_name)
+            self.assertEqual([s.orgnr for s in second], [fs_current[0]["orgnr"]])
+            self.assertEqual((cache.hits, cache.misses), (299, 1))
+
+            # Same model_id, different curve: every hash is stale
+            edited = ScoringModel.from_dict({
+                "model_id": QS_V2.model_id,
+                "components": [{**c.curve, "feature": c.feature, "key": c.key} for c in QS_V2.components[:-1]],
+            })
+            cache, third = self.run_cached(db, fs_current, history, engine_name, edited)
+            self.assertEqual(len(third), 300)
+
+    def test_hits_leave_scores_untouched(self):
+        db = self.make_db()
+        fs_current, history = make_universe(300)
+        self.run_cached(db, fs_current, history, "vectorized")
+        first_run = self.run_started_at
+
+        def stamps(column):
+            with Session(db) as session:
+                return set(session.scalars(select(column)))
+
+        # A full run's hits write nothing, so the company ETags (score.computed_at) hold
+        cache, _ = self.run_cached(db, fs_current, history, "vectorized")
+        self.assertEqual(cache.hits, 300)
+        self.assertEqual(stamps(models.Score.computed_at), {first_run})
+        self.assertEqual(stamps(models.ScoreFeatureCache.computed_at), {first_run})
+
+        # Incremental hits only move the cache rows' computed_at (see CHANGED_ORGNRS_SQL)
+        cache, _ = self.run_cached(db, fs_current, history, "vectorized", incremental=True)
+        self.assertEqual(cache.hits, 300)
+        self.assertEqual(stamps(models.Score.computed_at), {first_run})
+        self.assertEqual(stamps(models.ScoreFeatureCache.computed_at), {self.run_started_at})
+        cache, _ = self.run_cached(db, fs_current, history, "vectorized")
+        self.assertEqual(cache.hits, 300)
+
+    def test_rewritten_score_invalidates_entry(self):
+        db = self.make_db()
+        fs_current, history = make_universe(300)
+        self.run_cached(db, fs_current, history, "scalar")
+
+        rewritten = fs_current[5]["orgnr"]
+        with Session(db) as session:
+            score = session.scalars(select(models.Score).where(models.Score.orgnr == rewritten)).one()
+            score.total_score = -1.0
+            score.computed_at = datetime(2030, 1, 1)
+            session.commit()
+
+        cache, second = self.run_cached(db, fs_current, history, "scalar")
+        self.assertEqual([s.orgnr for s in second], [rewritten])
+        self.assertEqual((cache.hits, cache.misses), (299, 1))
+
+
+class TestScoreWriter(unittest.TestCase):
+    def test_key_repeated_across_batches_last_wins(self):
+        db = create_engine("sqlite://")
+        Base.metadata.create_all(db)
+        fs_current, history = make_universe(50)
+        scores = score_financial_rows(fs_current, history, "vectorized")
+        rescored = replace(scores[0], quality_score=-1.0)
+
+        with Session(db) as session:
+            writer = ScoreWriter(session)
+            writer.add(scores[:30])
+            writer.add([rescored, *scores[30:]])
+            report = writer.finish()
+            session.commit()
+            rows = session.scalars(select(models.Score).where(models.Score.orgnr == rescored.orgnr)).all()
+
+        self.assertEqual(report.inserted, 50)
+        self.assertEqual([row.total_score for row in rows], [-1.0])
+
+
+class TestTags(unittest.TestCase):
+    NEW = "QS_v2;view=company;rev_band=0.5-1bn;roic=12.0%;cagr=4.1%"
+
+    def test_merge_is_idempotent(self):
+        old = "QS_v2;view=company;rev_band=<0.5bn;roic=9.0%;cagr=na"
+        once = merge_tags(old, self.NEW)
+        self.assertEqual(once, self.NEW)
+        self.assertEqual(merge_tags(once, self.NEW), once)
+        self.assertEqual(merge_tags(None, "a;a;k=1;k=2"), "a;k=2")
+        self.assertEqual(merge_tags("ebitda>=50", None), "ebitda>=50")
+
+    def test_compacts_legacy_appended_tags(self):
+        db = create_engine("sqlite://")
+        Base.metadata.create_all(db)
+        legacy = " | ".join([self.NEW.replace("12.0%", "11.0%")] * 20 + [self.NEW])
+        with Session(db) as session:
+            session.add(models.Score(orgnr="900000001", year=2024, tags=legacy))
+            session.add(models.Score(orgnr="900000002", year=2024, tags=self.NEW))
+            session.commit()
+
+            self.assertEqual(compact_score_tags(session), 1)
+            session.commit()
+            self.assertEqual(
+                session.scalars(select(models.Score.tags)).all(),
+                [self.NEW, self.NEW],
+            )
+
+
+class TestParallelScoring(unittest.TestCase):
+    def test_sharded_scores_match_serial(self):
+        fs_current, history = make_universe(300)
+        expected = sorted(
+            score_financial_rows(fs_current, history, "vectorized"),
+            key=lambda s: (s.year, s.orgnr),
+        )
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            actual = score_financial_rows_parallel(executor, 3, fs_current, history, "vectorized")
+        self.assertEqual(actual, expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
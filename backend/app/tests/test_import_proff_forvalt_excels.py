@@ -0,0 +1,231 @@
+from __future__ import annotations
+
+import tempfile
+import unittest
+from contextlib import contextmanager
+from pathlib import Path
+from unittest import mock
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.pool import StaticPool
+
+from app.jobs import import_proff_forvalt_excels as job
+
+
+FIRM_HEADER = job.SheetHeader.from_row([
+    "Orgnr", "Juridisk selskapsnavn", "Kommune", "Sum driftsinnt., 2024", "Driftsres., 2024",
+])
+CONTACT_HEADER = job.SheetHeader.from_row([
+    "Orgnr", "Juridisk selskapsnavn", "Navn", "Rolle", "Telefon",
+])
+
+# SQLite stand-ins for the ledger tables of ENSURE_IMPORT_LEDGER, in an attached "dbo" database
+LEDGER_TABLES = (
+    """
+    CREATE TABLE dbo.import_file_ledger (
+        file_hash CHAR(64) NOT NULL PRIMARY KEY,
+        file_name VARCHAR(260) NOT NULL,
+        sheet_rows INT NOT NULL,
+        changed_rows INT NOT NULL,
+        imported_at_utc DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE dbo.import_row_ledger (
+        sheet VARCHAR(100) NOT NULL,
+        key_hash BLOB NOT NULL,
+        orgnr VARCHAR(9) NOT NULL,
+        row_hash BLOB NOT NULL,
+        PRIMARY KEY (sheet, key_hash)
+    )
+    """,
+)
+
+
+def make_ledger_engine():
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+
+    @event.listens_for(engine, "connect")
+    def attach_dbo(dbapi_connection, _):
+        dbapi_connection.execute("ATTACH DATABASE ':memory:' AS dbo")
+
+    with engine.begin() as conn:
+        for ddl in LEDGER_TABLES:
+            conn.exec_driver_sql(ddl)
+    return engine
+
+
+class LedgerConnection:
+    """
+    Runs the ledger statements on SQLite and records what StagedImport sends to the
+    SQL Server #stage tables (temp table DDL and inserts), keyed by stage table.
+    """
+
+    T_SQL_ONLY = (job.CREATE_IMPORT_STAGES, job.DROP_IMPORT_STAGES, job.ENSURE_IMPORT_LEDGER)
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.staged: dict[str, list[tuple]] = {}
+
+    def exec_driver_sql(self, sql, params=None):
+        if sql in self.T_SQL_ONLY:
+            return None
+        if sql.startswith("INSERT INTO #"):
+            self.staged.setdefault(sql.split()[2], []).extend(params)
+            return None
+        return self.conn.exec_driver_sql(sql, params)
+
+    def execute(self, statement, params=None):
+        if str(statement) in self.T_SQL_ONLY:
+            return None
+        return self.conn.execute(statement, params)
+
+
+class LedgerEngine:
+    def __init__(self, engine):
+        self.engine = engine
+
+    @contextmanager
+    def begin(self):
+        with self.engine.begin() as conn:
+            yield LedgerConnection(conn)
+
+
+def firm_row(orgnr: str, revenue: float, name: str = "Test AS") -> tuple:
+    return (orgnr, name, "Oslo", revenue, revenue / 10)
+
+
+def contact_row(orgnr: str, person: str, phone: str) -> tuple:
+    return (orgnr, "Test AS", person, "Daglig leder", phone)
+
+
+class TestRowLedger(unittest.TestCase):
+    def setUp(self):
+        self.engine = make_ledger_engine()
+        # Flush every add() to the stage recorder
+        patcher = mock.patch.object(job, "IMPORT_BATCH_ROWS", 1)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def stage(self, *batches: job.ParsedBatch, force: bool = False):
+        """
+        Stages the batches like write_file, then applies the ledger rows as
+        MERGE_ROW_LEDGER_STAGE would (last staged row per key wins).
+        """
+        report = job.ImportReport(file="test.xlsx")
+        with self.engine.begin() as sqlite_conn:
+            conn = LedgerConnection(sqlite_conn)
+            staged = job.StagedImport(conn, report, force=force)
+            for batch in batches:
+                staged.add(batch)
+            for sheet, key_hash, orgnr, row_hash in conn.staged.get("#row_ledger_stage", []):
+                sqlite_conn.exec_driver_sql(
+                    "INSERT OR REPLACE INTO dbo.import_row_ledger (sheet, key_hash, orgnr, row_hash) "
+                    "VALUES (?, ?, ?, ?)",
+                    (sheet, key_hash, orgnr, row_hash),
+                )
+        return report, conn.staged
+
+    def test_unchanged_rows_are_not_staged_again(self):
+        firms = [firm_row("910000001", 1000.0), firm_row("910000002", 2000.0)]
+        report, staged = self.stage(job.parse_firm_rows(FIRM_HEADER, firms))
+        self.assertEqual(report.unchanged, 0)
+        self.assertEqual(len(staged["#company_stage"]), 2)
+
+        firms[1] = firm_row("910000002", 2500.0)
+        report, staged = self.stage(job.parse_firm_rows(FIRM_HEADER, firms))
+        self.assertEqual(report.unchanged, 1)
+        self.assertEqual([row[0] for row in staged["#company_stage"]], ["910000002"])
+        self.assertEqual([row[:3] for row in staged["#fin_stage"]], [("910000002", 2024, 2500.0)])
+
+        report, staged = self.stage(job.parse_firm_rows(FIRM_HEADER, firms), force=True)
+        self.assertEqual(len(staged["#company_stage"]), 2)
+
+    def test_repeated_key_stages_every_row_after_the_first_change(self):
+        self.stage(job.parse_firm_rows(FIRM_HEADER, [firm_row("910000001", 1000.0)]))
+
+        # The changed row comes first; the later row matches the ledger but must still be
+        # staged, or the MERGE would keep the changed row instead of the last one
+        rows = [firm_row("910000001", 5000.0), firm_row("910000001", 1000.0)]
+        report, staged = self.stage(job.parse_firm_rows(FIRM_HEADER, rows))
+        self.assertEqual(report.unchanged, 0)
+        self.assertEqual([row[:3] for row in staged["#fin_stage"]], [
+            ("910000001", 2024, 5000.0), ("910000001", 2024, 1000.0),
+        ])
+
+        # Same across batches of one file
+        report, staged = self.stage(
+            job.parse_firm_rows(FIRM_HEADER, [firm_row("910000001", 7000.0)]),
+            job.parse_firm_rows(FIRM_HEADER, [firm_row("910000001", 1000.0)]),
+        )
+        self.assertEqual(report.unchanged, 0)
+        self.assertEqual(len(staged["#company_stage"]), 2)
+
+        # Unchanged first, changed later: only the changed row is staged
+        rows = [firm_row("910000001", 1000.0), firm_row("910000001", 9000.0)]
+        report, staged = self.stage(job.parse_firm_rows(FIRM_HEADER, rows))
+        self.assertEqual(report.unchanged, 1)
+        self.assertEqual([row[:3] for row in staged["#fin_stage"]], [("910000001", 2024, 9000.0)])
+
+    def test_keys_are_hashed_per_sheet(self):
+        firms = [firm_row("910000001", 1000.0)]
+        contacts = [
+            contact_row("910000001", "Kari Nordmann", "+47 11 11 11 11"),
+            contact_row("910000001", "Ola Nordmann", "+47 22 22 22 22"),
+        ]
+        self.stage(job.parse_firm_rows(FIRM_HEADER, firms), job.parse_contact_rows(CONTACT_HEADER, contacts))
+
+        # One contact of the same orgnr changes: the Firmainfo row and the other contact stay unchanged
+        contacts[1] = contact_row("910000001", "Ola Nordmann", "+47 99 99 99 99")
+        report, staged = self.stage(
+            job.parse_firm_rows(FIRM_HEADER, firms), job.parse_contact_rows(CONTACT_HEADER, contacts)
+        )
+        self.assertEqual(report.unchanged, 2)
+        self.assertNotIn("#company_stage", staged)
+        self.assertEqual([row[2] for row in staged["#contact_stage"]], ["Ola Nordmann"])
+        self.assertEqual({row[0] for row in staged["#row_ledger_stage"]}, {job.SHEET_CONTACTS})
+
+        firm_key, _, _ = job.parse_firm_rows(FIRM_HEADER, firms).hashes[0]
+        contact_keys = {key for key, _, _ in job.parse_contact_rows(CONTACT_HEADER, contacts).hashes}
+        self.assertEqual(len(contact_keys), 2)
+        self.assertNotIn(firm_key, contact_keys)
+
+        # A ledger entry filed under the other sheet does not count as seen
+        other = firm_row("910000003", 3000.0)
+        key, row_hash, orgnr = job.parse_firm_rows(FIRM_HEADER, [other]).hashes[0]
+        with self.engine.begin() as conn:
+            conn.exec_driver_sql(
+                "INSERT INTO dbo.import_row_ledger (sheet, key_hash, orgnr, row_hash) VALUES (?, ?, ?, ?)",
+                (job.SHEET_CONTACTS, key, orgnr, row_hash),
+            )
+        report, staged = self.stage(job.parse_firm_rows(FIRM_HEADER, [other]))
+        self.assertEqual(report.unchanged, 0)
+        self.assertEqual([row[0] for row in staged["#company_stage"]], ["910000003"])
+
+
+class TestFileLedger(unittest.TestCase):
+    def test_identical_file_is_skipped_before_parsing(self):
+        engine = make_ledger_engine()
+        with tempfile.TemporaryDirectory() as tmp:
+            # Not a workbook: parsing it would fail, so a skip must come from the file ledger
+            path = Path(tmp) / "export_copy.xlsx"
+            path.write_bytes(b"same bytes as export.xlsx")
+            with engine.begin() as conn:
+                conn.execute(
+                    text(
+                        "INSERT INTO dbo.import_file_ledger (file_hash, file_name, sheet_rows, changed_rows) "
+                        "VALUES (:file_hash, 'export.xlsx', 10, 10)"
+                    ),
+                    {"file_hash": job.file_hash(path)},
+                )
+
+            report = job.import_one_file(LedgerEngine(engine), path)
+            self.assertEqual(report.duplicate_of, "export.xlsx")
+            self.assertEqual(report.sheet_rows, 0)
+
+            path.write_bytes(b"different bytes")
+            self.assertIsNone(job.imported_as(LedgerEngine(engine), job.file_hash(path)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import unittest
+from datetime import datetime
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app import models
+from app.db import Base, get_db
+from app.main import app
+from app.schemas import COMPANY_BATCH_MAX
+
+
+def seed_companies(session: Session, n_companies: int = 6) -> None:
+    """
+    Companies with six years of statements, a latest score and outreach; the last company
+    has neither score nor statements. Some years have ebit = 0 or no depreciation, so the
+    cash-conversion average skips them.
+    """
+    for i in range(n_companies):
+        orgnr = f"9200000{i:02d}"
+        session.add(models.Company(orgnr=orgnr, name=f"Company {i}", nace="62.01", municipality="Oslo"))
+        if i == n_companies - 1:
+            continue
+        for year in range(2019, 2025):
+            session.add(models.FinancialStatement(
+                orgnr=orgnr,
+                year=year,
+                revenue=1000.0 * (i + 1) + year,
+                ebitda=150.0 + i,
+                ebit=0.0 if (year + i) % 4 == 0 else 100.0 + 10 * i + year % 7,
+                depreciation=None if (year + i) % 3 == 0 else 20.0 + year % 5,
+                fetched_at_utc=datetime(2025, 1, 1),
+            ))
+        score = models.Score(
+            orgnr=orgnr,
+            year=2024,
+            total_score=50.0 + i,
+            tags="QS_v2;view=company",
+            computed_at=datetime(2025, 1, 2),
+        )
+        session.add(score)
+        session.flush()
+        session.add(models.CompanyLatestScore(orgnr=orgnr, year=2024, score_id=score.id))
+        if i % 2 == 0:
+            session.add(models.Outreach(orgnr=orgnr, status="new", updated_at=datetime(2025, 1, 3)))
+    session.commit()
+
+
+class ApiTestCase(unittest.TestCase):
+    def setUp(self):
+        engine = create_engine(
+            "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+        )
+        Base.metadata.create_all(engine)
+        self.Session = sessionmaker(bind=engine, autoflush=False)
+        with self.Session() as session:
+            seed_companies(session)
+
+        def get_test_db():
+            db = self.Session()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        # No `with`: the lifespan schema check is for the configured database, not this one
+        app.dependency_overrides[get_db] = get_test_db
+        self.addCleanup(app.dependency_overrides.clear)
+        self.client = TestClient(app)
+
+
+class TestCompanyDetailETag(ApiTestCase):
+    ORGNR = "920000000"
+
+    def assert_revalidates(self, etag: str, if_none_match: str | None = None) -> None:
+        response = self.client.get(
+            f"/companies/{self.ORGNR}", headers={"If-None-Match": if_none_match or etag}
+        )
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.headers["etag"], etag)
+
+    def assert_new_etag(self, etag: str) -> str:
+        # A stale If-None-Match gets the full detail and an ETag the version query agrees with
+        response = self.client.get(f"/companies/{self.ORGNR}", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers["etag"], etag)
+        self.assert_revalidates(response.headers["etag"])
+        return response.headers["etag"]
+
+    def test_matching_etag_returns_304(self):
+        response = self.client.get(f"/companies/{self.ORGNR}")
+        self.assertEqual(response.status_code, 200)
+        etag = response.headers["etag"]
+        self.assert_revalidates(etag)
+        self.assert_revalidates(etag, f'W/{etag}, "other"')
+
+    def test_etag_changes_with_every_version_column(self):
+        etag = self.client.get(f"/companies/{self.ORGNR}").headers["etag"]
+
+        response = self.client.post(f"/outreach/{self.ORGNR}/update", json={"status": "contacted"})
+        self.assertEqual(response.status_code, 200)
+        etag = self.assert_new_etag(etag)
+
+        with self.Session() as session:
+            score = session.scalars(select(models.Score).where(models.Score.orgnr == self.ORGNR)).one()
+            score.total_score = 99.0
+            score.computed_at = datetime(2025, 2, 1)
+            session.commit()
+        etag = self.assert_new_etag(etag)
+
+        with self.Session() as session:
+            statement = session.scalars(
+                select(models.FinancialStatement).where(
+                    models.FinancialStatement.orgnr == self.ORGNR, models.FinancialStatement.year == 2021
+                )
+            ).one()
+            statement.revenue = 1.0
+            statement.fetched_at_utc = datetime(2025, 3, 1)
+            session.commit()
+        self.assert_new_etag(etag)
+
+    def test_unknown_company(self):
+        self.assertEqual(self.client.get("/companies/999999999").status_code, 404)
+        response = self.client.get("/companies/999999999", headers={"If-None-Match": '"x"'})
+        self.assertEqual(response.status_code, 404)
+
+
+
+class TestCompaniesBatch(ApiTestCase):
+    def test_matches_single_company_detail(self):
+        orgnrs = [f"9200000{i:02d}" for i in (3, 0, 5, 1, 4, 2)]
+        response = self.client.post("/companies/batch", json={"orgnrs": orgnrs})
+        self.assertEqual(response.status_code, 200)
+
+        # Same rows as company_detail_stmt, incl. the row_number cash-conversion window
+        singles = [self.client.get(f"/companies/{orgnr}").json() for orgnr in orgnrs]
+        self.assertEqual(response.json(), singles)
+        self.assertIsNotNone(singles[0]["cash_conversion"])
+        self.assertIsNone(singles[2]["cash_conversion"])
+
+    def test_duplicates_and_unknown_orgnrs(self):
+        response = self.client.post(
+            "/companies/batch", json={"orgnrs": ["920000002", "999999999", "920000000", "920000002"]}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item["orgnr"] for item in response.json()], ["920000002", "920000000"])
+
+    def test_request_size_is_validated(self):
+        self.assertEqual(self.client.post("/companies/batch", json={"orgnrs": []}).status_code, 422)
+        orgnrs = [f"{i:09d}" for i in range(COMPANY_BATCH_MAX + 1)]
+        self.assertEqual(self.client.post("/companies/batch", json={"orgnrs": orgnrs}).status_code, 422)
+        response = self.client.post("/companies/batch", json={"orgnrs": orgnrs[:COMPANY_BATCH_MAX]})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
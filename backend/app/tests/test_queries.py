@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import unittest
+from datetime import datetime
+
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app import models
+from app.db import Base
+from app.queries import (
+    COMPANY_SORT_COLUMNS,
+    CompanyListParams,
+    _decode_cursor,
+    _encode_cursor,
+    company_page,
+    company_page_stmt,
+)
+
+
+def list_params(**kwargs) -> CompanyListParams:
+    # The Query() defaults only resolve inside FastAPI
+    return CompanyListParams(**{"limit": 100, "cursor": None, "nace": None, **kwargs})
+
+
+def make_companies(session: Session) -> None:
+    """
+    12 companies: names and scores tie in pairs, and every third company has no score.
+    """
+    for i in range(12):
+        orgnr = f"9100000{i:02d}"
+        session.add(models.Company(orgnr=orgnr, name=f"Company {i // 2}", nace="62.01"))
+        if i % 3 == 2:
+            continue
+        score = models.Score(
+            orgnr=orgnr,
+            year=2024,
+            total_score=float(i // 4),
+            compounder_score=float(i % 2),
+            deployability=1.0,
+            urgency=0.5 * (i // 6),
+            computed_at=datetime(2025, 1, 1),
+        )
+        session.add(score)
+        session.flush()
+        session.add(models.CompanyLatestScore(orgnr=orgnr, year=2024, score_id=score.id))
+    session.commit()
+
+
+class TestCompanyCursor(unittest.TestCase):
+    def setUp(self):
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(engine)
+        self.session = Session(engine)
+        self.addCleanup(self.session.close)
+        make_companies(self.session)
+
+    def fetch(self, params: CompanyListParams) -> dict[str, object]:
+        return company_page(self.session.execute(company_page_stmt(params)).all(), params)
+
+    def test_cursor_round_trip(self):
+        for value in ("Company 3", 4.5, None):
+            cursor = _encode_cursor("total_score", "desc", value, "910000007")
+            self.assertEqual(_decode_cursor(cursor, "total_score", "desc"), (value, "910000007"))
+
+        cursor = _encode_cursor("total_score", "desc", 4.5, "910000007")
+        for sort, order in (("total_score", "asc"), ("urgency", "desc")):
+            with self.assertRaises(HTTPException) as raised:
+                _decode_cursor(cursor, sort, order)
+            self.assertEqual(raised.exception.status_code, 400)
+        with self.assertRaises(HTTPException):
+            _decode_cursor("not a cursor", "total_score", "desc")
+
+    def test_pages_match_one_full_listing(self):
+        for sort in COMPANY_SORT_COLUMNS:
+            for order in ("asc", "desc"):
+                with self.subTest(sort=sort, order=order):
+                    full = self.fetch(list_params(sort=sort, order=order))
+                    self.assertIsNone(full["next_cursor"])
+                    expected = [item["orgnr"] for item in full["items"]]
+
+                    seen, cursor = [], None
+                    while True:
+                        page = self.fetch(list_params(limit=5, sort=sort, order=order, cursor=cursor))
+                        seen.extend(item["orgnr"] for item in page["items"])
+                        cursor = page["next_cursor"]
+                        if cursor is None:
+                            break
+                    self.assertEqual(seen, expected)
+
+    def test_ties_break_on_orgnr_and_nulls_sort_last(self):
+        for order in ("asc", "desc"):
+            items = self.fetch(list_params(sort="compounder_score", order=order))["items"]
+            keys = [(item["compounder_score"] is None, item["compounder_score"], item["orgnr"]) for item in items]
+            scored = [key for key in keys if not key[0]]
+            unscored = [key for key in keys if key[0]]
+            self.assertEqual(keys, scored + unscored)
+            self.assertEqual(scored, sorted(scored, reverse=order == "desc"))
+            self.assertEqual(unscored, sorted(unscored, reverse=order == "desc"))
+
+        # A page boundary inside a tie: the next page starts at the next orgnr of the same value
+        first = self.fetch(list_params(limit=3, sort="name"))
+        self.assertEqual([item["name"] for item in first["items"]], ["Company 0", "Company 0", "Company 1"])
+        second = self.fetch(list_params(limit=3, sort="name", cursor=first["next_cursor"]))
+        self.assertEqual(second["items"][0]["name"], "Company 1")
+        self.assertGreater(second["items"][0]["orgnr"], first["items"][-1]["orgnr"])
+
+
+if __name__ == "__main__":
+    unittest.main()
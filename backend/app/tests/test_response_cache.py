@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import unittest
+from unittest import mock
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.db import Base
+from app.generation import bump_generation, generation_stmt
+from app.response_cache import ResponseCache
+
+
+class TestGenerationInvalidation(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite://")
+        Base.metadata.create_all(self.engine)
+        self.clock = 1000.0
+        patcher = mock.patch("app.response_cache.time.monotonic", lambda: self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def read_generation(self, cache: ResponseCache) -> int | None:
+        # Same as app.main._cache_generation
+        if cache.generation_due():
+            with Session(self.engine) as session:
+                cache.set_generation(session.execute(generation_stmt()).scalar())
+        return cache.generation
+
+    def bump(self) -> None:
+        with Session(self.engine) as session:
+            bump_generation(session)
+            session.commit()
+
+    def test_bump_drops_cached_payloads(self):
+        cache = ResponseCache(ttl_seconds=300, generation_poll_seconds=0)
+        generation = self.read_generation(cache)
+        self.assertIsNone(generation)
+        cache.put("companies", b"[1]", generation)
+        self.assertEqual(cache.get("companies").body, b"[1]")
+
+        self.bump()
+        self.assertEqual(self.read_generation(cache), 1)
+        self.assertIsNone(cache.get("companies"))
+
+        cache.put("companies", b"[2]", 1)
+        self.bump()
+        self.assertEqual(self.read_generation(cache), 2)
+        self.assertIsNone(cache.get("companies"))
+
+    def test_payload_built_across_a_bump_is_not_served(self):
+        cache = ResponseCache(ttl_seconds=300, generation_poll_seconds=0)
+        generation = self.read_generation(cache)
+
+        # A job commits while the payload is being queried
+        self.bump()
+        self.read_generation(cache)
+        cache.put("companies", b"[stale]", generation)
+        self.assertIsNone(cache.get("companies"))
+
+    def test_generation_is_polled_at_most_every_interval(self):
+        cache = ResponseCache(ttl_seconds=300, generation_poll_seconds=5)
+        cache.put("companies", b"[1]", self.read_generation(cache))
+
+        self.bump()
+        self.clock += 4
+        self.assertFalse(cache.generation_due())
+        self.assertIsNone(self.read_generation(cache))
+        self.assertIsNotNone(cache.get("companies"))
+
+        self.clock += 1
+        self.assertEqual(self.read_generation(cache), 1)
+        self.assertIsNone(cache.get("companies"))
+
+    def test_unchanged_generation_keeps_entries_until_ttl(self):
+        cache = ResponseCache(ttl_seconds=300, generation_poll_seconds=0)
+        self.bump()
+        entry = cache.put("companies", b"[1]", self.read_generation(cache))
+
+        self.clock += 299
+        self.assertEqual(self.read_generation(cache), 1)
+        self.assertIs(cache.get("companies"), entry)
+        self.clock += 1
+        self.assertIsNone(cache.get("companies"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,218 @@
+"""
+Latency benchmark for GET /companies/{orgnr} against a local SQLite stand-in.
+
+Variants, timed on the same database and the same random orgnrs:
+  five_queries - the previous get_company: company, latest score, statement, 4-year
+                 history and outreach as separate queries, cash conversion in Python
+  single_query - the detail build app.main.get_company runs (one composed query)
+  etag_check   - the revalidation query get_company runs first when the client
+                 sends If-None-Match (a 304 needs nothing else)
+
+Then a --batch sized shortlist: single_query in a loop (one session per company, like
+repeated GETs) against one POST /companies/batch query.
+
+Each request gets its own session, like the get_db dependency.
+
+Usage (from backend/):
+    python benchmarks/bench_company_detail.py --companies 50000 --requests 2000
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from statistics import mean, quantiles
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+
+def build_database(session_factory, models, companies: int, years: int, seed: int = 42) -> list[str]:
+    rng = random.Random(seed)
+    last_year = 2024
+    orgnrs = [f"{800000000 + i}" for i in range(companies)]
+    with session_factory() as session:
+        for start in range(0, companies, 5_000):
+            chunk = orgnrs[start:start + 5_000]
+            session.add_all(
+                models.Company(orgnr=o, name=f"Company {o}", nace="62.010", municipality="Oslo")
+                for o in chunk
+            )
+            for orgnr in chunk:
+                revenue = rng.uniform(10_000, 5_000_000)
+                for year in range(last_year - years + 1, last_year + 1):
+                    ebit = revenue * rng.uniform(-0.05, 0.2)
+                    session.add(models.FinancialStatement(
+                        orgnr=orgnr, year=year, revenue=revenue, ebitda=ebit * 1.2, ebit=ebit,
+                        depreciation=None if rng.random() < 0.1 else revenue * rng.uniform(0.0, 0.05),
+                        fetched_at_utc=datetime(year + 1, 5, 1),
+                    ))
+                    session.add(models.Score(
+                        orgnr=orgnr, year=year, total_score=rng.uniform(-50, 80),
+                        compounder_score=0.0, catalyst_score=0.0, tags="QS_v2;view=company",
+                    ))
+                if rng.random() < 0.2:
+                    session.add(models.Outreach(orgnr=orgnr, owner="bench", status="new"))
+            session.commit()
+
+        score = models.Score
+        for s in session.query(score).filter(score.year == last_year):
+            session.add(models.CompanyLatestScore(orgnr=s.orgnr, year=s.year, score_id=s.id))
+        session.commit()
+    return orgnrs
+
+
+def get_company_five_queries(orgnr: str, db, models, schemas):
+    from sqlalchemy import desc, select
+
+    company = db.get(models.Company, orgnr)
+    score = db.execute(
+        select(models.Score)
+        .join(models.CompanyLatestScore, models.CompanyLatestScore.score_id == models.Score.id)
+        .where(models.CompanyLatestScore.orgnr == orgnr)
+    ).scalars().first()
+
+    fin = None
+    if score:
+        fin = db.execute(
+            select(models.FinancialStatement).where(
+                (models.FinancialStatement.orgnr == orgnr) & (models.FinancialStatement.year == score.year)
+            )
+        ).scalars().first()
+
+    fin_history = db.execute(
+        select(models.FinancialStatement)
+        .where(models.FinancialStatement.orgnr == orgnr)
+        .order_by(desc(models.FinancialStatement.year))
+        .limit(4)
+    ).scalars().all()
+    cash_values = [
+        (e.ebit + e.depreciation) / e.ebit
+        for e in fin_history
+        if e.ebit and e.depreciation is not None
+    ]
+    cash_conversion = sum(cash_values) / len(cash_values) if cash_values else None
+
+    outreach = db.get(models.Outreach, orgnr)
+    return schemas.CompanyDetail(
+        orgnr=company.orgnr,
+        name=company.name,
+        nace=company.nace,
+        municipality=company.municipality,
+        latest_year=getattr(score, "year", None),
+        revenue=getattr(fin, "revenue", None),
+        ebitda=getattr(fin, "ebitda", None),
+        ebit=getattr(fin, "ebit", None),
+        total_score=getattr(score, "total_score", None),
+        tags=getattr(score, "tags", None),
+        deployability=getattr(score, "deployability", None),
+        urgency=getattr(score, "urgency", None),
+        cash_conversion=cash_conversion,
+        outreach_owner=getattr(outreach, "owner", None),
+        outreach_status=getattr(outreach, "status", None),
+    )
+
+
+def time_requests(handler, session_factory, orgnrs: list[str]) -> list[float]:
+    latencies = []
+    for orgnr in orgnrs:
+        t0 = time.perf_counter()
+        with session_factory() as db:
+            handler(orgnr, db)
+        latencies.append((time.perf_counter() - t0) * 1000)
+    return latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="p95 latency of the company detail endpoint on SQLite.")
+    parser.add_argument("--companies", type=int, default=50_000)
+    parser.add_argument("--years", type=int, default=6, help="Statements/scores per company.")
+    parser.add_argument("--requests", type=int, default=2_000)
+    parser.add_argument("--batch", type=int, default=50, help="Shortlist size for the batch comparison.")
+    parser.add_argument("--db", type=Path, default=None, help="SQLite file (default: a temporary file).")
+    args = parser.parse_args()
+
+    db_path = args.db or Path(tempfile.mkdtemp()) / "bench_company_detail.db"
+    fresh = not db_path.exists()
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+
+    from sqlalchemy import select
+
+    from app import models, queries, schemas
+    from app.db import Base, SessionLocal, engine
+
+    if fresh:
+        Base.metadata.create_all(bind=engine)
+        t0 = time.perf_counter()
+        orgnrs = build_database(SessionLocal, models, args.companies, args.years)
+        print(f"Built {db_path} ({args.companies} companies x {args.years} years) in {time.perf_counter() - t0:.1f}s")
+    else:
+        with SessionLocal() as session:
+            orgnrs = list(session.scalars(select(models.Company.orgnr)))
+
+    rng = random.Random(7)
+    sample = [rng.choice(orgnrs) for _ in range(args.requests)]
+
+    def single_query(orgnr, db):
+        return queries.company_detail(db.execute(queries.company_detail_stmt(orgnr)).first())
+
+    def etag_check(orgnr, db):
+        return queries.company_etag(*db.execute(queries.company_version_stmt(orgnr)).first())
+
+    variants = {
+        "five_queries": lambda orgnr, db: get_company_five_queries(orgnr, db, models, schemas),
+        "single_query": single_query,
+        "etag_check": etag_check,
+    }
+
+    # Same answers before timing anything
+    with SessionLocal() as db:
+        for orgnr in sample[:200]:
+            before = variants["five_queries"](orgnr, db)
+            after = single_query(orgnr, db)
+            row = db.execute(queries.company_detail_stmt(orgnr)).first()
+            assert etag_check(orgnr, db) == queries.company_detail_etag(row), orgnr
+            for name in before.model_fields_set:
+                a, b = getattr(before, name), getattr(after, name)
+                if isinstance(a, float) and isinstance(b, float):
+                    assert abs(a - b) <= 1e-9 * max(1.0, abs(a)), (orgnr, name, a, b)
+                else:
+                    assert a == b, (orgnr, name, a, b)
+
+    print(f"{'VARIANT':<14} {'MEAN ms':>8} {'P50 ms':>8} {'P95 ms':>8} {'P99 ms':>8}")
+    for name, handler in variants.items():
+        time_requests(handler, SessionLocal, sample[:100])  # warm-up
+        latencies = time_requests(handler, SessionLocal, sample)
+        pct = quantiles(latencies, n=100)
+        print(f"{name:<14} {mean(latencies):>8.3f} {pct[49]:>8.3f} {pct[94]:>8.3f} {pct[98]:>8.3f}")
+
+    def batch_query(shortlist, db):
+        return queries.company_details(db.execute(queries.company_details_stmt(shortlist)).all(), shortlist)
+
+    shortlists = [list(dict.fromkeys(rng.sample(orgnrs, args.batch))) for _ in range(50)]
+    with SessionLocal() as db:
+        for shortlist in shortlists[:5]:
+            assert batch_query(shortlist, db) == [single_query(orgnr, db) for orgnr in shortlist]
+
+    print(f"\n{'SHORTLIST':<14} {'MEAN ms':>8} {'P50 ms':>8} {'P95 ms':>8}")
+    for name, handler in (
+        (f"loop_{args.batch}", lambda shortlist: time_requests(single_query, SessionLocal, shortlist)),
+        (f"batch_{args.batch}", lambda shortlist: time_requests(batch_query, SessionLocal, [shortlist])),
+    ):
+        latencies = []
+        for shortlist in shortlists:
+            t0 = time.perf_counter()
+            handler(shortlist)
+            latencies.append((time.perf_counter() - t0) * 1000)
+        pct = quantiles(latencies, n=100)
+        print(f"{name:<14} {mean(latencies):>8.3f} {pct[49]:>8.3f} {pct[94]:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Parse benchmark for the Proff Forvalt Excel import on a synthetic export.
+
+Variants, run on the same generated .xlsx:
+  full_load - the previous parse: load_workbook without read_only, every row as a dict
+              (read_sheet_as_rows) before anything is written
+  streaming - import_one_file as shipped: read-only workbook, tuple batches of
+              IMPORT_PARSE_BATCH_ROWS fed to StagedImport
+
+Both variants build the same stage tuples. Writes go to a connection that discards them
+(the job's SQL is SQL Server only), so the numbers are parse + row building. Timing and
+peak memory (tracemalloc, which slows the parse down) come from separate runs.
+
+Usage (from backend/):
+    python benchmarks/bench_forvalt_import.py --companies 2000 20000
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from openpyxl import Workbook, load_workbook  # noqa: E402
+
+from app.jobs import import_proff_forvalt_excels as job  # noqa: E402
+
+FIRM_COLUMNS = [
+    "Orgnr", "Juridisk selskapsnavn", "Markedsnavn", "Telefon", "E-post", "Internett", "Kommune",
+    "NACE-bransjekode", "NACE-beskrivelse", "Org.form", "Status",
+]
+CONTACT_COLUMNS = [
+    "Orgnr", "Juridisk selskapsnavn", "Navn", "Rolle", "Tiltrådt", "Telefon", "E-post",
+    "Gate-/postboksadresse (postadresse)", "Postnr (postadresse)", "Poststed (postadresse)",
+    "Gateadresse (forretningsadresse)", "Postnr (forretningsadresse)", "Poststed (forretningsadresse)",
+    "Driftsinntekter", "Antall ansatte",
+]
+
+
+def write_export(path: Path, companies: int, years: int, contacts: int, seed: int = 42) -> int:
+    """
+    Writes a Forvalt-shaped workbook; returns the number of Firmainfo columns.
+    """
+    rng = random.Random(seed)
+    prefixes = list(job.METRIC_PREFIX_TO_FIELD)
+    metric_columns = [f"{prefix}, {year}" for year in range(2024 - years + 1, 2025) for prefix in prefixes]
+
+    wb = Workbook(write_only=True)
+    firm = wb.create_sheet(job.SHEET_FIRMAINFO)
+    firm.append(FIRM_COLUMNS + metric_columns)
+    for i in range(companies):
+        orgnr = f"{900000000 + i}"
+        firm.append(
+            [orgnr, f"Firma {i} AS", f"Firma {i}", "+47 22 00 00 00", None, "www.example.no", "Oslo",
+             "62.010", "Programmering", "AS", "Aktiv"]
+            + [None if rng.random() < 0.3 else rng.randint(-5_000, 900_000) * 1000 for _ in metric_columns]
+        )
+
+    people = wb.create_sheet(job.SHEET_CONTACTS)
+    people.append(CONTACT_COLUMNS)
+    for i in range(companies):
+        for k in range(contacts):
+            people.append(
+                [f"{900000000 + i}", f"Firma {i} AS", f"Person {k}", "Styreleder", "01.02.2019", None,
+                 None, "Gate 1", "0150", "Oslo", None, None, None, "1 234", "12"]
+            )
+    wb.save(path)
+    return len(FIRM_COLUMNS) + len(metric_columns)
+
+
+class DiscardingConnection:
+    def execute(self, *args, **kwargs):
+        return self
+
+    def exec_driver_sql(self, *args, **kwargs):
+        return self
+
+    rowcount = 0
+
+
+def full_load(path: Path) -> int:
+    """
+    The previous parse: whole workbook in memory, one dict per row.
+    """
+    wb = load_workbook(path, data_only=True)
+    report = job.ImportReport(file=path.name)
+    staged = job.StagedImport(DiscardingConnection(), report, force=True)
+    for sheet, parse in ((job.SHEET_FIRMAINFO, job.parse_firm_rows), (job.SHEET_CONTACTS, job.parse_contact_rows)):
+        rows_iter = wb[sheet].iter_rows(values_only=True)
+        header = job.SheetHeader.from_row(next(rows_iter))
+        dict_rows = [dict(zip(header.names, r)) for r in rows_iter]
+        staged.add(parse(header, [tuple(row.values()) for row in dict_rows]))
+    staged.finish(path.name, job.now_utc(), digest="")
+    return report.sheet_rows
+
+
+def streaming(path: Path) -> int:
+    class Engine:
+        def begin(self):
+            return self
+
+        def __enter__(self):
+            return DiscardingConnection()
+
+        def __exit__(self, *exc):
+            return False
+
+    # force: no import ledger lookups, every row is staged
+    return job.import_one_file(Engine(), path, force=True).sheet_rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Peak memory and rows/s of the Forvalt Excel parse.")
+    parser.add_argument("--companies", type=int, nargs="+", default=[2_000, 20_000])
+    parser.add_argument("--years", type=int, default=10, help="Year columns per metric in Firmainfo.")
+    parser.add_argument("--contacts", type=int, default=3, help="Contact rows per company.")
+    args = parser.parse_args()
+
+    print(f"{'COMPANIES':>9} {'VARIANT':<10} {'SECONDS':>8} {'ROWS/S':>8} {'PEAK MB':>8}")
+    for companies in args.companies:
+        path = Path(tempfile.mkdtemp()) / f"forvalt_{companies}.xlsx"
+        write_export(path, companies, args.years, args.contacts)
+        for name, variant in (("full_load", full_load), ("streaming", streaming)):
+            t0 = time.perf_counter()
+            rows = variant(path)
+            seconds = time.perf_counter() - t0
+
+            tracemalloc.start()
+            variant(path)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f"{companies:>9} {name:<10} {seconds:>8.2f} {rows / seconds:>8.0f} {peak / 1e6:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
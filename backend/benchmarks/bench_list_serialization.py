@@ -0,0 +1,143 @@
+"""
+Serialization benchmark for the /companies list payload against a local SQLite stand-in.
+
+Variants, timed on the same database for pages of 10k, 100k and 300k rows (the endpoint caps
+limit at 500; the large pages just make the per-row cost visible):
+  response_model - ORM rows -> one CompanySummary per row -> CompanyPage, validated and
+                   serialized again by FastAPI's response_model path (the original handler)
+  to_json        - ORM rows -> Pydantic models -> pydantic_core.to_json
+  orjson_rows    - app.queries as shipped: labelled columns -> dicts -> orjson.dumps
+
+Times cover query + mapping + serialization; all variants must produce the same JSON.
+
+Usage (from backend/):
+    python benchmarks/bench_list_serialization.py --rows 10000 100000 300000
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from statistics import median
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+
+def build_database(engine, models, companies: int, seed: int = 42) -> None:
+    from sqlalchemy import insert, select
+
+    rng = random.Random(seed)
+    with engine.begin() as conn:
+        orgnrs = [f"{800000000 + i}" for i in range(companies)]
+        conn.execute(insert(models.Company), [{"orgnr": o, "name": f"Company {o}"} for o in orgnrs])
+        conn.execute(insert(models.Score), [
+            {
+                "orgnr": o, "year": 2024, "total_score": rng.uniform(-50, 80),
+                "compounder_score": rng.uniform(0, 60), "deployability": rng.uniform(0, 10),
+                "urgency": rng.choice([0.0, rng.uniform(0, 10)]),
+            }
+            for o in orgnrs
+            if rng.random() < 0.9
+        ])
+        conn.execute(
+            insert(models.CompanyLatestScore).from_select(
+                ["orgnr", "year", "score_id"],
+                select(models.Score.orgnr, models.Score.year, models.Score.id),
+            )
+        )
+
+
+def orm_page(db, models, queries, schemas, params):
+    stmt = queries.company_page_stmt(params)
+    stmt = stmt.with_only_columns(models.Company, models.Score, maintain_column_froms=True)
+    rows = db.execute(stmt).all()
+    items = [
+        schemas.CompanySummary(
+            orgnr=company.orgnr,
+            name=company.name,
+            total_score=getattr(score, "total_score", None),
+            compounder_score=getattr(score, "compounder_score", None),
+            deployability=getattr(score, "deployability", None),
+            urgency=getattr(score, "urgency", None),
+        )
+        for company, score in rows[:params.limit]
+    ]
+    return schemas.CompanyPage(items=items, next_cursor=None)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Time /companies serialization for large pages on SQLite.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 300_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--db", type=Path, default=None, help="SQLite file (default: a temporary file).")
+    args = parser.parse_args()
+
+    db_path = args.db or Path(tempfile.mkdtemp()) / "bench_list_serialization.db"
+    fresh = not db_path.exists()
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+
+    import orjson
+    from fastapi.responses import JSONResponse
+    from fastapi.routing import serialize_response
+    from fastapi.utils import create_model_field
+    from pydantic_core import to_json
+
+    from app import models, queries, schemas
+    from app.db import Base, SessionLocal, engine
+    from app.queries import CompanyListParams
+
+    if fresh:
+        Base.metadata.create_all(bind=engine)
+        t0 = time.perf_counter()
+        build_database(engine, models, max(args.rows))
+        print(f"Built {db_path} ({max(args.rows)} companies) in {time.perf_counter() - t0:.1f}s")
+
+    response_field = create_model_field(name="Response_list_companies", type_=schemas.CompanyPage)
+
+    def response_model(db, params):
+        page = orm_page(db, models, queries, schemas, params)
+        content = asyncio.run(serialize_response(field=response_field, response_content=page))
+        return JSONResponse(content).body
+
+    def pydantic_to_json(db, params):
+        return to_json(orm_page(db, models, queries, schemas, params))
+
+    def orjson_rows(db, params):
+        page = queries.company_page(db.execute(queries.company_page_stmt(params)).all(), params)
+        page["next_cursor"] = None  # the ORM variants skip the cursor
+        return orjson.dumps(page)
+
+    variants = {"response_model": response_model, "to_json": pydantic_to_json, "orjson_rows": orjson_rows}
+
+    print(f"{'ROWS':>8} {'VARIANT':<15} {'MEDIAN ms':>10} {'us/row':>8} {'MB':>6}")
+    for n_rows in args.rows:
+        params = CompanyListParams(
+            limit=n_rows, cursor=None, sort="total_score", order="desc",
+            min_score=None, max_score=None, min_deployability=None, max_deployability=None,
+            min_urgency=None, max_urgency=None, nace=None, municipality=None,
+        )
+        bodies = {}
+        for name, variant in variants.items():
+            timings = []
+            for _ in range(args.repeat):
+                with SessionLocal() as db:
+                    t0 = time.perf_counter()
+                    bodies[name] = variant(db, params)
+                    timings.append((time.perf_counter() - t0) * 1000)
+            ms = median(timings)
+            print(f"{n_rows:>8} {name:<15} {ms:>10.1f} {ms * 1000 / n_rows:>8.2f} {len(bodies[name]) / 1e6:>6.1f}")
+
+        expected = json.loads(bodies["response_model"])
+        assert all(json.loads(body) == expected for body in bodies.values()), n_rows
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Peak-RSS benchmark for a full scoring run (no database).
+
+Each variant runs in a fresh subprocess on the same synthetic universe:
+  dict  - FeatureRow / ScoreRow / HistoryMetrics rebuilt as plain dataclasses (per-instance __dict__),
+          i.e. the layout before they were slotted
+  slots - the classes as shipped in compute_quality_scores
+
+Usage (from backend/):
+    python benchmarks/bench_scoring_memory.py --companies 500000
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import subprocess
+import sys
+import time
+from dataclasses import fields, make_dataclass
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+
+HISTORY_KEYS = (
+    "revenue", "ebit", "equity", "goodwill", "total_debt", "cash_equivalents",
+    "cogs", "depreciation", "inventory", "trade_receivables", "trade_payables",
+)
+
+
+def peak_rss_mb() -> float:
+    try:
+        import resource
+    except ImportError:  # Windows
+        import psutil  # optional, only needed for this benchmark on Windows
+
+        return psutil.Process().memory_info().peak_wset / 1024 / 1024
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    scale = 1024 if sys.platform != "darwin" else 1024 * 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+
+
+def make_universe(n_companies: int, year: int, n_years: int, seed: int = 42):
+    rng = random.Random(seed)
+    fs_current: list[dict[str, object]] = []
+    history: list[dict[str, object]] = []
+    for i in range(n_companies):
+        orgnr = f"{800000000 + i}"
+        revenue = rng.uniform(10_000, 5_000_000)
+        for y in range(year - n_years + 1, year + 1):
+            revenue *= rng.uniform(0.9, 1.2)
+            row: dict[str, object] = {"orgnr": orgnr, "year": y}
+            for key in HISTORY_KEYS:
+                row[key] = None if rng.random() < 0.05 else revenue * rng.uniform(0.0, 0.6)
+            row["revenue"] = revenue
+            history.append(row)
+        fs_current.append(history[-1])
+    return fs_current, history
+
+
+def use_dict_dataclasses(cqs) -> None:
+    # Swap the module globals for unslotted twins; the scoring functions look them up at call time
+    for name in ("FeatureRow", "ScoreRow", "HistoryMetrics"):
+        cls = getattr(cqs, name)
+        setattr(cqs, name, make_dataclass(name, [(f.name, f.type) for f in fields(cls)]))
+
+
+def run_variant(variant: str, companies: int, years: int, engine_name: str) -> dict[str, float]:
+    from app.jobs import compute_quality_scores as cqs
+
+    if variant == "dict":
+        use_dict_dataclasses(cqs)
+
+    fs_current, history = make_universe(companies, cqs.DEFAULT_YEAR, years)
+    baseline = peak_rss_mb()
+
+    t0 = time.perf_counter()
+    scores = cqs.score_financial_rows(fs_current, history, engine_name)
+    elapsed = time.perf_counter() - t0
+    peak = peak_rss_mb()
+
+    return {
+        "variant": variant,
+        "scores": len(scores),
+        "input_mb": baseline,
+        "peak_mb": peak,
+        "scoring_mb": peak - baseline,
+        "seconds": elapsed,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare peak RSS of a scoring run with dict vs slotted rows.")
+    parser.add_argument("--companies", type=int, default=500_000)
+    parser.add_argument("--years", type=int, default=5, help="History years per company.")
+    parser.add_argument("--engine", choices=("scalar", "vectorized"), default="scalar")
+    parser.add_argument("--variant", choices=("dict", "slots"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.variant:
+        print(json.dumps(run_variant(args.variant, args.companies, args.years, args.engine)))
+        return
+
+    print(f"Synthetic universe: {args.companies} companies x {args.years} years, engine={args.engine}")
+    print(f"{'VARIANT':<8} {'INPUT MB':>10} {'PEAK MB':>10} {'SCORING MB':>11} {'SECONDS':>8}")
+    for variant in ("dict", "slots"):
+        out = subprocess.run(
+            [
+                sys.executable, __file__,
+                "--variant", variant,
+                "--companies", str(args.companies),
+                "--years", str(args.years),
+                "--engine", args.engine,
+            ],
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+        r = json.loads(out.stdout.strip().splitlines()[-1])
+        print(
+            f"{r['variant']:<8} {r['input_mb']:>10.0f} {r['peak_mb']:>10.0f} "
+            f"{r['scoring_mb']:>11.0f} {r['seconds']:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
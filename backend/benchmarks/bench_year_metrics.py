@@ -0,0 +1,123 @@
+"""
+Microbenchmark for extract_year_metrics on a 200-column Firmainfo sheet held in memory.
+
+Variants, run on the same rows:
+  regex_per_cell - the previous loop: re.match on every header of every row, then a
+                   METRIC_PREFIX_TO_FIELD lookup
+  column_plan    - extract_year_metrics as shipped: the header is parsed once
+                   (SheetHeader.metric_columns) and each row only visits the metric columns
+
+Rows mix numeric cells, Norwegian-formatted text ("6 499,00") and empty cells, and both
+cash-flow headers are present, so the variants must agree on which value wins.
+
+Usage (from backend/):
+    python benchmarks/bench_year_metrics.py --rows 20000
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+from statistics import median
+from typing import Dict
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from app.jobs import import_proff_forvalt_excels as job  # noqa: E402
+
+FIRM_COLUMNS = [
+    "Orgnr", "Juridisk selskapsnavn", "Markedsnavn", "Telefon", "E-post", "Internett", "Kommune",
+    "NACE-bransjekode", "NACE-beskrivelse", "Org.form", "Status",
+]
+
+
+def build_header(columns: int) -> list[str]:
+    """
+    Firm columns, then every metric prefix per year (newest first), cut to `columns` headers;
+    the last two are a year column that is not a metric and a plain text column.
+    """
+    header = list(FIRM_COLUMNS)
+    year = 2024
+    while len(header) < columns:
+        for prefix in job.METRIC_PREFIX_TO_FIELD:
+            header.append(f"{prefix}, {year}")
+        year -= 1
+    header = header[:columns]
+    header[-2:] = ["Antall ansatte, 2024", "Kommentar"]
+    return header
+
+
+def build_rows(header: list[str], rows: int, seed: int = 42) -> list[tuple]:
+    rng = random.Random(seed)
+
+    def cell(name: str):
+        if not job.YEAR_COLUMN_RE.match(name):
+            return "x"
+        roll = rng.random()
+        if roll < 0.3:
+            return None
+        if roll < 0.4:
+            return f"{rng.randint(-5_000, 900_000):,}".replace(",", " ") + ",00"
+        return rng.randint(-5_000, 900_000) * 1000
+
+    return [tuple(cell(name) for name in header) for _ in range(rows)]
+
+
+def regex_per_cell(header: job.SheetHeader, row: tuple) -> Dict[int, Dict[str, float]]:
+    """
+    The previous extract_year_metrics.
+    """
+    out: Dict[int, Dict[str, float]] = {}
+    for k, v in zip(header.names, row):
+        if not k or v is None:
+            continue
+        k = str(k).strip()
+        m = re.match(r"^(.*?),\s*(\d{4})$", k)
+        if not m:
+            continue
+        prefix = m.group(1).strip()
+        year = int(m.group(2))
+        if prefix not in job.METRIC_PREFIX_TO_FIELD:
+            continue
+        field = job.METRIC_PREFIX_TO_FIELD[prefix]
+        val = job.parse_number(v)
+        if val is None:
+            continue
+        out.setdefault(year, {})[field] = val
+    return out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Time extract_year_metrics on a wide Firmainfo sheet.")
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--columns", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    names = build_header(args.columns)
+    rows = build_rows(names, args.rows)
+
+    results = {}
+    print(f"{'VARIANT':<15} {'MEDIAN ms':>10} {'us/row':>8} {'ROWS/S':>10}")
+    for name, variant in (("regex_per_cell", regex_per_cell), ("column_plan", job.extract_year_metrics)):
+        timings = []
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            # The plan is built per sheet, so its cost is part of every run
+            header = job.SheetHeader.from_row(names)
+            results[name] = [variant(header, row) for row in rows]
+            timings.append((time.perf_counter() - t0) * 1000)
+        ms = median(timings)
+        print(f"{name:<15} {ms:>10.1f} {ms * 1000 / args.rows:>8.2f} {args.rows * 1000 / ms:>10.0f}")
+
+    assert results["regex_per_cell"] == results["column_plan"]
+    print(f"{args.columns} columns, {len(job.SheetHeader.from_row(names).metric_columns)} metric columns")
+
+
+if __name__ == "__main__":
+    main()
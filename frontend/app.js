@@ -1,6 +1,23 @@
 const { useEffect, useMemo, useState } = React;
 
 const API_BASE = window.API_BASE || "http://localhost:8000";
+const PAGE_SIZE = 100;
+
+const fetchCompanyPage = async ({ key, direction }, cursor) => {
+  const params = new URLSearchParams({
+    sort: key,
+    order: direction,
+    limit: String(PAGE_SIZE),
+  });
+  if (cursor) {
+    params.set("cursor", cursor);
+  }
+  const response = await fetch(`${API_BASE}/companies?${params}`);
+  if (!response.ok) {
+    throw new Error("Failed to fetch companies");
+  }
+  return response.json();
+};
 
 const demoCompanies = [
   {
@@ -174,30 +191,44 @@ const App = () => {
     direction: "asc",
   });
   const [isDemo, setIsDemo] = useState(false);
+  const [nextCursor, setNextCursor] = useState(null);
 
+  // Sorting is done by the API; a new sort order starts again from the first page.
   useEffect(() => {
+    if (isDemo) {
+      return;
+    }
+
     const loadCompanies = async () => {
       try {
-        const response = await fetch(`${API_BASE}/companies`);
-        if (!response.ok) {
-          throw new Error("Failed to fetch companies");
-        }
-        const data = await response.json();
-        setCompanies(data);
-        if (data.length > 0) {
-          setSelectedOrgnr(data[0].orgnr);
-        }
+        const page = await fetchCompanyPage(sortConfig);
+        setCompanies(page.items);
+        setNextCursor(page.next_cursor);
+        setSelectedOrgnr((current) =>
+          current || (page.items.length > 0 ? page.items[0].orgnr : null)
+        );
         setStatus("Live data");
       } catch (error) {
         setIsDemo(true);
         setCompanies(demoCompanies);
+        setNextCursor(null);
         setSelectedOrgnr(demoCompanies[0].orgnr);
         setStatus("Using demo data (API unavailable)");
       }
     };
 
     loadCompanies();
-  }, []);
+  }, [sortConfig, isDemo]);
+
+  const loadMoreCompanies = async () => {
+    try {
+      const page = await fetchCompanyPage(sortConfig, nextCursor);
+      setCompanies((current) => [...current, ...page.items]);
+      setNextCursor(page.next_cursor);
+    } catch (error) {
+      setStatus("Failed to load more companies");
+    }
+  };
 
   useEffect(() => {
     if (!selectedOrgnr) {
@@ -225,6 +256,9 @@ const App = () => {
   }, [selectedOrgnr, isDemo]);
 
   const sortedCompanies = useMemo(() => {
+    if (!isDemo) {
+      return companies;
+    }
     const sorted = [...companies];
     const { key, direction } = sortConfig;
     sorted.sort((a, b) => {
@@ -243,7 +277,7 @@ const App = () => {
       return direction === "asc" ? comparison : -comparison;
     });
     return sorted;
-  }, [companies, sortConfig]);
+  }, [companies, sortConfig, isDemo]);
 
   const handleSort = (key) => {
     setSortConfig((prev) => {
@@ -362,6 +396,11 @@ const App = () => {
               ))}
             </tbody>
           </table>
+          {nextCursor && (
+            <button className="load-more" onClick={loadMoreCompanies}>
+              Load more
+            </button>
+          )}
         </div>
       </section>
 
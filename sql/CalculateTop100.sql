@@ -32,6 +32,11 @@ SELECT
 FROM ranked r
 WHERE r.rn <= @top_n;
 
+-- Invalidate the API response caches (dbo.data_generation, see backend/app/generation.py)
+UPDATE dbo.data_generation SET generation = generation + 1, updated_at = SYSUTCDATETIME() WHERE name = N'api';
+IF @@ROWCOUNT = 0
+    INSERT INTO dbo.data_generation (name, generation, updated_at) VALUES (N'api', 1, SYSUTCDATETIME());
+
 -- 3) View result
 SELECT
     p.pick_date,
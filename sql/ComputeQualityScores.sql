@@ -228,18 +228,40 @@ WHEN MATCHED THEN
         compounder_score = src.quality_score, -- Fixed: Matches alias in 'final' CTE
         catalyst_score   = COALESCE(tgt.catalyst_score, 0),
         total_score      = src.quality_score, -- Fixed: Matches alias in 'final' CTE
-        tags             = CASE
-                              -- Prevent appending the same tag string if it already exists
-                              WHEN tgt.tags LIKE '%' + src.new_tags + '%' THEN tgt.tags
-                              WHEN tgt.tags IS NULL OR LTRIM(RTRIM(tgt.tags)) = '' THEN src.new_tags
-                              ELSE CONCAT(tgt.tags, ' | ', src.new_tags)
-                           END,
+        tags             = src.new_tags, -- Replace, never append: the run writes its full tag set
         computed_at      = SYSUTCDATETIME()
 
 WHEN NOT MATCHED THEN
     INSERT (orgnr, [year], total_score, compounder_score, catalyst_score, tags, computed_at)
     VALUES (src.orgnr, src.[year], src.quality_score, src.quality_score, 0, src.new_tags, SYSUTCDATETIME());
 
+-- Keep dbo.company_latest_score (read by the API) on each company's max-year score
+MERGE dbo.company_latest_score WITH (HOLDLOCK) AS tgt
+USING (
+    SELECT ranked.orgnr, ranked.[year], ranked.score_id
+    FROM (
+        SELECT
+            s.orgnr,
+            s.[year],
+            s.id AS score_id,
+            ROW_NUMBER() OVER (PARTITION BY s.orgnr ORDER BY s.[year] DESC) AS rn
+        FROM dbo.score s
+        WHERE s.orgnr IN (SELECT orgnr FROM dbo.score WHERE [year] = @year)
+    ) AS ranked
+    WHERE ranked.rn = 1
+) AS src
+ON tgt.orgnr = src.orgnr
+WHEN MATCHED AND (tgt.score_id <> src.score_id OR tgt.[year] <> src.[year]) THEN
+    UPDATE SET [year] = src.[year], score_id = src.score_id, updated_at = SYSUTCDATETIME()
+WHEN NOT MATCHED THEN
+    INSERT (orgnr, [year], score_id, updated_at)
+    VALUES (src.orgnr, src.[year], src.score_id, SYSUTCDATETIME());
+
+-- Invalidate the API response caches (dbo.data_generation, see backend/app/generation.py)
+UPDATE dbo.data_generation SET generation = generation + 1, updated_at = SYSUTCDATETIME() WHERE name = N'api';
+IF @@ROWCOUNT = 0
+    INSERT INTO dbo.data_generation (name, generation, updated_at) VALUES (N'api', 1, SYSUTCDATETIME());
+
 -- Quick check
 SELECT TOP 50 orgnr, [year], total_score, compounder_score, catalyst_score, tags, computed_at
 FROM dbo.score